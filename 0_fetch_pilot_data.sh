@@ -6,11 +6,11 @@
 my_start_date='2023-01-01'
 my_end_date='2023-03-01'
 
-#python3 fetch_fiction.py --start_date "$my_start_date" --end_date "$my_end_date" --pilot
-#python3 fetch_startups.py --start_date "$my_start_date" --end_date "$my_end_date" --pilot
-#python3 fetch_nyt_opeds.py --start_date "$my_start_date" --end_date "$my_end_date" --pilot
-python3 fetch_podcasts.py  --start_date "$my_start_date" --end_date "$my_end_date" --pilot --N 5000
-#python3 fetch_osf_preprints.py --provider 'socarxiv' --start_date "$my_start_date" --end_date "$my_end_date" --max_results_per_month 500 --pilot
-#python3 fetch_osf_preprints.py --provider 'psyarxiv' --start_date "$my_start_date" --end_date "$my_end_date" --max_results_per_month 500 --pilot
+#ood fetch fiction --start_date "$my_start_date" --end_date "$my_end_date" --pilot
+#ood fetch startups --start_date "$my_start_date" --end_date "$my_end_date" --pilot
+#ood fetch opeds --start_date "$my_start_date" --end_date "$my_end_date" --pilot
+ood fetch podcasts --start_date "$my_start_date" --end_date "$my_end_date" --pilot --N 5000
+#ood fetch preprints --provider 'socarxiv' --start_date "$my_start_date" --end_date "$my_end_date" --max_results_per_month 500 --pilot
+#ood fetch preprints --provider 'psyarxiv' --start_date "$my_start_date" --end_date "$my_end_date" --max_results_per_month 500 --pilot
 
 echo "All done!"
\ No newline at end of file
@@ -0,0 +1,62 @@
+"""
+Description: Benchmarks for prompt generation and for parsing what the fetchers download.
+"""
+from harness import benchmark
+import synthetic
+
+
+@benchmark(small=100, medium=1000, large=10000)
+def bench_prompt_experiment(N):
+    """PromptExperiment.get_prompts on a Monte Carlo prompt grid crossed with a factorial hyperparameter grid."""
+    from ood.prompt_experiment import PromptExperiment
+
+    def run():
+        PromptExperiment(
+            hyperparameters={'model': ['gpt-3.5-turbo', 'gpt-4-0613', 'claude-2'], 'temperature': [0.7, 1.0]},
+            N=N,
+            prompt_mode='monte_carlo',
+            hyper_mode='factorial',
+            template_prompt="Return a one-line {category} idea that would appear on {venue}.",
+            prompt_parameters={'category': ['startup', 'podcast', 'op-ed'],
+                               'venue': ['Product Hunt', 'Google Podcasts', 'the New York Times']},
+        ).get_prompts()
+    return run
+
+
+@benchmark(small=50, medium=500, large=5000)
+def bench_find_products(n_products):
+    """fetch_startups.find_products walking a decoded __NEXT_DATA__ tree."""
+    import json
+    import re
+    from ood.fetch_startups import find_products
+
+    html = synthetic.product_hunt_html(n_products)
+    next_data = json.loads(re.search(r"type='application/json'>(.*)</script>", html).group(1))
+    return lambda: find_products(next_data)
+
+
+@benchmark(small=50, medium=500, large=5000)
+def bench_parse_product_hunt_page(n_products):
+    """fetch_startups.parse_product_hunt_page on a full leaderboard page (BeautifulSoup + JSON + tree walk)."""
+    from ood.fetch_startups import parse_product_hunt_page
+
+    html = synthetic.product_hunt_html(n_products)
+    return lambda: parse_product_hunt_page(html, '2021-01-01')
+
+
+@benchmark(small=100, medium=1000, large=10000)
+def bench_parse_osf_preprint(n_records):
+    """fetch_osf_preprints.parse_osf_preprint over one API response's worth of records."""
+    from ood.fetch_osf_preprints import parse_osf_preprint
+
+    records = synthetic.osf_records(n_records)
+    return lambda: [parse_osf_preprint(record) for record in records]
+
+
+@benchmark(small=20, medium=200, large=2000)
+def bench_extract_description(n_related):
+    """fetch_fiction.extract_description on a book page (only the description div is parsed into a tree)."""
+    from ood.fetch_fiction import extract_description
+
+    html = synthetic.fiction_book_page(n_related)
+    return lambda: extract_description(html)
@@ -0,0 +1,117 @@
+"""
+Description: Benchmarks for the processing and analysis hot paths: cleaning LLM outputs, embedding, the
+similarity matrix, the pairwise row loop, id lookups, training-window labels, the nearest-human simulation and
+the diversity metrics.
+"""
+import logging
+
+import numpy as np
+
+from harness import benchmark, SkipBenchmark
+import synthetic
+
+
+@benchmark(small=1000, medium=10000, large=100000)
+def bench_extract_json(n_outputs):
+    """process_utils.extract_json over raw LLM outputs (5% malformed)."""
+    from ood.process_utils import extract_json
+
+    outputs = synthetic.llm_outputs(n_outputs)
+    # Malformed outputs log a warning each; keep them out of the timing
+    logging.getLogger().setLevel(logging.ERROR)
+    return lambda: [extract_json(text) for text in outputs]
+
+
+@benchmark(small=64, medium=512, large=4096)
+def bench_embed(n_texts):
+    """SBERT encoding with the model embed.py uses (skipped unless the model is available locally)."""
+    from sentence_transformers import SentenceTransformer
+
+    try:
+        model = SentenceTransformer("all-MiniLM-L6-v2")
+    except Exception as e:
+        raise SkipBenchmark(f"Could not load model: {e}")
+    texts = synthetic.llm_outputs(n_texts, malformed_frac=0)
+    return lambda: model.encode(texts)
+
+
+@benchmark(small=500, medium=2000, large=8000)
+def bench_similarity_matrix(n_rows):
+    """The full cosine similarity matrix as built in 3_process_data (sklearn pairwise_distances)."""
+    from sklearn.metrics import pairwise_distances as pdist
+
+    X = synthetic.embedding_matrix(n_rows)
+    return lambda: 1 - pdist(X, metric='cosine', n_jobs=-1)
+
+
+@benchmark(small=(20, 200), medium=(100, 1000), large=(300, 3000))
+def bench_process_ai_idea(shape):
+    """process_utils.process_ai_idea building (ai_code, human_code, sim) rows from the similarity matrix."""
+    from ood.process_utils import process_ai_idea
+
+    n_ai, n_human = shape
+    human_codes = np.arange(n_human)
+    ai_codes = np.arange(n_human, n_human + n_ai)
+    X = synthetic.embedding_matrix(n_ai + n_human, dim=64)
+    csim = X @ X.T
+    return lambda: process_ai_idea(ai_codes, human_codes, csim)
+
+
+@benchmark(small=10000, medium=100000, large=1000000)
+def bench_id_registry_codes(n_rows):
+    """IdRegistry.codes resolving a pair table's worth of repeated string ids."""
+    from ood.id_registry import IdRegistry
+
+    ids = np.asarray([f"startup_{i}" for i in range(max(n_rows // 100, 1))], dtype=object)
+    registry = IdRegistry(ids)
+    batch = np.random.default_rng(416).choice(ids, n_rows)
+    return lambda: registry.codes(batch)
+
+
+@benchmark(small=(10, 100), medium=(30, 300), large=(100, 1000))
+def bench_compute_similarity_proportions(shape):
+    """process_utils.compute_similarity_proportions for one simulation draw."""
+    from ood.process_utils import min_unique_human_ids, compute_similarity_proportions
+
+    df = synthetic.pairwise_frame(*shape)
+    min_counts = min_unique_human_ids(df)
+    return lambda: compute_similarity_proportions(df, min_counts, seed=0)
+
+
+@benchmark(small=1000, medium=5000, large=20000)
+def bench_within_pairwise_stats(n_rows):
+    """diversity.within_pairwise_stats (tiled upper-triangle mean/SD of cosine similarity)."""
+    from ood.diversity import within_pairwise_stats
+
+    X = synthetic.embedding_matrix(n_rows)
+    return lambda: within_pairwise_stats(X)
+
+
+@benchmark(small=(10, 100), medium=(30, 300), large=(100, 1000))
+def bench_label_pairs(shape):
+    """corpus.label_pairs gathering per-human window flags onto pair rows by integer code."""
+    import pandas as pd
+    from ood.corpus import utc_datetime64, window_table, label_pairs
+
+    df = synthetic.pairwise_frame(*shape)
+    n_humans = df['human_code'].max() + 1
+    humans = pd.DataFrame({'dataset_id': np.arange(n_humans),
+                           'date': pd.date_range('2017-01-01', '2024-04-15', periods=n_humans)})
+    cutoffs = dict(zip(['chatgpt', 'claude'], utc_datetime64(['2021-09-01', '2023-04-01'])))
+    windows = window_table(humans, cutoffs)
+    return lambda: label_pairs(df, windows, human_codes=df['human_code'].to_numpy())
+
+
+@benchmark(small=(20, 200), medium=(50, 1000), large=(100, 5000))
+def bench_fit_ols(shape):
+    """ols.fit_ols on the pair-level window model, streamed in chunks with clustered SEs and AMEs by model."""
+    from ood.ols import fit_ols
+
+    df = synthetic.pairwise_frame(*shape)
+    chunksize = 100_000
+
+    def chunks():
+        return (df.iloc[i:i + chunksize] for i in range(0, len(df), chunksize))
+
+    return lambda: fit_ols('sim ~ category*model*C(in_window)', chunks, cov_type='cluster', cluster='ai_code',
+                           ame_variable='in_window', ame_by=[None, 'model'])
@@ -0,0 +1,99 @@
+"""
+Description: Minimal asv-style benchmark harness.
+
+A benchmark is a function decorated with `@benchmark(small=..., medium=..., large=...)`. It receives the size
+for a scale, does its (untimed) setup and returns a zero-argument callable; only that callable is measured. Each
+case is timed over several repeats (after one warmup call) and run once more under tracemalloc for peak memory.
+A benchmark whose optional dependency is missing raises ImportError or SkipBenchmark during setup and is
+reported as skipped.
+"""
+import gc
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+# Benchmarks import the `ood` package from the repo root, installed or not
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+REGISTRY = {}
+
+
+class SkipBenchmark(Exception):
+    """Raised in setup when a benchmark cannot run in this environment."""
+
+
+def benchmark(**sizes):
+    """Registers a benchmark with its size per scale name."""
+    def decorator(func):
+        REGISTRY[f"{func.__module__}.{func.__name__}"] = (func, sizes)
+        return func
+    return decorator
+
+
+def measure(func, size, repeat=5):
+    """Runs one benchmark case.
+
+    Args:
+        func (callable): The benchmark; `func(size)` returns the callable to measure.
+        size: Size passed to the benchmark.
+        repeat (int): Timed repeats.
+
+    Returns:
+        A dict with min_s, median_s and peak_mib, or {'skipped': reason}.
+    """
+    try:
+        run = func(size)
+    except (ImportError, SkipBenchmark) as e:
+        return {'skipped': str(e)}
+
+    run()
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'min_s': min(times), 'median_s': statistics.median(times), 'peak_mib': peak / 2 ** 20}
+
+
+def compare(results, baseline, tolerance=0.2, min_memory_mib=1.0):
+    """Compares results to a baseline.
+
+    Args:
+        results (dict): Case name to measurement.
+        baseline (dict): Same shape, from a previous run.
+        tolerance (float): Relative slowdown (or memory growth) tolerated before flagging a regression.
+        min_memory_mib (float): Memory growth smaller than this is never flagged (tiny peaks are noisy).
+
+    Returns:
+        A list of (case, time_ratio, memory_ratio, status) tuples for cases measured in both.
+    """
+    rows = []
+    for case, result in sorted(results.items()):
+        base = baseline.get(case)
+        if not base or 'skipped' in result or 'skipped' in base:
+            continue
+        # Best-of-repeats is the least noisy timing to compare
+        time_ratio = result['min_s'] / base['min_s'] if base['min_s'] else float('inf')
+        memory_ratio = result['peak_mib'] / base['peak_mib'] if base['peak_mib'] else 1.0
+        memory_grew = memory_ratio > 1 + tolerance and result['peak_mib'] - base['peak_mib'] > min_memory_mib
+        if time_ratio > 1 + tolerance or memory_grew:
+            status = 'REGRESSION'
+        elif time_ratio < 1 / (1 + tolerance):
+            status = 'faster'
+        else:
+            status = 'same'
+        rows.append((case, time_ratio, memory_ratio, status))
+    return rows
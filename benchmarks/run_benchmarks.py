@@ -0,0 +1,97 @@
+"""
+Description: Runs the benchmark suite on synthetic data and compares it with a stored baseline.
+
+Benchmarks live in `benchmarks/bench_*.py` (see harness.py for how to write one). Each case reports min and median
+wall time and tracemalloc peak memory. With `--baseline`, every case measured in both runs is compared and
+flagged as a regression when its best time or peak memory grows by more than `--tolerance`.
+
+Baselines are machine-specific: record one with `--save_baseline` on the machine you compare on.
+
+Usage:
+    python benchmarks/run_benchmarks.py --scales small medium
+    python benchmarks/run_benchmarks.py --filter extract_json --baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --save_baseline benchmarks/baseline.json
+"""
+import argparse
+import glob
+import importlib
+import json
+import logging
+import os
+import platform
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from harness import REGISTRY, measure, compare
+
+
+def load_benchmarks():
+    """Imports every bench_*.py module so its benchmarks register themselves."""
+    for path in sorted(glob.glob(os.path.join(BENCH_DIR, 'bench_*.py'))):
+        importlib.import_module(os.path.splitext(os.path.basename(path))[0])
+    return REGISTRY
+
+
+def run(benchmarks, scales, name_filter=None, repeat=5):
+    """Measures every (benchmark, scale) case.
+
+    Returns:
+        A dict mapping "<module>.<benchmark>[<scale>]" to its measurement.
+    """
+    results = {}
+    for name, (func, sizes) in sorted(benchmarks.items()):
+        if name_filter and name_filter not in name:
+            continue
+        for scale in scales:
+            if scale not in sizes:
+                continue
+            case = f"{name}[{scale}]"
+            results[case] = measure(func, sizes[scale], repeat)
+            if 'skipped' in results[case]:
+                print(f"{case:<60} skipped ({results[case]['skipped']})")
+            else:
+                print(f"{case:<60} {results[case]['median_s'] * 1000:>10.2f} ms {results[case]['peak_mib']:>9.2f} MiB")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the benchmark suite.')
+    parser.add_argument('--scales', nargs='+', default=['small', 'medium'], help='Scales to run (small/medium/large)')
+    parser.add_argument('--filter', default=None, help='Only run benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed repeats per case')
+    parser.add_argument('--baseline', default=None, help='Baseline JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Relative growth flagged as a regression')
+    parser.add_argument('--save_baseline', default=None, help='Write this run as a baseline JSON')
+    parser.add_argument('--output', default=None, help='Write this run\'s results as JSON')
+    parser.add_argument('--strict', action='store_true', help='Exit with status 1 if any case regressed')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+
+    results = run(load_benchmarks(), args.scales, args.filter, args.repeat)
+    meta = {'python': platform.python_version(), 'machine': platform.machine(), 'node': platform.node()}
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        existing = {}
+        if path == args.save_baseline and os.path.exists(path):
+            # Keep cases from other scales/filters so partial runs only update what they measured
+            with open(path) as f:
+                existing = json.load(f).get('results', {})
+        with open(path, 'w') as f:
+            json.dump({'meta': meta, 'results': {**existing, **results}}, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.baseline} (recorded on {baseline['meta'].get('node')}):")
+        rows = compare(results, baseline['results'], args.tolerance)
+        for case, time_ratio, memory_ratio, status in rows:
+            print(f"{case:<60} time x{time_ratio:>5.2f}  memory x{memory_ratio:>5.2f}  {status}")
+        if args.strict and any(status == 'REGRESSION' for *_, status in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
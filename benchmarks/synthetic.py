@@ -0,0 +1,118 @@
+"""
+Description: Synthetic inputs for the benchmarks, shaped like the real data at any scale: Product Hunt leaderboard
+pages, FictionDB book pages, OSF API records, raw LLM outputs, embedding matrices and pairwise similarity frames.
+Everything is seeded, so a given (generator, size) is identical across runs and machines.
+"""
+import json
+import random
+
+import numpy as np
+
+WORDS = ("app ai platform tool data team remote health finance music podcast story startup privacy design "
+         "marketing climate energy learning student creator video social market open source fast simple smart "
+         "community policy election economy science research budget city local global weekly daily").split()
+
+
+def sentence(rng, n_words):
+    return " ".join(rng.choice(WORDS) for _ in range(n_words)).capitalize()
+
+
+def product_hunt_html(n_products, seed=416):
+    """A leaderboard page whose __NEXT_DATA__ nests `n_products` products among unrelated nodes, plus page markup."""
+    rng = random.Random(seed)
+    state = {}
+    for i in range(n_products):
+        state[f"Post{i}"] = {'__typename': 'Post', 'id': str(i), 'name': sentence(rng, 2),
+                             'tagline': sentence(rng, rng.randint(4, 12)), 'votesCount': rng.randint(0, 5000),
+                             'topics': {'edges': [{'node': {'slug': rng.choice(WORDS)}} for _ in range(3)]}}
+        state[f"User{i}"] = {'__typename': 'User', 'id': str(i), 'username': rng.choice(WORDS)}
+    next_data = {'props': {'pageProps': {'apolloState': state}}, 'page': '/leaderboard/daily/[year]/[month]/[day]'}
+    markup = "".join(f"<div class='item'><a href='/posts/{i}'>{sentence(rng, 3)}</a></div>"
+                     for i in range(n_products))
+    return (f"<html><head><title>Leaderboard</title></head><body>{markup}"
+            f"<script id='__NEXT_DATA__' type='application/json'>{json.dumps(next_data)}</script></body></html>")
+
+
+def osf_records(n_records, seed=416):
+    """`n_records` preprint records as returned in the OSF API's `data` list."""
+    rng = random.Random(seed)
+    return [{
+        'id': f"abc{i:05d}",
+        'type': 'preprints',
+        'attributes': {
+            'title': sentence(rng, 10),
+            'description': sentence(rng, rng.randint(80, 250)),
+            'tags': [rng.choice(WORDS) for _ in range(rng.randint(0, 8))],
+            'date_created': f"2021-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00.000000",
+            'doi': None if rng.random() < 0.5 else f"10.31235/osf.io/abc{i:05d}",
+            'subjects': [[{'id': str(j), 'text': rng.choice(WORDS).title()} for j in range(rng.randint(1, 3))]
+                         for _ in range(rng.randint(1, 3))],
+            'is_published': True,
+        },
+        'links': {'self': f"https://api.osf.io/v2/preprints/abc{i:05d}/",
+                  'html': f"https://osf.io/preprints/socarxiv/abc{i:05d}/",
+                  'preprint_doi': f"https://doi.org/10.31235/osf.io/abc{i:05d}"},
+    } for i in range(n_records)]
+
+
+def fiction_book_page(n_related, seed=416):
+    """A FictionDB book page: the description div among `n_related` related-title cards and page chrome."""
+    rng = random.Random(seed)
+    cards = "".join(f"<div class='card'><a href='../title/t{i}.htm'><img src='/c/{i}.jpg'/><span>{sentence(rng, 3)}"
+                    f"</span></a><p>{sentence(rng, 20)}</p></div>" for i in range(n_related))
+    description = "".join(f"<p>{sentence(rng, 40)}</p>" for _ in range(4))
+    return (f"<html><head><title>Book</title><script>var x = 1;</script></head><body><nav>{sentence(rng, 10)}</nav>"
+            f"<div class='tab-pane fade show active' id='description'>{description}</div>"
+            f"<div id='related'>{cards}</div></body></html>")
+
+
+def llm_outputs(n_outputs, malformed_frac=0.05, seed=416):
+    """Raw LLM responses: mostly a single-key JSON object wrapped in chatter, some multi-key or with no JSON."""
+    rng = random.Random(seed)
+    outputs = []
+    for _ in range(n_outputs):
+        idea = sentence(rng, rng.randint(8, 15))
+        roll = rng.random()
+        if roll < malformed_frac / 2:
+            outputs.append(f"Here is an idea: {idea}")
+        elif roll < malformed_frac:
+            outputs.append(json.dumps({'idea': idea, 'notes': sentence(rng, 5)}))
+        else:
+            outputs.append(f"Sure! Here you go:\n{json.dumps({'idea': idea})}\nLet me know if you want more.")
+    return outputs
+
+
+def embedding_matrix(n_rows, dim=768, seed=416):
+    """Unit-normalized float32 embeddings with some shared direction, like SBERT vectors of one domain."""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, dim)).astype(np.float32) + rng.normal(size=dim).astype(np.float32)
+    return X / np.linalg.norm(X, axis=1, keepdims=True)
+
+
+def pairwise_frame(n_ai, n_human, models=('chatgpt', 'claude'), categories=('startups', 'opeds', 'podcasts'),
+                   seed=416):
+    """An all_pw_data_enriched-style frame: every AI idea paired with every human idea of its category.
+
+    Codes are laid out like an IdRegistry built from the humans and then the AI ideas: human codes are
+    0..len(categories) * n_human - 1, AI codes follow.
+    """
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    n_humans = len(categories) * n_human
+    frames = []
+    for c, category in enumerate(categories):
+        ai_codes = n_humans + (c * len(models) + np.arange(len(models) * n_ai))
+        human_codes = c * n_human + np.arange(n_human)
+        in_window = rng.integers(0, 2, n_human)
+        ai = np.repeat(np.arange(len(ai_codes)), n_human)
+        human = np.tile(np.arange(n_human), len(ai_codes))
+        frames.append(pd.DataFrame({
+            'category': category,
+            'ai_code': ai_codes[ai].astype(np.int32),
+            'human_code': human_codes[human].astype(np.int32),
+            'model': np.repeat(np.asarray(models), n_ai)[ai],
+            'in_window': in_window[human],
+            'sim': rng.random(len(ai)).astype(np.float32),
+        }))
+    return pd.concat(frames, ignore_index=True)
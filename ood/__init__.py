@@ -0,0 +1,7 @@
+"""
+Description: Out-of-distribution idea generation: fetch human-written ideas, generate AI ideas and compare them.
+
+Run `ood --help` for the command line (see ood/cli.py). Importing the package has no side effects; each module
+imports its heavy dependencies only when they are needed.
+"""
+__version__ = "0.1.0"
@@ -0,0 +1,125 @@
+"""
+Description: The `ood` command line. One entry point for every step of the project:
+
+    ood fetch {fiction,startups,opeds,preprints,podcasts} ...
+    ood generate | generate-system | generate-responses ...
+    ood embed | dedup | ingest | corpus | diversity | pipeline | telemetry | mock-server | load-test ...
+
+Only this module is imported to parse the command; the subcommand's module (and whatever heavy dependencies it
+pulls in) is imported after, so `ood --help` and light commands start fast. Arguments after the subcommand are
+handed to that module's `main(argv)`, so `ood fetch startups --help` shows the fetcher's own options.
+
+Logging is configured here and nowhere else: each command logs to its own file (as the scripts used to) unless
+`--log_file` says otherwise. Modules never configure logging at import time, so workers can import them freely.
+"""
+import argparse
+import importlib
+import logging
+import sys
+
+LOG_FORMAT = '%(asctime)s %(levelname)s: %(message)s'
+
+
+class Command:
+    """A subcommand backed by a module's `main(argv)`.
+
+    Attributes:
+        module (str): Module to import when the command runs.
+        help (str): One-line description for `ood --help`.
+        log_file (str, optional): Default log file; None logs to the console only.
+        console (bool): Also log to the console when logging to a file.
+        level (int): Logging level.
+    """
+
+    def __init__(self, module, help, log_file=None, console=False, level=logging.INFO):
+        self.module = module
+        self.help = help
+        self.log_file = log_file
+        self.console = console
+        self.level = level
+
+
+FETCHERS = {
+    'fiction': Command('ood.fetch_fiction', 'Scrape book descriptions from FictionDB', 'fetch_fiction.log'),
+    'startups': Command('ood.fetch_startups', 'Fetch Product Hunt launches', 'fetch_startups.log'),
+    'opeds': Command('ood.fetch_nyt_opeds', 'Fetch NYT op-ed metadata', 'fetch_nyt_opeds.log'),
+    'preprints': Command('ood.fetch_osf_preprints', 'Fetch OSF preprints (socarxiv, psyarxiv, ...)',
+                         'fetch_osf_preprints.log'),
+    'podcasts': Command('ood.fetch_podcasts', 'Fetch podcasts from the Podcast Index API', 'fetch_podcasts.log'),
+}
+
+COMMANDS = {
+    'generate': Command('ood.generate', 'Generate AI ideas for every task and model', 'generate.log'),
+    'generate-system': Command('ood.system_result_generator', 'Generate word-count-matched system results',
+                               'system_result_generator.log'),
+    'generate-responses': Command('ood.responses_generator', 'Generate responses for the prompt tasks',
+                                  'responses_generator.log'),
+    'embed': Command('ood.embed', 'Add SBERT embeddings to a CSV of descriptions', 'embed.log'),
+    'dedup': Command('ood.near_dedup', 'Remove near-duplicate records from a JSONL (MinHash + LSH)',
+                     'near_dedup.log'),
+    'ingest': Command('ood.dataset', 'Normalize a fetched corpus into the partitioned Parquet dataset',
+                      'ingest.log'),
+    'corpus': Command('ood.corpus', 'Training-window membership for the partitioned human corpus', 'corpus.log'),
+    'ols': Command('ood.ols', 'Out-of-core OLS with robust/clustered SEs and average marginal effects', 'ols.log'),
+    'diversity': Command('ood.diversity', 'Within- and cross-model AI-AI diversity metrics', 'diversity.log'),
+    'pipeline': Command('ood.pipeline', 'Run the whole pipeline as a DAG, skipping unchanged stages',
+                        'pipeline.log', console=True),
+    'telemetry': Command('ood.telemetry', 'Summarize pipeline telemetry', level=logging.WARNING),
+    'mock-server': Command('ood.mock_llm_server', 'Offline mock of the OpenAI/Anthropic APIs'),
+    'load-test': Command('ood.load_test', 'Load-test LLM generation against a mock server',
+                         level=logging.WARNING),
+}
+
+
+def build_parser():
+    """Builds the top-level parser. Leaf commands take no options of their own; their arguments pass through."""
+    parser = argparse.ArgumentParser(prog='ood', description='Fetch, generate and analyze human and AI ideas.')
+    parser.add_argument('--log_file', default=None,
+                        help="Log file (default: one per command, e.g. fetch_startups.log); '-' logs to the console")
+    parser.add_argument('--log_level', default=None, help='Logging level, e.g. DEBUG or WARNING')
+    parser.add_argument('--telemetry', default=None, metavar='PATH',
+                        help='Append per-stage telemetry to this JSON-lines file (ood pipeline always records it)')
+    subparsers = parser.add_subparsers(dest='command', metavar='command', required=True)
+
+    fetch = subparsers.add_parser('fetch', help='Fetch human-written ideas from one source')
+    sources = fetch.add_subparsers(dest='source', metavar='source', required=True)
+    for name, command in FETCHERS.items():
+        sources.add_parser(name, help=command.help, add_help=False)
+    for name, command in COMMANDS.items():
+        subparsers.add_parser(name, help=command.help, add_help=False)
+    return parser
+
+
+def configure_logging(command, log_file=None, log_level=None):
+    """Configures the root logger for one command.
+
+    Args:
+        command (Command): The command being run.
+        log_file (str, optional): Overrides the command's log file; '-' logs to the console only.
+        log_level (str, optional): Overrides the command's level.
+    """
+    log_file = command.log_file if log_file is None else log_file
+    handlers = []
+    if log_file and log_file != '-':
+        handlers.append(logging.FileHandler(log_file, mode='w', delay=True))
+    if not handlers or command.console:
+        handlers.append(logging.StreamHandler())
+    level = getattr(logging, log_level.upper()) if log_level else command.level
+    logging.basicConfig(level=level, format=LOG_FORMAT, datefmt='%Y-%m-%d %H:%M:%S', handlers=handlers)
+
+
+def main(argv=None):
+    """Entry point for the `ood` console script."""
+    args, rest = build_parser().parse_known_args(sys.argv[1:] if argv is None else argv)
+    command = FETCHERS[args.source] if args.command == 'fetch' else COMMANDS[args.command]
+    configure_logging(command, args.log_file, args.log_level)
+    if args.telemetry:
+        from ood.telemetry import enable
+
+        enable(args.telemetry)
+    module = importlib.import_module(command.module)
+    return module.main(rest)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+Description: Training-window labels for the human corpus (the partitioned dataset written by `ood ingest`).
+
+Which models exist and when their training data ends lives in a cutoff table (`model_cutoffs.json`), not in
+code. A human item is inside a model's window if its date is on or before that model's cutoff.
+
+- `window_table` computes window membership once per human item (one int8 column per model).
+- `label_pairs` labels (ai_code, human_code, sim) pair rows by gathering from that table with integer codes, so the
+  pair data never needs to be merged with the corpus or rebuilt when a model or cutoff is added.
+- `read_window` reads the human items inside (or outside) a model's window through `dataset.read_dataset`, so
+  months on the wrong side of the cutoff are never opened.
+
+Usage:
+    ood corpus --root human_corpus --cutoffs model_cutoffs.json --output human_windows.csv
+"""
+import argparse
+import json
+import logging
+
+from ood.dataset import DATASET_DIR, read_dataset
+from ood.telemetry import track_stage
+
+CUTOFFS_FILE = 'model_cutoffs.json'
+
+
+def load_cutoffs(path=CUTOFFS_FILE):
+    """Loads the model -> training cutoff table.
+
+    Args:
+        path (str): JSON object mapping a model name (as in the `model` column of the AI ideas) to a date.
+
+    Returns:
+        A dict mapping model to its cutoff as a UTC np.datetime64[ns].
+    """
+    with open(path) as f:
+        table = json.load(f)
+    return {model: utc_datetime64([date])[0] for model, date in table.items()}
+
+
+def utc_datetime64(dates):
+    """Parses dates (strings, timestamps, tz-aware or not) into naive UTC datetime64[ns]. Unparseable dates are NaT.
+
+    Each date is parsed on its own terms (`format='mixed'`): the fetchers do not all write the same date format, and
+    otherwise pandas guesses one format from the first date and turns every date not in it into NaT.
+    """
+    import pandas as pd
+
+    parsed = pd.to_datetime(pd.Series(dates), utc=True, errors='coerce', format='mixed')
+    return parsed.dt.tz_localize(None).to_numpy()
+
+
+def read_window(root, model, cutoffs, inside=True, categories=None, columns=None):
+    """Reads the human items inside (or outside) a model's training window.
+
+    Args:
+        root (str): Dataset directory.
+        model (str): A model in `cutoffs`.
+        cutoffs (dict): Output of `load_cutoffs`.
+        inside (bool): Items inside the window (date <= cutoff) or outside it.
+        categories (list, optional): Only these categories.
+        columns (list, optional): Columns to read.
+    """
+    import numpy as np
+
+    if model not in cutoffs:
+        raise KeyError(f"No cutoff for model {model}; known models: {sorted(cutoffs)}")
+    after_cutoff = cutoffs[model] + np.timedelta64(1, 'ns')
+    if inside:
+        return read_dataset(root, columns, categories, end=after_cutoff)
+    return read_dataset(root, columns, categories, start=after_cutoff)
+
+
+def window_table(humans, cutoffs, id_col='dataset_id', date_col='date'):
+    """Computes training-window membership once per human item.
+
+    Args:
+        humans (pd.DataFrame): Human items with `id_col` and `date_col`.
+        cutoffs (dict): Output of `load_cutoffs`.
+        id_col (str): Unique id of a human item.
+        date_col (str): Date column.
+
+    Returns:
+        A DataFrame indexed by `id_col` with one int8 column per model (1 = inside that model's window).
+    """
+    import numpy as np
+    import pandas as pd
+
+    index = pd.Index(humans[id_col], name=id_col)
+    if not index.is_unique:
+        raise ValueError(f"{id_col} is not unique across the human corpus")
+    dates = utc_datetime64(humans[date_col])
+    if np.isnat(dates).any():
+        logging.warning(f"{np.isnat(dates).sum()} human items have no date and are outside every window")
+    models = list(cutoffs)
+    bounds = np.array([cutoffs[model] for model in models], dtype='datetime64[ns]')
+    flags = (dates[:, None] <= bounds[None, :]).astype(np.int8)
+    return pd.DataFrame(flags, index=index, columns=models)
+
+
+def codes_for(ids, index):
+    """Maps ids to their integer positions in `index`, raising KeyError if any id is missing."""
+    import numpy as np
+    import pandas as pd
+
+    uniques_codes, uniques = pd.factorize(np.asarray(ids))
+    positions = index.get_indexer(uniques)
+    if (positions < 0).any():
+        missing = uniques[positions < 0]
+        raise KeyError(f"{len(missing)} ids not found, e.g. {list(missing[:5])}")
+    return positions[uniques_codes]
+
+
+def label_pairs(pairs, windows, human_col='human_id', model_col='model', human_codes=None):
+    """Labels pair rows as inside or outside the AI model's training window.
+
+    Args:
+        pairs (pd.DataFrame): Rows with `human_col` and `model_col`.
+        windows (pd.DataFrame): Output of `window_table`.
+        human_col (str): Human id column.
+        model_col (str): Model column.
+        human_codes (np.ndarray, optional): Precomputed `codes_for(pairs[human_col], windows.index)`.
+
+    Returns:
+        An int8 array with one 0/1 label per row.
+    """
+    if human_codes is None:
+        human_codes = codes_for(pairs[human_col], windows.index)
+    model_codes = codes_for(pairs[model_col], windows.columns)
+    return windows.to_numpy()[human_codes, model_codes]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Training-window membership for every item of the human corpus.')
+    parser.add_argument('--root', default=DATASET_DIR, help='Dataset directory (see ood ingest)')
+    parser.add_argument('--cutoffs', default=CUTOFFS_FILE, help='JSON mapping model to training cutoff date')
+    parser.add_argument('--categories', nargs='+', default=None, help='Only these categories')
+    parser.add_argument('--output', default='human_windows.csv', help='Output CSV, one row per human item')
+    args = parser.parse_args(argv)
+
+    import numpy as np
+
+    cutoffs = load_cutoffs(args.cutoffs)
+    with track_stage('corpus_windows', root=args.root):
+        humans = read_dataset(args.root, columns=['dataset_id', 'date'], categories=args.categories)
+        windows = window_table(humans, cutoffs)
+    windows.to_csv(args.output)
+    for model in windows.columns:
+        logging.info(f"{model} (cutoff {np.datetime_as_string(cutoffs[model], unit='D')}): "
+                     f"{int(windows[model].sum())} of {len(windows)} human items inside the window")
+    logging.info(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Description: One schema and one on-disk layout for every scraped corpus.
+
+Each fetcher writes its own JSONL schema under its own file-name convention. `ingest` normalizes any of them to
+
+    dataset_id (str), category (str), text (str), date (UTC timestamp), metadata (str: JSON of the other fields)
+
+and stores the result as Parquet partitioned by category and month (hive-style; the partition columns live in the
+directory names, not in the files):
+
+    human_corpus/category=startups/month=2022-03/part-0.parquet
+
+`read_dataset` reads through a pyarrow dataset. Only the requested `columns` are decoded, and the category, date
+range and any extra `filter` are pushed down: partitions whose category or month cannot match are never opened,
+and within the rest Parquet row-group statistics on `date` skip row groups. Loading startups in 2022 touches only
+category=startups/month=2022-*.
+
+Usage:
+    ood ingest --source startups --input 2017-01-01_to_2024-04-15_startups_dedup.jsonl
+    ood ingest --source opeds --input 2017-01-01_to_2024-04-15_nyt_headlines_dedup.jsonl --root human_corpus
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+
+from ood.telemetry import track_stage, incr
+
+DATASET_DIR = 'human_corpus'
+MANIFEST_FILE = '_manifest.json'
+
+
+class Source:
+    """How one fetcher's records map onto the common schema.
+
+    Attributes:
+        category (str): Category (partition) the records go to.
+        text_field (str): Field holding the text.
+        id_prefix (str): Prefix of the dataset_ids assigned to records that have none, as the fetchers name them.
+    """
+
+    def __init__(self, category, text_field, id_prefix):
+        self.category = category
+        self.text_field = text_field
+        self.id_prefix = id_prefix
+
+
+SOURCES = {
+    'fiction': Source('fiction', 'description', 'book'),
+    'startups': Source('startups', 'description', 'startup'),
+    'opeds': Source('opeds', 'abstract', 'oped'),
+    'socarxiv': Source('socarxiv', 'description', 'socarxiv'),
+    'psyarxiv': Source('psyarxiv', 'description', 'psyarxiv'),
+    'medarxiv': Source('medarxiv', 'description', 'medarxiv'),
+    'podcasts': Source('podcasts', 'description', 'podcast'),
+}
+
+
+def arrow_schema():
+    """Schema of the stored data, partition columns included."""
+    import pyarrow as pa
+
+    return pa.schema([
+        ('dataset_id', pa.string()),
+        ('text', pa.string()),
+        ('date', pa.timestamp('ns', tz='UTC')),
+        ('metadata', pa.string()),
+        ('category', pa.string()),
+        ('month', pa.string()),
+    ])
+
+
+def partitioning():
+    """Hive-style category=/month= partitioning, with both keys read back as strings."""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return ds.partitioning(pa.schema([('category', pa.string()), ('month', pa.string())]), flavor='hive')
+
+
+def iter_records(path):
+    """Yields the records of a fetcher's output, whether JSONL or a single JSON array (old NYT files)."""
+    with open(path, 'rb') as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        if first == b'[':
+            import ijson
+
+            yield from ijson.items(f, 'item', use_float=True)
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def normalize(record, source, position):
+    """Maps one fetched record onto the common schema (the date is parsed later, a batch at a time).
+
+    Args:
+        record (dict): A record as written by the fetcher.
+        source (Source): The record's source.
+        position (int): The record's position in its file, used for a dataset_id if it has none.
+    """
+    metadata = {k: v for k, v in record.items() if k not in ('dataset_id', 'date', source.text_field)}
+    return {
+        'dataset_id': str(record.get('dataset_id') or f"{source.id_prefix}_{position}"),
+        'text': record.get(source.text_field),
+        'date': record.get('date'),
+        'metadata': json.dumps(metadata, ensure_ascii=False, default=str),
+    }
+
+
+def utc_timestamp(value):
+    """Parses a date (string, datetime or np.datetime64; naive means UTC) into a UTC pd.Timestamp."""
+    import pandas as pd
+
+    ts = pd.Timestamp(value)
+    return ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')
+
+
+def ingest(path, source, root=DATASET_DIR, batch_size=50_000):
+    """Normalizes a fetcher's output and writes it as the source's category of the dataset.
+
+    The category is rewritten from scratch, so months that no longer have records disappear. Other categories
+    under `root` are left alone. Records without a parseable date are dropped.
+
+    Args:
+        path (str): JSONL (or JSON array) written by a fetcher, e.g. a *_dedup.jsonl file.
+        source (Source): How to read the records.
+        root (str): Dataset directory.
+        batch_size (int): Records converted and written at a time.
+
+    Returns:
+        The number of records written.
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    schema = arrow_schema()
+    counts = {'rows': 0, 'dropped': 0}
+    months = set()
+
+    def to_batch(rows):
+        df = pd.DataFrame(rows, columns=['dataset_id', 'text', 'date', 'metadata'])
+        # Parse each date on its own terms; a format inferred from the first date would drop the others as NaT
+        df['date'] = pd.to_datetime(df['date'], utc=True, errors='coerce', format='mixed')
+        undated = df['date'].isna()
+        counts['dropped'] += int(undated.sum())
+        df = df[~undated]
+        df['category'] = source.category
+        df['month'] = df['date'].dt.strftime('%Y-%m')
+        months.update(df['month'].unique())
+        counts['rows'] += len(df)
+        return pa.RecordBatch.from_pandas(df, schema=schema, preserve_index=False)
+
+    def batches():
+        rows = []
+        for position, record in enumerate(iter_records(path)):
+            rows.append(normalize(record, source, position))
+            if len(rows) == batch_size:
+                yield to_batch(rows)
+                rows = []
+        if rows:
+            yield to_batch(rows)
+
+    category_dir = os.path.join(root, f"category={source.category}")
+    with track_stage('ingest', category=source.category, input=path):
+        shutil.rmtree(category_dir, ignore_errors=True)
+        ds.write_dataset(batches(), root, schema=schema, format='parquet', partitioning=partitioning(),
+                         basename_template='part-{i}.parquet', existing_data_behavior='overwrite_or_ignore')
+        # Counted here rather than per batch: pyarrow may pull batches from its own threads
+        incr('items', counts['rows'])
+
+    if counts['dropped']:
+        logging.warning(f"Dropped {counts['dropped']} records without a parseable date from {path}")
+    os.makedirs(category_dir, exist_ok=True)
+    with open(os.path.join(category_dir, MANIFEST_FILE), 'w') as f:
+        json.dump({'input': path, 'category': source.category, 'rows': counts['rows'],
+                   'dropped': counts['dropped'], 'months': sorted(months)}, f, indent=2)
+    logging.info(f"Wrote {counts['rows']} {source.category} records in {len(months)} months to {root}")
+    return counts['rows']
+
+
+def date_filter(start=None, end=None):
+    """A pushdown filter for `start <= date < end`.
+
+    The month predicate lets pyarrow prune whole partitions; the date predicate is checked against row-group
+    statistics and then row by row.
+
+    Args:
+        start: Inclusive lower bound (anything `utc_timestamp` accepts), or None.
+        end: Exclusive upper bound, or None.
+
+    Returns:
+        A pyarrow expression, or None if neither bound is given.
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    expr = None
+    if start is not None:
+        start = utc_timestamp(start)
+        expr = ((ds.field('month') >= start.strftime('%Y-%m'))
+                & (ds.field('date') >= pa.scalar(start, type=pa.timestamp('ns', tz='UTC'))))
+    if end is not None:
+        end = utc_timestamp(end)
+        last = end - pd.Timedelta(1, 'ns')
+        upper = ((ds.field('month') <= last.strftime('%Y-%m'))
+                 & (ds.field('date') < pa.scalar(end, type=pa.timestamp('ns', tz='UTC'))))
+        expr = upper if expr is None else expr & upper
+    return expr
+
+
+def read_dataset(root=DATASET_DIR, columns=None, categories=None, start=None, end=None, filter=None):
+    """Reads part of the dataset into a DataFrame, pushing the projection and predicates down to the scan.
+
+    Args:
+        root (str): Dataset directory.
+        columns (list, optional): Columns to read (any of dataset_id, category, text, date, metadata, month).
+        categories (list, optional): Only these categories.
+        start: Only records dated on or after this.
+        end: Only records dated before this.
+        filter (pyarrow.compute.Expression, optional): Any further predicate on the columns.
+
+    Returns:
+        A DataFrame; `date` is a UTC datetime column.
+    """
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(root, format='parquet', partitioning=partitioning())
+    expr = date_filter(start, end)
+    for extra in (ds.field('category').isin(list(categories)) if categories is not None else None, filter):
+        if extra is not None:
+            expr = extra if expr is None else expr & extra
+
+    n_files = len(dataset.files)
+    n_read = n_files if expr is None else sum(1 for _ in dataset.get_fragments(filter=expr))
+    logging.info(f"Reading {n_read} of {n_files} partition files from {root}")
+    with track_stage('read_dataset', root=root, categories=categories):
+        table = dataset.to_table(columns=columns, filter=expr)
+        incr('items', table.num_rows)
+    return table.to_pandas()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Normalize a fetched corpus into the partitioned Parquet dataset.')
+    parser.add_argument('--source', required=True, choices=sorted(SOURCES), help='Which fetcher wrote the input')
+    parser.add_argument('--input', required=True, help='JSONL written by the fetcher (or its _dedup.jsonl)')
+    parser.add_argument('--root', default=DATASET_DIR, help='Dataset directory')
+    parser.add_argument('--batch_size', type=int, default=50_000, help='Records converted and written at a time')
+    args = parser.parse_args(argv)
+
+    ingest(args.input, SOURCES[args.source], args.root, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
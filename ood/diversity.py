@@ -0,0 +1,232 @@
+"""
+Description: AI-AI diversity metrics per (model, category) from an embedding file like `ai_ideas_w_vec.jsonl`.
+
+For every (model, category) group it reports the within-group mean and SD of pairwise cosine similarity and a
+Vendi score. For every category and pair of models it reports the cross-model mean and SD.
+
+Exact pairwise stats are computed with tiled matmuls. Within a group only tiles on or above the diagonal are
+computed, and the diagonal tile only contributes its strict upper triangle, so each pair is counted once and the
+n x n matrix never exists in memory. Groups with more pairs than `--exact_max_pairs` fall back to an unbiased
+estimator from uniformly sampled pairs, which also reports a normal-approximation confidence interval.
+
+The Vendi score is exp(entropy of the eigenvalues of K / n), where K is the cosine kernel. The nonzero
+eigenvalues of X X^T / n equal those of X^T X / n, so the d x d Gram matrix is used instead of the n x n one.
+
+Usage:
+    ood diversity --input ai_ideas_w_vec.jsonl --output diversity_metrics.csv
+"""
+import argparse
+import itertools
+import json
+import logging
+from collections import defaultdict
+from statistics import NormalDist
+
+from ood.telemetry import track_stage, incr
+
+
+def load_group_embeddings(path, group_cols=('model', 'category'), vec_col='vec'):
+    """Streams an embedding JSONL into unit-normalized float32 arrays per group.
+
+    Args:
+        path (str): JSONL with one record per idea, holding `vec_col` and `group_cols`.
+        group_cols (tuple): Columns that define a group.
+        vec_col (str): Embedding column.
+
+    Returns:
+        A dict mapping group tuples to (n, d) arrays whose rows have unit norm.
+    """
+    import numpy as np
+
+    rows = defaultdict(list)
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            rows[tuple(record[c] for c in group_cols)].append(record[vec_col])
+    groups = {}
+    for key, vecs in rows.items():
+        X = np.asarray(vecs, dtype=np.float32)
+        norms = np.linalg.norm(X, axis=1, keepdims=True)
+        groups[key] = X / np.where(norms == 0, 1, norms)
+    return groups
+
+
+def _summarize(total, total_sq, n_pairs):
+    import numpy as np
+
+    mean = float(total / n_pairs)
+    sd = float(np.sqrt(max(total_sq / n_pairs - mean ** 2, 0.0)))
+    return {'mean_sim': mean, 'sd_sim': sd, 'n_pairs': n_pairs}
+
+
+def within_pairwise_stats(X, tile=2048):
+    """Exact mean and SD of cosine similarity over the pairs i < j of a group.
+
+    Args:
+        X (np.ndarray): (n, d) unit-normalized embeddings.
+        tile (int): Rows per tile; memory is O(tile ** 2).
+
+    Returns:
+        A dict with mean_sim, sd_sim and n_pairs (None stats if fewer than two rows).
+    """
+    import numpy as np
+
+    n = len(X)
+    if n < 2:
+        return {'mean_sim': None, 'sd_sim': None, 'n_pairs': 0}
+    total = total_sq = 0.0
+    for i in range(0, n, tile):
+        for j in range(i, n, tile):
+            block = X[i:i + tile] @ X[j:j + tile].T
+            if i == j:
+                block = block[np.triu_indices(len(block), k=1)]
+            block = block.astype(np.float64)
+            total += block.sum()
+            total_sq += np.square(block).sum()
+    return _summarize(total, total_sq, n * (n - 1) // 2)
+
+
+def cross_pairwise_stats(X, Y, tile=2048):
+    """Exact mean and SD of cosine similarity over all pairs (x, y) with x in X and y in Y."""
+    import numpy as np
+
+    if len(X) == 0 or len(Y) == 0:
+        return {'mean_sim': None, 'sd_sim': None, 'n_pairs': 0}
+    total = total_sq = 0.0
+    for i in range(0, len(X), tile):
+        for j in range(0, len(Y), tile):
+            block = (X[i:i + tile] @ Y[j:j + tile].T).astype(np.float64)
+            total += block.sum()
+            total_sq += np.square(block).sum()
+    return _summarize(total, total_sq, len(X) * len(Y))
+
+
+def sampled_pairwise_stats(X, Y=None, n_samples=1_000_000, confidence=0.95, seed=416, chunk=100_000):
+    """Estimates mean pairwise cosine similarity from uniformly sampled pairs.
+
+    Pairs are drawn with replacement from the distinct pairs (i != j within X, or any pair across X and Y), so the
+    sample mean is an unbiased estimator of the exact mean.
+
+    Args:
+        X (np.ndarray): (n, d) unit-normalized embeddings.
+        Y (np.ndarray, optional): Second group for cross-group similarity; None means within X.
+        n_samples (int): Pairs to sample.
+        confidence (float): Confidence level of the interval.
+        seed (int): Random seed.
+        chunk (int): Pairs scored per vectorized step.
+
+    Returns:
+        A dict with mean_sim, sd_sim, n_pairs (population size), n_sampled, ci_low and ci_high.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    within = Y is None
+    Y = X if within else Y
+    n_pairs = len(X) * (len(X) - 1) // 2 if within else len(X) * len(Y)
+    total = total_sq = 0.0
+    for start in range(0, n_samples, chunk):
+        size = min(chunk, n_samples - start)
+        i = rng.integers(0, len(X), size)
+        if within:
+            # Draw j from the other n - 1 rows so i != j
+            j = rng.integers(0, len(X) - 1, size)
+            j += j >= i
+        else:
+            j = rng.integers(0, len(Y), size)
+        sims = np.einsum('ij,ij->i', X[i], Y[j]).astype(np.float64)
+        total += sims.sum()
+        total_sq += np.square(sims).sum()
+    mean = float(total / n_samples)
+    sd = float(np.sqrt(max((total_sq - n_samples * mean ** 2) / (n_samples - 1), 0.0)))
+    half_width = NormalDist().inv_cdf(0.5 + confidence / 2) * sd / n_samples ** 0.5
+    return {'mean_sim': mean, 'sd_sim': sd, 'n_pairs': n_pairs, 'n_sampled': n_samples,
+            'ci_low': mean - half_width, 'ci_high': mean + half_width}
+
+
+def vendi_score(X):
+    """Vendi score of unit-normalized embeddings under the cosine kernel.
+
+    Args:
+        X (np.ndarray): (n, d) unit-normalized embeddings.
+
+    Returns:
+        The effective number of distinct items, between 1 and n (None for an empty group).
+    """
+    import numpy as np
+
+    if len(X) == 0:
+        return None
+    X = X.astype(np.float64)
+    eigenvalues = np.linalg.eigvalsh(X.T @ X / len(X))
+    eigenvalues = eigenvalues[eigenvalues > 1e-12]
+    return float(np.exp(-np.sum(eigenvalues * np.log(eigenvalues))))
+
+
+def pairwise_stats(X, Y=None, exact_max_pairs=50_000_000, n_samples=1_000_000, tile=2048, seed=416):
+    """Exact stats when the number of pairs is at most `exact_max_pairs`, otherwise the sampled estimator."""
+    n_pairs = len(X) * (len(X) - 1) // 2 if Y is None else len(X) * len(Y)
+    if n_pairs <= exact_max_pairs:
+        stats = within_pairwise_stats(X, tile) if Y is None else cross_pairwise_stats(X, Y, tile)
+        return {**stats, 'method': 'exact'}
+    stats = sampled_pairwise_stats(X, Y, n_samples=n_samples, seed=seed)
+    return {**stats, 'method': 'sampled'}
+
+
+def diversity_metrics(groups, exact_max_pairs=50_000_000, n_samples=1_000_000, tile=2048, seed=416):
+    """Computes within-model and cross-model diversity metrics.
+
+    Args:
+        groups (dict): Output of `load_group_embeddings` keyed by (model, category).
+        exact_max_pairs (int): Largest pair count computed exactly.
+        n_samples (int): Pairs sampled when a comparison is too large to compute exactly.
+        tile (int): Tile size for exact computation.
+        seed (int): Random seed for sampling.
+
+    Returns:
+        A DataFrame with one row per within-model group and per cross-model pair within a category.
+    """
+    rows = []
+    for (model, category), X in sorted(groups.items()):
+        with track_stage('diversity', category=category, model=model):
+            stats = pairwise_stats(X, None, exact_max_pairs, n_samples, tile, seed)
+            incr('items', stats['n_pairs'] if stats['method'] == 'exact' else stats['n_sampled'])
+        rows.append({'kind': 'within', 'category': category, 'model_a': model, 'model_b': model, 'n_a': len(X),
+                     'n_b': len(X), 'vendi': vendi_score(X), **stats})
+
+    categories = sorted({category for _, category in groups})
+    for category in categories:
+        models = sorted(model for model, c in groups if c == category)
+        for model_a, model_b in itertools.combinations(models, 2):
+            X, Y = groups[(model_a, category)], groups[(model_b, category)]
+            with track_stage('diversity', category=category, model=f"{model_a}|{model_b}"):
+                stats = pairwise_stats(X, Y, exact_max_pairs, n_samples, tile, seed)
+            rows.append({'kind': 'cross', 'category': category, 'model_a': model_a, 'model_b': model_b,
+                         'n_a': len(X), 'n_b': len(Y), 'vendi': None, **stats})
+    import pandas as pd
+
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Within- and cross-model AI-AI diversity metrics.')
+    parser.add_argument('--input', default='ai_ideas_w_vec.jsonl', help='Embedding JSONL')
+    parser.add_argument('--output', default='diversity_metrics.csv', help='Output CSV')
+    parser.add_argument('--exact_max_pairs', type=int, default=50_000_000,
+                        help='Comparisons with more pairs than this are estimated by sampling')
+    parser.add_argument('--n_samples', type=int, default=1_000_000, help='Pairs sampled per estimated comparison')
+    parser.add_argument('--tile', type=int, default=2048, help='Rows per tile in exact computation')
+    parser.add_argument('--seed', type=int, default=416, help='Random seed')
+    args = parser.parse_args(argv)
+
+    groups = load_group_embeddings(args.input)
+    logging.info(f"Loaded {sum(len(X) for X in groups.values())} embeddings in {len(groups)} groups")
+    metrics = diversity_metrics(groups, args.exact_max_pairs, args.n_samples, args.tile, args.seed)
+    metrics.to_csv(args.output, index=False)
+    logging.info(f"Wrote {len(metrics)} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
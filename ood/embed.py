@@ -0,0 +1,50 @@
+import argparse
+from ood.telemetry import track_stage, incr
+
+def process_csv_and_save_embeddings(csv_filepath, output_filename, model_name="all-MiniLM-L6-v2"):
+    """
+    Process a CSV file to add SBERT embeddings to each row and save as a .jsonl file.
+
+    Parameters:
+    - csv_filepath: Path to the CSV file to process.
+    - output_filename: Name of the .jsonl file to save the output.
+    - model_name: SentenceTransformer model to encode with.
+    """
+    import pandas as pd
+    from sentence_transformers import SentenceTransformer
+
+    # Load CSV into DataFrame
+    columns = ['topic', 'type', 'desc']
+    df = pd.read_csv(csv_filepath, header=None, names=columns)
+
+    with track_stage('embed', model=model_name):
+        # Initialize the SentenceTransformer model
+        model = SentenceTransformer(model_name)
+
+        # Encode descriptions to get embeddings
+        embeddings = model.encode(df['desc'].values)
+        incr('items', len(df))
+
+    # Add embeddings to the DataFrame
+    df['embeddings'] = list(embeddings)
+
+    # Assign unique names based on index
+    df['name'] = [f"op-ed_{i}" for i in range(len(df))]
+
+    # Select relevant columns and export to .jsonl
+    df[['name', 'desc', 'embeddings']].to_json(output_filename, orient='records', lines=True)
+    print(f"Data saved to {output_filename}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Add SBERT embeddings to a CSV of descriptions.')
+    # Specify the path to your CSV file and the desired output .jsonl file name
+    parser.add_argument('--input', default='embed_ready_results.csv', help='CSV with topic, type, desc columns')
+    parser.add_argument('--output', default='results_with_embeddings.jsonl', help='Output JSONL')
+    parser.add_argument('--model', default='all-MiniLM-L6-v2', help='SentenceTransformer model')
+    args = parser.parse_args(argv)
+
+    # Process the CSV file and save the embeddings
+    process_csv_and_save_embeddings(args.input, args.output, args.model)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Author: Joshua Ashkinaze
+Date: 2023-12-04
+
+Description: Scrapes fiction book descriptions from FictionDB
+
+Note: We scrape the first (max) pages for each month, sorting books in ascending order of date.
+
+Book pages are only fetched for links not already in the description cache (`--cache`), which persists across runs,
+so reruns and overlapping date ranges mostly skip them. A book listed on several pages or months is kept once.
+Listing pages are always at least `--min_interval` seconds apart; the longer pause after a page is only taken when
+book pages were fetched for it.
+"""
+
+import argparse
+import time
+import random
+import logging
+from ood.fetch_utils import JsonlCache, RateLimiter
+from ood.telemetry import track_stage, incr
+
+
+def generate_urls(start_date, end_date, max_pages=10):
+    """Generate URLs for each month. Also scrape up to max_pages pages for each month so add page no to URL"""
+    start_year, start_month, _ = map(int, start_date.split('-'))
+    end_year, end_month, _ = map(int, end_date.split('-'))
+    months = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+    urls = []
+    for year in range(start_year, end_year + 1):
+        start_m = start_month if year == start_year else 1
+        end_m = end_month if year == end_year else 12
+        for m in range(start_m, end_m + 1):
+            month = months[m - 1]
+            for pg in range(1, max_pages):
+              url = f"https://www.fictiondb.com/new-releases/new-books-by-month.htm?date={month}-{year}&sort=da&s={pg}"
+              urls.append(url)
+    return urls
+
+def extract_description(html):
+    """Extracts the book description from a FictionDB book page.
+
+    Only the description div is parsed into a tree (SoupStrainer), instead of building the DOM of the whole page.
+
+    Returns:
+        The description, or None if the page has none.
+    """
+    import ftfy
+    from bs4 import BeautifulSoup, SoupStrainer
+    soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer('div', id='description'))
+    description_tag = soup.find('div', id='description')
+    if description_tag:
+        description = description_tag.get_text(strip=True)
+        return ftfy.fix_encoding(description)  # Fixing encoding issues
+    return None
+
+def get_book_description(link, session=None):
+    """Fetch a book page and return (fetched, description).
+
+    `fetched` is False when the request failed, so the result should not be cached; `description` is None when
+    the page has no description. `session` defaults to the requests module.
+    """
+    if session is None:
+        import requests as session
+    try:
+        headers = {'User-Agent': 'Mozilla/5.0'}
+        response = session.get(link, headers=headers)
+        incr('bytes', len(response.content))
+        if response.status_code == 429:
+            incr('http_429')
+        if response.status_code == 200:
+            return True, extract_description(response.text)
+        return False, None
+    except Exception as e:
+        logging.info(f"Error fetching book description: {e}")
+        return False, None
+
+def scrape_books_for_month(url, cache=None, seen_links=None, session=None):
+    """Scrapes one listing page and the description of every book on it.
+
+    Args:
+        url (str): Listing page URL.
+        cache (JsonlCache, optional): Persistent link -> description index. Links in it are not fetched again, and
+            newly fetched descriptions are added to it.
+        seen_links (set, optional): Links already scraped in this run. Books whose link is in it are skipped (the
+            same book shows up on several pages and months), and the links of books returned are added to it.
+        session: A requests.Session (or the requests module, the default) used for all requests.
+
+    Returns:
+        A tuple of (list of book dicts, number of book pages fetched over the network).
+    """
+    from bs4 import BeautifulSoup
+    if session is None:
+        import requests as session
+    logging.info(f"Scraping {url}")
+    try:
+        headers = {'User-Agent': 'Mozilla/5.0'}
+        response = session.get(url, headers=headers)
+        incr('bytes', len(response.content))
+        if response.status_code == 429:
+            incr('http_429')
+        if response.status_code != 200:
+            logging.info(f"Failed to fetch {url}: {response.text}")
+            return [], 0
+
+        soup = BeautifulSoup(response.text, "html.parser")
+        book_rows = soup.find_all("tr", class_=["g", "p", "r"])
+        books = []
+        page_links = set()
+        n_fetched = 0
+        for row in book_rows:
+            book = {}
+            book["author"] = row.find("a", itemprop="author").get_text(strip=True)
+            book_details_tag = row.find("a", itemprop="url")
+            book["title"] = book_details_tag.find("span", itemprop="name").get_text(strip=True)
+            book["link"] = book_details_tag['href'].replace("..", "https://www.fictiondb.com")
+            if book["link"] in page_links or (seen_links is not None and book["link"] in seen_links):
+                continue
+            book["genre"] = row.find("span", itemprop="genre").get_text(strip=True)
+            book['genre'] = book['genre'].replace(" /", "")
+            book["date"] = row.find("span", itemprop="datePublished").get_text(strip=True)
+            series_tag = row.find("td", class_="d-none d-xl-table-cell")
+            book["series"] = series_tag.get_text(strip=True) if series_tag else None
+            if cache is not None and book['link'] in cache:
+                book["description"] = cache.get(book['link'])
+                incr('cache_hits')
+            else:
+                fetched, book["description"] = get_book_description(book['link'], session)
+                if fetched and cache is not None:
+                    cache.set(book['link'], book["description"])
+                n_fetched += 1
+                time.sleep(random.uniform(0.01, 0.1))
+            books.append(book)
+            page_links.add(book["link"])
+            incr('items')
+        # Only once the page's books are returned, so a page that fails part-way does not hide its books later
+        if seen_links is not None:
+            seen_links.update(page_links)
+        if books:
+            logging.info(f"Scraped {len(books)} books for {url} ({n_fetched} description pages fetched)")
+        return books, n_fetched
+
+    except Exception as e:
+        logging.info(f"Error scraping {url}: {e}")
+        return [], 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Scrape FictionDB for book descriptions.')
+    parser.add_argument('--start_date', default="2018-01-01", type=str, help='Start date in YYYY-MM-DD format')
+    parser.add_argument('--end_date', default="2023-01-01", type=str, help='End date in YYYY-MM-DD format')
+    parser.add_argument('--max_pages', default=9, type=int, help='Max pages to scrape for each month')
+    parser.add_argument('--d', action='store_true', help='Debug mode: scrape only one page')
+    parser.add_argument('--pilot', action='store_true', help='Whether to denote this run a pilot run')
+    parser.add_argument('--cache', default='fiction_descriptions.jsonl',
+                        help='Persistent link -> description index shared across runs')
+    parser.add_argument('--min_interval', default=10.0, type=float,
+                        help='Minimum seconds between two listing page requests')
+    args = parser.parse_args(argv)
+
+    logging.info(f"Scraping FictionDB with parameters {str(args)}")
+    urls = generate_urls(args.start_date, args.end_date, args.max_pages)
+
+    if args.d:
+        urls = urls[:1]
+
+    import requests
+
+    try:
+        all_books = []
+        seen_links = set()
+        listing_limiter = RateLimiter(args.min_interval)
+        with track_stage('fetch_fiction'), JsonlCache(args.cache) as cache, requests.Session() as session:
+            logging.info(f"{len(cache)} book descriptions cached in {args.cache}")
+            for url in urls:
+                listing_limiter.wait()
+                monthly_books, n_fetched = scrape_books_for_month(url, cache, seen_links, session)
+                all_books.extend(monthly_books)
+                # Pages whose books all came from the cache only cost the listing request, which the limiter spaces out
+                if n_fetched:
+                    sleep_time = random.uniform(10, 120)
+                    logging.info("Sleeping for post-book {}".format(sleep_time))
+                    time.sleep(sleep_time)
+                    if len(all_books) % 1000 == 0:
+                        long_sleep = random.uniform(500, 800)
+                        logging.info("Sleeping for long sleep {}".format(long_sleep))
+                        time.sleep(long_sleep)
+        import pandas as pd
+        df = pd.DataFrame(all_books)
+        logging.info(f"All done. Fetched {len(df)} items")
+        df['dataset_id'] = [f"book_{i}" for i in range(len(df))]
+        fn = f"{'pilot_' if args.pilot else ''}{args.start_date}_{args.end_date}_fiction.jsonl" if not args.d else "fiction_debug.jsonl"
+        df.to_json(fn, orient='records', lines=True)
+    except Exception as e:
+        logging.error(f"Error during scraping or DataFrame creation: {e}")
+
+if __name__ == "__main__":
+  main()
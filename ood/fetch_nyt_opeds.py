@@ -0,0 +1,227 @@
+"""
+Author: Joshua Ashkinaze
+Date: 2024-01-16
+
+Description: Fetches op-eds from the New York Times API
+
+Note: With --stream, each monthly archive is parsed incrementally (ijson) and op-eds are written straight to the
+output file (in month order), so only one document per worker is held in memory. Several months are fetched at
+once, spaced out to stay inside the API quota.
+"""
+import json
+import argparse
+import logging
+from datetime import datetime
+from time import sleep
+import os
+import random
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from ood.fetch_utils import RateLimiter
+from ood.telemetry import track_stage, incr, bind
+
+
+def parse_article(d):
+    data = {
+        'headline': d['headline']['main'],
+        'abstract': d['abstract'],
+        'web_url': d['web_url'],
+        'lead_paragraph': d['lead_paragraph'],
+        'snippet': d['snippet'],
+        'date': d['pub_date'],
+        'kw': parse_keywords(d['keywords']),
+        'uri': d['uri'],
+        'author': parse_byline(d['byline']),
+        'document_type': d['document_type']
+    }
+    return data
+
+def parse_keywords(keyword_list):
+    reformatted_keywords = {}
+    for keyword in keyword_list:
+        keyword_type = keyword['name']
+        if keyword_type not in reformatted_keywords:
+            reformatted_keywords[keyword_type] = []
+        reformatted_keywords[keyword_type].append(keyword['value'])
+    return reformatted_keywords
+
+def parse_byline(byline_data):
+    parsed_byline = {'Original': byline_data.get('original', '')}
+    people = [f"{person.get('lastname', '')} {person.get('firstname', '')}".strip()
+              for person in byline_data.get('person', [])]
+    parsed_byline['People'] = ', '.join(people)
+    parsed_byline['Organizations'] = byline_data.get('organization', '')
+    return parsed_byline
+
+def month_starts(start_date, end_date):
+    """Lists the first day of every month from start_date through end_date.
+
+    Args:
+        start_date (datetime): Start of the range.
+        end_date (datetime): End of the range.
+
+    Returns:
+        A list of datetimes, one per month.
+    """
+    months = []
+    current_date = start_date
+    while current_date <= end_date:
+        months.append(current_date)
+        if current_date.month == 12:
+            current_date = datetime(current_date.year + 1, 1, 1)
+        else:
+            current_date = datetime(current_date.year, current_date.month + 1, 1)
+    return months
+
+def get_nyt_headlines(api_key, start_date, end_date):
+    import requests
+    results = []
+
+    for current_date in month_starts(start_date, end_date):
+        sleep_for = random.uniform(1, 3)
+        logging.info(f"Sleeping for {sleep_for} seconds for date {current_date}")
+        logging.info("There are currently {} results".format(len(results)))
+        sleep(sleep_for)
+        year = current_date.year
+        month = current_date.month
+        url = f'https://api.nytimes.com/svc/archive/v1/{year}/{month}.json?api-key={api_key}'
+        response = requests.get(url)
+        incr('bytes', len(response.content))
+        if response.status_code == 200:
+            data = response.json()
+            for doc in data['response']['docs']:
+                if doc['type_of_material'] == 'Op-Ed':
+                    results.append(parse_article(doc))
+                    incr('items')
+        else:
+            if response.status_code == 429:
+                incr('http_429')
+            logging.error("Failed to retrieve data from the API")
+    return results
+
+def stream_month_opeds(api_key, current_date, session, rate_limiter):
+    """Yields parsed op-eds for one month, parsing the archive as it downloads.
+
+    Args:
+        api_key (str): NYT API key.
+        current_date (datetime): Any date in the month to fetch.
+        session (requests.Session): Session to download with.
+        rate_limiter (RateLimiter): Shared limiter that keeps all workers inside the API quota.
+
+    Yields:
+        Parsed op-ed dicts, one at a time.
+    """
+    import ijson
+
+    year = current_date.year
+    month = current_date.month
+    url = f'https://api.nytimes.com/svc/archive/v1/{year}/{month}.json'
+    rate_limiter.wait()
+    logging.info(f"Streaming archive for {year}-{month:02d}")
+    with session.get(url, params={'api-key': api_key}, stream=True) as response:
+        if response.status_code != 200:
+            if response.status_code == 429:
+                incr('http_429')
+            logging.error(f"Failed to retrieve data from the API for {year}-{month:02d}: {response.status_code}")
+            return
+        response.raw.decode_content = True
+        for doc in ijson.items(response.raw, 'response.docs.item', use_float=True):
+            if doc.get('type_of_material') == 'Op-Ed':
+                incr('items')
+                yield parse_article(doc)
+        incr('bytes', response.raw.tell())
+
+def stream_nyt_headlines(api_key, start_date, end_date, filename, workers=2, min_interval=12.0):
+    """Streams op-eds for a date range straight to an NDJSON file, oldest month first.
+
+    The archive API allows 5 calls per minute, so with the default `min_interval` requests start at most every 12
+    seconds however many workers there are. The speedup over the serial loop is not a higher request rate: a month's
+    archive is tens of MB, and its download and parse overlap with the wait for the next request slot instead of
+    adding to it. Each month is spooled to its own part file and appended to `filename` in month order, so the
+    output is ordered like the serial loop's and memory stays at one document per worker.
+
+    Args:
+        api_key (str): NYT API key.
+        start_date (datetime): Start of the range.
+        end_date (datetime): End of the range.
+        filename (str): Output NDJSON path.
+        workers (int): Number of months downloaded at once.
+        min_interval (float): Minimum seconds between two API calls across all workers.
+
+    Returns:
+        Number of op-eds written.
+    """
+    import requests
+
+    rate_limiter = RateLimiter(min_interval)
+    total = 0
+
+    with open(filename, 'w') as file, requests.Session() as session:
+        def fetch_month(current_date):
+            part = f"{filename}.{current_date.strftime('%Y-%m')}.part"
+            n = 0
+            with open(part, 'w') as part_file:
+                for article in stream_month_opeds(api_key, current_date, session, rate_limiter):
+                    part_file.write(json.dumps(article) + '\n')
+                    n += 1
+            logging.info(f"Fetched {n} op-eds for {current_date.strftime('%Y-%m')}")
+            return part, n
+
+        # map yields in submission order, so months are appended oldest first as soon as each is ready
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for part, n in executor.map(bind(fetch_month), month_starts(start_date, end_date)):
+                with open(part) as part_file:
+                    shutil.copyfileobj(part_file, file)
+                os.remove(part)
+                total += n
+
+    return total
+
+def read_api_key(filepath):
+    with open(filepath, 'r') as file:
+        secrets = json.load(file)
+    return secrets.get('nyt_api', '')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='fetch some metadata about NYT op-eds (does not include full op-ed)')
+    parser.add_argument('--start_date', type=str, required=True, help='Start date in YYYY-MM-DD format')
+    parser.add_argument('--end_date', type=str, required=True, help='End date in YYYY-MM-DD format')
+    parser.add_argument('--d', action='store_true', help='Debug mode')
+    parser.add_argument('--pilot', action='store_true', help='Pilot run')
+    parser.add_argument('--stream', action='store_true',
+                        help='Parse archives incrementally and write op-eds straight to disk')
+    parser.add_argument('--workers', type=int, default=2, help='Months to download at once in stream mode')
+    parser.add_argument('--min_interval', type=float, default=12.0,
+                        help='Minimum seconds between API calls in stream mode, shared across workers')
+    args = parser.parse_args(argv)
+    logging.info("Args: " + str(args))
+    api_key = read_api_key('secrets.json')
+    if not api_key:
+        logging.error('API key not found in secrets.json')
+        return
+
+    start_date = datetime.strptime(args.start_date, '%Y-%m-%d')
+    end_date = datetime.strptime(args.end_date, '%Y-%m-%d')
+
+    if args.d:
+        logging.info('Running in debug mode')
+
+    if args.pilot:
+        filename = f"pilot_{args.start_date}_to_{args.end_date}_nyt_headlines.jsonl"
+    else:
+        filename = f"{args.start_date}_to_{args.end_date}_nyt_headlines.jsonl"
+
+    with track_stage('fetch_nyt', stream=args.stream):
+        if args.stream:
+            n = stream_nyt_headlines(api_key, start_date, end_date, filename, args.workers, args.min_interval)
+        else:
+            headlines = get_nyt_headlines(api_key, start_date, end_date)
+            with open(filename, 'w') as file:
+                for headline in headlines:
+                    file.write(json.dumps(headline) + '\n')
+            n = len(headlines)
+
+    logging.info(f"NYT headlines (n={n}) from {args.start_date} to {args.end_date} saved to {filename}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,214 @@
+"""
+Author: Joshua Ashkinaze
+Date: 2023-12-23
+
+Description: Scrapes preprint data from OSF pre-print servers. Providers include:
+- socarxiv
+- psyarxiv
+
+Note: To inspect pre-print objects look at this sample
+https://api.osf.io/v2/preprints/4ztrp/
+
+"""
+from datetime import datetime, timedelta
+import argparse
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ood.fetch_utils import RateLimiter
+from ood.telemetry import track_stage, incr, bind
+
+
+def parse_osf_preprint(info):
+    data = {
+        'osf_id': info['id'],
+        'title': info['attributes']['title'],
+        'description': info['attributes']['description'],
+        'tags': list(set(info['attributes']['tags'])),
+        'date': info['attributes']['date_created'],
+        'doi': info['attributes']['doi'],
+        'subjects':extract_text_tags(info),
+        'is_published': info['attributes']['is_published'],
+    }
+    for k in info['links'].keys():
+        data[f'{k}_url'] = info['links'][k]
+    return data
+
+def extract_text_tags(info):
+    tags = set()
+    for subject_group in info['attributes']['subjects']:
+        for subject in subject_group:
+            tags.add(subject['text'])
+    return list(tags)
+
+def month_windows(start_date, end_date):
+    """Splits a date range into (month_start, month_end) windows.
+
+    Args:
+        start_date (datetime): Start of the range.
+        end_date (datetime): End of the range.
+
+    Returns:
+        A list of (start, end) datetime tuples, one per calendar month, oldest first.
+    """
+    windows = []
+    current_month_start = start_date
+    while current_month_start < end_date:
+        current_month_end = min(last_day_of_month(current_month_start), end_date)
+        windows.append((current_month_start, current_month_end))
+        current_month_start = current_month_end + timedelta(days=1)
+    return windows
+
+def fetch_month(base_url, month_start, month_end, max_results_per_month, seen_ids, seen_lock, rate_limiter,
+                page_size=100):
+    """
+    Fetches up to `max_results_per_month` preprints created in one month window.
+
+    Pagination follows the `links.next` URL the API hands back rather than counting pages ourselves.
+
+    Args:
+        base_url (str): Preprint endpoint for the provider.
+        month_start (datetime): Start of the window.
+        month_end (datetime): End of the window.
+        max_results_per_month (int): Cap on preprints kept for this window.
+        seen_ids (set): OSF ids already kept by any window; shared across threads.
+        seen_lock (threading.Lock): Guards `seen_ids`.
+        rate_limiter (RateLimiter): Shared limiter so all threads respect the API's rate limit.
+        page_size (int): Value for `page[size]` (the OSF API allows up to 100).
+
+    Returns:
+        A list of parsed preprints for the window, in API (oldest first) order.
+    """
+    logging.info(f"Processing preprints for month: {month_start.strftime('%Y-%m')}")
+    monthly_results = []
+    url = base_url
+    params = {
+        'filter[date_created][gte]': month_start.isoformat(),
+        'filter[date_created][lte]': month_end.isoformat(),
+        'sort': 'date_created',
+        'page[size]': page_size
+    }
+
+    import requests
+
+    with requests.Session() as session:
+        while url and len(monthly_results) < max_results_per_month:
+            rate_limiter.wait()
+            response = session.get(url, params=params)
+            incr('bytes', len(response.content))
+            if response.status_code == 429:
+                incr('http_429')
+            if response.status_code != 200:
+                logging.error(f"Got status {response.status_code} for {month_start.strftime('%Y-%m')}: {response.text}")
+                break
+
+            payload = response.json()
+            for preprint in payload['data']:
+                try:
+                    parsed_preprint = parse_osf_preprint(preprint)
+                except Exception as e:
+                    logging.info(f"Error parsing preprint: {e}")
+                    continue
+                with seen_lock:
+                    if parsed_preprint['osf_id'] in seen_ids:
+                        continue
+                    seen_ids.add(parsed_preprint['osf_id'])
+                monthly_results.append(parsed_preprint)
+                incr('items')
+                if len(monthly_results) >= max_results_per_month:
+                    break
+
+            # The next link already carries the filters and page size
+            url = payload['links']['next']
+            params = None
+
+    logging.info(f"Got {len(monthly_results)} preprints for month: {month_start.strftime('%Y-%m')}")
+    return monthly_results
+
+def get_preprints(provider, start_date, end_date, max_results_per_month=50, workers=4, min_interval=1.0):
+    """
+    Fetches preprints from a given provider for a given date range. It's set up so that it gets a certain
+    amount per month over a time range and they're sorted oldest first.
+
+    Months are independent so they are fetched concurrently, with one rate limit shared by all workers.
+
+    Args:
+        provider (str): OSF preprint provider (e.g. socarxiv).
+        start_date (datetime): Start of the range.
+        end_date (datetime): End of the range.
+        max_results_per_month (int): Cap on preprints kept per month.
+        workers (int): Number of months fetched at once.
+        min_interval (float): Minimum seconds between two API calls across all workers.
+
+    Returns:
+        A tuple of (DataFrame of preprints, list of preprint dicts).
+    """
+    base_url = f"https://api.osf.io/v2/preprint_providers/{provider}/preprints/"
+    windows = month_windows(start_date, end_date)
+    seen_ids = set()
+    seen_lock = threading.Lock()
+    rate_limiter = RateLimiter(min_interval)
+
+    with track_stage('fetch_osf', provider=provider), ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(bind(fetch_month), base_url, month_start, month_end, max_results_per_month,
+                                   seen_ids, seen_lock, rate_limiter)
+                   for month_start, month_end in windows]
+        # Collect in month order so output stays sorted oldest first
+        results = []
+        for future in futures:
+            results.extend(future.result())
+
+    import pandas as pd
+    results_df = pd.DataFrame(results)
+    return results_df, results
+
+def last_day_of_month(any_day):
+    next_month = any_day.replace(day=28) + timedelta(days=4)  # this will never fail
+    return next_month - timedelta(days=next_month.day)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Scrapes preprint data from OSF pre-print servers.')
+
+
+    parser.add_argument('--start_date', type=str,
+                        help='Start date in YYYY-MM-DD format')
+    parser.add_argument('--end_date', type=str,
+                        help='End date in YYYY-MM-DD format')
+    parser.add_argument('--provider', type=str, choices=['socarxiv', 'psyarxiv', 'medarxiv'], help='Preprint provider')
+    parser.add_argument('--max_results_per_month', type=int, default=100, help='Maximum number of results to fetch')
+    parser.add_argument('--workers', type=int, default=4, help='Number of months to fetch concurrently')
+    parser.add_argument('--min_interval', type=float, default=1.0,
+                        help='Minimum seconds between API calls, shared across workers')
+    parser.add_argument('--d', action='store_true',
+                        help='Use debug settings (socarxiv, 2021-01-01 to 2021-01-02, max_results=2)')
+    parser.add_argument('--pilot', action='store_true', help='Whether to denote this run a pilot run')
+
+    args = parser.parse_args(argv)
+    logging.info(f"Scraping preprints with parameters {str(args)}")
+
+    # Handle debug settings
+    if args.d:
+        provider = "socarxiv"
+        start_date = "2021-01-01"
+        end_date =  "2022-01-01"
+        max_results_per_month = 1
+    else:
+        provider = args.provider
+        max_results_per_month = args.max_results_per_month
+        start_date = args.start_date
+        end_date = args.end_date
+
+    try:
+        start_date = datetime.strptime(start_date, '%Y-%m-%d')
+        end_date = datetime.strptime(end_date, '%Y-%m-%d')
+    except ValueError:
+        raise ValueError("Incorrect data format, should be YYYY-MM-DD")
+
+    df, r = get_preprints(provider, start_date, end_date, max_results_per_month, args.workers, args.min_interval)
+    df['dataset_id'] = [f"{provider}_{i}" for i in range(len(df))]
+    fn = f"{'pilot_' if args.pilot else ''}{args.start_date}_{args.end_date}_{provider}.jsonl" if not args.d else f"debug_{provider}.jsonl"
+    logging.info(f"Finished scraping preprints for {provider}. Got {len(df)} results")
+    df.to_json(fn, orient='records', lines=True)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,234 @@
+import hashlib
+import time
+import json
+import argparse
+from datetime import datetime
+import logging
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ood.fetch_utils import RateLimiter
+from ood.telemetry import track_stage, incr, bind
+
+
+class AuthHeaders:
+    """Caches Podcast Index auth headers and only re-signs them once they are `ttl` seconds old.
+
+    The API accepts an X-Auth-Date within a few minutes of the server clock, so there is no need to
+    compute a new SHA-1 signature for every request.
+
+    Attributes:
+        api_key (str): Podcast Index API key.
+        api_secret (str): Podcast Index API secret.
+        ttl (int): Seconds a signature is reused for.
+    """
+
+    def __init__(self, api_key, api_secret, ttl=60):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._headers = None
+        self._signed_at = 0
+
+    def get(self):
+        """Returns current auth headers, re-signing if they are stale."""
+        with self._lock:
+            now = int(time.time())
+            if self._headers is None or now - self._signed_at >= self.ttl:
+                self._headers = generate_auth_headers(self.api_key, self.api_secret, now)
+                self._signed_at = now
+            return self._headers
+
+def generate_auth_headers(api_key, api_secret, current_time=None):
+    current_time = str(int(time.time()) if current_time is None else current_time)
+    auth_header = hashlib.sha1((api_key + api_secret + current_time).encode()).hexdigest()
+
+    return {
+        "User-Agent": "YourApp/1.0",  # Replace with your app's user agent
+        "X-Auth-Key": api_key,
+        "X-Auth-Date": current_time,
+        "Authorization": auth_header
+    }
+
+def date_to_epoch(date_str):
+    return int(datetime.strptime(date_str, "%Y-%m-%d").timestamp())
+
+def make_session(pool_size):
+    """Returns a requests session whose connection pool can serve `pool_size` threads at once."""
+    import requests
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    return session
+
+def fetch_podcasts(session, since, max_results, auth, rate_limiter):
+    """Fetches trending feeds since an epoch.
+
+    Args:
+        session (requests.Session): Pooled session.
+        since (int): Epoch seconds passed as `since`.
+        max_results (int): Value for `max`.
+        auth (AuthHeaders): Cached auth headers.
+        rate_limiter (RateLimiter): Shared limiter across worker threads.
+
+    Returns:
+        A list of feed dicts (empty on failure).
+    """
+    url = "https://api.podcastindex.org/api/1.0/podcasts/trending"
+    params = {"since": since, "max": max_results, "lang": "en"}
+    import requests
+
+    rate_limiter.wait()
+    try:
+        response = session.get(url, headers=auth.get(), params=params)
+    except requests.RequestException as e:
+        logging.info(f"Error fetching since={since}: {e}")
+        return []
+    incr('bytes', len(response.content))
+    if response.status_code != 200:
+        if response.status_code == 429:
+            incr('http_429')
+        logging.info(f"Got status {response.status_code} for since={since}")
+        return []
+    return response.json().get('feeds', [])
+
+def plan_step(remaining_n, remaining_seconds, yield_per_request, step, min_step, max_step):
+    """Picks the next window size from the yield observed so far.
+
+    Args:
+        remaining_n (int): Unique podcasts still needed.
+        remaining_seconds (int): Seconds left in the date range.
+        yield_per_request (float): New unique podcasts per request in the last batch.
+        step (int): Current window size in seconds.
+        min_step (int): Smallest allowed window in seconds.
+        max_step (int): Largest allowed window in seconds.
+
+    Returns:
+        The next window size in seconds.
+    """
+    if yield_per_request <= 0:
+        # Nothing new nearby, so jump further ahead
+        return min(step * 2, max_step)
+    requests_needed = max(math.ceil(remaining_n / yield_per_request), 1)
+    return int(min(max(remaining_seconds / requests_needed, min_step), max_step))
+
+def window_quota(step, per_day):
+    """Number of feeds a window of `step` seconds may contribute under a per-day quota (at least one)."""
+    return max(round(per_day * step / 86400), 1)
+
+def get_podcast_data(start_date, end_date, desired_n, api_key, api_secret, debug, workers=4, per_request=1000,
+                     min_step_days=1, max_step_days=90, min_interval=0.2):
+    """Fetches up to `desired_n` unique podcasts spread evenly over a date range.
+
+    Like the day-by-day loop, every day has a quota of desired_n / num_days feeds, so the sample stays spread
+    evenly over the range. Windows now span several days and make one request each. A window keeps at most its
+    days times the daily quota of new feeds, and a window is never longer than one request (`per_request`) can
+    fill. The planner sizes windows from the observed yield of new unique feeds, so spans full of duplicates are
+    covered with fewer requests. Each batch of `workers` windows is requested concurrently through one pooled
+    session, and feeds are deduped by id as they arrive.
+
+    Args:
+        start_date (str): Start date in YYYY-MM-DD format.
+        end_date (str): End date in YYYY-MM-DD format.
+        desired_n (int): Number of unique podcasts wanted.
+        api_key (str): Podcast Index API key.
+        api_secret (str): Podcast Index API secret.
+        debug (bool): Limit to one day of data.
+        workers (int): Concurrent requests per batch.
+        per_request (int): Max feeds asked for per request (the API caps this at 1000).
+        min_step_days (int): Smallest window in days.
+        max_step_days (int): Largest window in days.
+        min_interval (float): Minimum seconds between API calls across workers.
+
+    Returns:
+        A list of unique feed dicts, at most `desired_n` long.
+    """
+    start_epoch = date_to_epoch(start_date)
+    end_epoch = date_to_epoch(end_date)
+
+    if debug:  # Limit to one day of data for debugging
+        end_epoch = start_epoch + 86400
+
+    num_days = (datetime.fromtimestamp(end_epoch) - datetime.fromtimestamp(start_epoch)).days + 1
+    per_day = max(desired_n // num_days, 1)
+    min_step = min_step_days * 86400
+    # A window's quota must fit in one request, or its days would be under-sampled
+    max_step = max(min(max_step_days * 86400, int(per_request / per_day * 86400)), min_step)
+    step = max_step
+
+    auth = AuthHeaders(api_key, api_secret)
+    rate_limiter = RateLimiter(min_interval)
+    podcasts = {}
+    n_requests = 0
+    current_epoch = start_epoch
+
+    with track_stage('fetch_podcasts'), make_session(workers) as session, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        while current_epoch < end_epoch and len(podcasts) < desired_n:
+            batch = [current_epoch + i * step for i in range(workers) if current_epoch + i * step < end_epoch]
+            quota = min(window_quota(step, per_day), per_request)
+            max_results = min(quota, desired_n - len(podcasts))
+            before = len(podcasts)
+            for feeds in executor.map(bind(lambda since: fetch_podcasts(session, since, max_results, auth, rate_limiter)),
+                                      batch):
+                kept = 0
+                for feed in feeds:
+                    if kept == quota:
+                        break
+                    if feed['id'] not in podcasts:
+                        podcasts[feed['id']] = feed
+                        kept += 1
+            n_requests += len(batch)
+            incr('items', len(podcasts) - before)
+            current_epoch = batch[-1] + step
+
+            yield_per_request = (len(podcasts) - before) / len(batch)
+            step = plan_step(desired_n - len(podcasts), end_epoch - current_epoch, yield_per_request, step,
+                             min_step, max_step)
+            logging.info(f"Requests={n_requests}, unique={len(podcasts)}, yield={yield_per_request:.1f}, "
+                         f"next step={step / 86400:.1f} days")
+
+    return list(podcasts.values())[:desired_n]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch podcasts from the Podcast Index API.")
+    parser.add_argument("--start_date", help="Start date in YYYY-MM-DD format")
+    parser.add_argument("--end_date", help="End date in YYYY-MM-DD format")
+    parser.add_argument("--N", type=int, help="Number of podcasts to fetch")
+    parser.add_argument("--debug", action="store_true", help="Debug mode (fetch only 1 day of data)")
+    parser.add_argument("--pilot", action="store_true", help="Pilot mode")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent requests per batch")
+    parser.add_argument("--max_step_days", type=int, default=90, help="Largest window the planner may use")
+
+    args = parser.parse_args(argv)
+    logging.info("Running with args ", str(args))
+
+
+    with open('secrets.json', 'r') as file:
+        secrets = json.load(file)
+    api_key = secrets['podcast_api']
+    api_secret = secrets['podcast_secret']
+
+    podcasts = get_podcast_data(args.start_date, args.end_date, args.N, api_key, api_secret, args.debug,
+                                workers=args.workers, max_step_days=args.max_step_days)
+    logging.info(f"Got podcasts, N= {len(podcasts)}")
+
+    if args.debug:
+        filename = "podcasts_debug.jsonl"
+    else:
+        filename = f"{'pilot_' if args.pilot else ''}_{args.start_date}_to_{args.end_date}_podcasts.jsonl"
+
+    import pandas as pd
+    podcasts_df = pd.DataFrame(podcasts)
+    podcasts_df['dataset_id'] = [f"podcast_{i}" for i in range(len(podcasts_df))]
+    podcasts_df['date'] = podcasts_df['newestItemPublishTime'].apply(lambda x: datetime.fromtimestamp(x).strftime("%Y-%m-%d"))
+    podcasts_df.to_json(filename, orient='records', lines=True)
+    logging.info("Wrote to json")
+
+
+
+if __name__ == "__main__":
+    main()
+
@@ -6,23 +6,31 @@ Description: Fetches ProductHunt data from the `time travel` page
 """
 
 import json
-import requests
 import random
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
-import pandas as pd
 import argparse
 import logging
 import time
-from tenacity import retry, wait_fixed, stop_after_attempt
-import os
+from ood.telemetry import track_stage, incr
 
-LOG_FORMAT = '%(asctime)s %(levelname)s: %(message)s'
-logging.basicConfig(filename=f'{os.path.basename(__file__)}.log', level=logging.INFO, format=LOG_FORMAT, datefmt='%Y-%m-%d %H:%M:%S', filemode='w')
 
-@retry(wait=wait_fixed(300), stop=stop_after_attempt(3))
 def fetch_html(url):
+    """Fetches a page, retrying up to 3 times 5 minutes apart."""
+    from tenacity import Retrying, wait_fixed, stop_after_attempt
+
+    for attempt in Retrying(wait=wait_fixed(300), stop=stop_after_attempt(3),
+                            before_sleep=lambda retry_state: incr('retries')):
+        with attempt:
+            return _fetch_html_once(url)
+
+
+def _fetch_html_once(url):
+    import requests
+
     response = requests.get(url)
+    incr('bytes', len(response.content))
+    if response.status_code == 429:
+        incr('http_429')
     #print(url)
     #print(response.text)
     response.raise_for_status()
@@ -46,19 +54,17 @@ def find_products(json_data):
             products.extend(find_products(item))
     return products
 
-def fetch_product_hunt_data_for_date(current_date):
-    #print(current_date)
-    year = current_date.year
-    month = current_date.month
-    day = current_date.day
-    logging.info(f"Fetching data for {year}-{month}-{day}")
+def parse_product_hunt_page(html_content, date_string):
+    """Extracts the products embedded in a leaderboard page's __NEXT_DATA__ script.
 
-    url = f"https://www.producthunt.com/leaderboard/daily/{year}/{month}/{day}/all"
-    html_content = fetch_html(url)
-    #print(html_content)
-    if not html_content:
-        return []
+    Args:
+        html_content (str): Leaderboard page HTML.
+        date_string (str): Date (YYYY-MM-DD) to stamp on every product.
 
+    Returns:
+        A list of product dicts (empty if the page has no product data).
+    """
+    from bs4 import BeautifulSoup
     soup = BeautifulSoup(html_content, 'html.parser')
     #print(soup)
     next_data_script = soup.find('script', {'id': '__NEXT_DATA__'})
@@ -66,18 +72,31 @@ def fetch_product_hunt_data_for_date(current_date):
         try:
             next_data = json.loads(next_data_script.string)
             products = find_products(next_data)
-            date_string = f"{year}-{month:02d}-{day:02d}"
             for product in products:
                 product['date'] = date_string
             return products
         except Exception as e:
-            logging.info(f"Error for {year}-{month}-{day}: {e}")
+            logging.info(f"Error for {date_string}: {e}")
             return []
     else:
-        logging.info(f"Found nothing for {year}-{month}-{day}")
+        logging.info(f"Found nothing for {date_string}")
+        return []
+
+def fetch_product_hunt_data_for_date(current_date):
+    #print(current_date)
+    year = current_date.year
+    month = current_date.month
+    day = current_date.day
+    logging.info(f"Fetching data for {year}-{month}-{day}")
+
+    url = f"https://www.producthunt.com/leaderboard/daily/{year}/{month}/{day}/all"
+    html_content = fetch_html(url)
+    #print(html_content)
+    if not html_content:
         return []
+    return parse_product_hunt_page(html_content, f"{year}-{month:02d}-{day:02d}")
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Fetch product data from Product Hunt.")
     parser.add_argument('--start_date', type=str, nargs='?', default='2023-01-01',
                         help='Start date in YYYY-MM-DD format')
@@ -86,7 +105,7 @@ def main():
     parser.add_argument('--d', action='store_true', help='Run in debug mode (one day only)')
     parser.add_argument('--pilot', action='store_true', help='Whether to denote this run a pilot run')
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.d:
         logging.info("Running in debug mode")
@@ -100,16 +119,19 @@ def main():
     date_range = [start_date_obj + timedelta(days=x) for x in range((end_date_obj - start_date_obj).days + 1)]
 
     flat_products_list = []
-    for current_date in date_range:
-        date_results = fetch_product_hunt_data_for_date(current_date)
-        flat_products_list.extend(date_results)
-        sleep_time = random.uniform(0.5, 1.5)
-        if len(flat_products_list) % 1000 == 0:
-            sleep_time = random.uniform(5, 30)
-            logging.info("Sleeping for 5-30 seconds long sleep {}".format(sleep_time))
-        logging.info(f"Sleeping for post-date {sleep_time}")
-        time.sleep(sleep_time)
+    with track_stage('fetch_startups'):
+        for current_date in date_range:
+            date_results = fetch_product_hunt_data_for_date(current_date)
+            flat_products_list.extend(date_results)
+            incr('items', len(date_results))
+            sleep_time = random.uniform(0.5, 1.5)
+            if len(flat_products_list) % 1000 == 0:
+                sleep_time = random.uniform(5, 30)
+                logging.info("Sleeping for 5-30 seconds long sleep {}".format(sleep_time))
+            logging.info(f"Sleeping for post-date {sleep_time}")
+            time.sleep(sleep_time)
 
+    import pandas as pd
     products_range = pd.DataFrame(flat_products_list)
     products_range.columns = ['name', 'description', 'date']
     products_range = products_range.drop_duplicates(subset=['name', 'description'])
@@ -0,0 +1,101 @@
+"""
+Description: Small helpers shared by the fetchers:
+
+- `RateLimiter` lets several worker threads hit the same API without going over its quota.
+- `JsonlCache` is a persistent key -> value map, so reruns and overlapping date ranges don't refetch what an
+  earlier run already downloaded.
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+
+class RateLimiter:
+    """Spaces out calls so that at most one call starts every `min_interval` seconds, across all threads.
+
+    Attributes:
+        min_interval (float): Minimum number of seconds between the start of two calls.
+    """
+
+    def __init__(self, min_interval):
+        """Initializes the limiter.
+
+        Args:
+            min_interval (float): Minimum number of seconds between the start of two calls.
+        """
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        """Blocks until the caller is allowed to make its next call."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class JsonlCache:
+    """A persistent key -> value map backed by an append-only JSONL file.
+
+    The file is read into a dict once. Each `set` appends one {"key": ..., "value": ...} line and flushes it, so
+    entries survive a crash and are served from memory on the next run. When a key repeats, the last line wins.
+
+    Attributes:
+        path (str): JSONL path.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._data = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line_no, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A line cut short by a crash; the key is simply fetched again
+                        logging.warning(f"Skipping unreadable line {line_no} of {path}")
+                        continue
+                    self._data[entry['key']] = entry['value']
+        self._file = open(path, 'a', encoding='utf-8')
+        if self._file.tell() and not self._ends_with_newline():
+            self._file.write('\n')
+
+    def _ends_with_newline(self):
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def set(self, key, value):
+        """Stores a value in memory and appends it to the file."""
+        with self._lock:
+            self._data[key] = value
+            self._file.write(json.dumps({'key': key, 'value': value}, ensure_ascii=False) + '\n')
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,216 @@
+"""
+This script generates responses for a set of tasks using the LiteLLM API and saves the responses. 
+To run the file, add a `.env` with API keys in the folder you run `ood generate` from.
+"""
+import argparse
+import os
+import logging
+from ood.telemetry import track_stage, incr
+from ood.llm_utils import sample_batches, choice_texts, hedged_completion, load_deployments, MAX_N
+
+
+def initialize_lite_llm():
+    """
+    Initialize the LiteLLM with the API key from the .env file.
+    """
+    from dotenv import load_dotenv
+    load_dotenv()
+    os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY")
+    os.environ["ANTHROPIC_API_KEY"] = os.getenv("ANTHROPIC_API_KEY")
+    os.environ["MISTRAL_API_KEY"] = os.getenv("MISTRAL_API_KEY")
+
+def is_rate_limit(e):
+    """True if `e` is LiteLLM's RateLimitError (imported here so litellm only loads once a call is made)."""
+    from litellm.exceptions import RateLimitError
+    return isinstance(e, RateLimitError)
+
+def safe_completion(task, model, n=1, deployments=None, max_attempts=10, retry_wait=60, **kwargs):
+    """
+    Safely complete the task using the specified model, handling rate limits.
+
+    Calls that run past the model's observed p95 latency are hedged, and failing deployments fail over to the
+    next equivalent one.
+
+    Args:
+        task (dict): Task with a "prompt".
+        model (str): LiteLLM model name.
+        n (int): Number of completions to ask for in this one call.
+        deployments (list, optional): Equivalent deployments/keys for this model (see llm_utils.hedged_completion).
+        max_attempts (int): Tries before a rate limit error is raised; 1 raises the first one.
+        retry_wait (float): Seconds to wait after a rate limit error before trying again.
+        **kwargs: Passed to the completion call (e.g. temperature, max_tokens).
+
+    Returns:
+        A list of response texts, one per choice.
+    """
+    if max_attempts <= 1:
+        return _completion_once(task, model, n, deployments, **kwargs)
+    from tenacity import Retrying, wait_fixed, stop_after_attempt, retry_if_exception
+
+    for attempt in Retrying(retry=retry_if_exception(is_rate_limit), wait=wait_fixed(retry_wait),
+                            stop=stop_after_attempt(max_attempts), reraise=True,
+                            before_sleep=lambda retry_state: incr('retries')):
+        with attempt:
+            return _completion_once(task, model, n, deployments, **kwargs)
+
+def _completion_once(task, model, n, deployments, **kwargs):
+    """One safe_completion attempt; rate limits are counted and re-raised for the caller to retry."""
+    messages = [{"content": task["prompt"], "role": "user"}]
+    if n > 1:
+        kwargs["n"] = n
+    try:
+        response = hedged_completion(
+            model,
+            messages,
+            deployments=deployments,
+            **kwargs
+        )
+        response_texts = choice_texts(response)
+        incr('tokens', response['usage']['total_tokens'])
+        return response_texts
+    except Exception as e:
+        if is_rate_limit(e):
+            incr('http_429')
+        logging.info(f"Error during completion: {str(e)}")
+        raise
+
+def sample_range(task, model, start, n, deployments=None):
+    """Requests samples `start` to `start + n` in one call, falling back to one call per sample if it fails.
+
+    A batch that fails for any reason other than rate limiting (which `safe_completion` already retried) is sent
+    again one sample at a time, so one bad request only loses the samples that fail on their own.
+
+    Returns:
+        A list of (sample_index, response_text) tuples for the samples that succeeded.
+    """
+    try:
+        return list(enumerate(safe_completion(task, model, n, deployments), start=start))
+    except Exception as e:
+        if n == 1 or is_rate_limit(e):
+            logging.info(f"Failed to process task: {task['category']} with model: {model}. Error: {str(e)}")
+            return []
+        logging.info(f"Batch of {n} failed for task: {task['category']} with model: {model}, retrying one sample "
+                     f"at a time. Error: {str(e)}")
+    samples = []
+    for idx in range(start, start + n):
+        samples.extend(sample_range(task, model, idx, 1, deployments))
+    return samples
+
+def generate_responses(tasks, models, num_completions=3, n_per_call=MAX_N, deployments=None):
+    """
+    Generate responses for each task and model.
+
+    Where the provider supports it, samples are requested `n_per_call` at a time and the choices are fanned out
+    into one row each. Row ids use the sample's index, so they are the same whatever the batching.
+
+    Args:
+        tasks (list): Tasks with "category" and "prompt".
+        models (list): LiteLLM model names.
+        num_completions (int): Samples per task and model.
+        n_per_call (int): Max samples per request; 1 sends one request per sample.
+        deployments (dict, optional): Model name -> list of equivalent deployments to hedge/fail over across.
+
+    Returns:
+        A list of row dicts.
+    """
+    from tqdm import tqdm
+
+    total_tasks = len(tasks) * len(models) * num_completions
+    counter = 0
+    new_data = []
+    for task in tqdm(tasks, desc='Tasks'):
+        for model in models:
+            for start, n in sample_batches(num_completions, model, n_per_call):
+                for idx, response_text in sample_range(task, model, start, n, (deployments or {}).get(model)):
+                    new_data.append({
+                        "model": model,
+                        "category": task["category"],
+                        "output": response_text,
+                        "dataset_id": f"{model}_{task['category']}_{idx}"
+                    })
+                    incr('items')
+                    if counter % 10 == 0:
+                        logging.info(f'Completed {counter} of {total_tasks} tasks')
+                        print(response_text)
+                    counter += 1
+    return new_data
+
+
+
+def main(argv=None):
+    """
+    Main function to run the entire process.
+    """
+    parser = argparse.ArgumentParser(description='Generate AI ideas for each task and model.')
+    parser.add_argument('--num_completions', type=int, default=100, help='Samples per task and model')
+    parser.add_argument('--output', type=str, default='ai_ideas.jsonl', help='Output JSONL')
+    args = parser.parse_args(argv)
+
+    import litellm
+    import pandas as pd
+
+    initialize_lite_llm()
+
+    # Define your tasks, models, and number of completions here
+    tasks = [
+        {
+            "category": "startup",
+            "prompt": """INSTRUCTIONS
+You are an expert startup founder. Return a one-line startup idea that would top Product Hunt.
+
+CONSTRAINTS:
+- Return an idea that could appear in Product Hunt
+- Return a startup idea and nothing else
+
+RETURN:
+- Return a json file of an startup idea and nothing else like {"idea": idea}
+
+"""
+        },
+
+        {
+            "category": "oped",
+            "prompt": """
+INSTRUCTIONS:
+You are an expert op-ed writer.  Return a headline for an op-ed that could appear in the New York Times.
+
+CONSTRAINTS:
+- Return a headline that could appear in the New York Times
+- Return an op-ed headline and nothing else
+
+RETURN:
+- Return a json file of an op-ed headline and nothing else like {"headline": headline}
+            """
+        },
+
+        {
+            "category": "podcast",
+            "prompt": """
+INSTRUCTIONS:
+Act like an expert podcaster. Come up with a podcast description that would be featured in Google podcasts.
+
+CONSTRAINTS:
+- Don't follow a specific structure
+- Return a description and nothing else
+
+RETURN:
+- Return a json file of a podcast description and nothing else like {"description": "description"}
+        """
+        }
+    ]
+
+    litellm.set_verbose = False
+    models = ["gpt-3.5-turbo", "gpt-4-0613", "claude-2"]
+    num_completions = args.num_completions
+    logging.info('Starting generation of responses')
+    deployments = load_deployments(os.getenv("LLM_DEPLOYMENTS", "deployments.json"))
+    logging.info("Params" + str(tasks) + str(models) + str(num_completions))
+    logging.info(f"Deployments configured for: {list(deployments)}")
+    with track_stage('generate', models=models, num_completions=num_completions):
+        new_data = generate_responses(tasks, models, num_completions, deployments=deployments)
+    df = pd.DataFrame(new_data)
+    df.to_json(args.output, lines=True, orient='records')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Description: Dense int32 codes for `dataset_id`s across corpora.
+
+Every human and AI idea gets a code in 0..n-1, in the order the ids were first added. Codes index rows of the
+embedding matrix and the similarity matrix, so downstream tables (pairs, enriched pairs) carry two int32 columns
+instead of two string ids, and joins are array gathers instead of hash merges on strings.
+
+The registry persists as a single .npz holding a fixed-width unicode array of the ids (no pickle), and resolves
+batches of ids or codes with one vectorized lookup.
+
+Example:
+    registry = IdRegistry(brief_human['dataset_id'])
+    registry.add(ai_ideas['dataset_id'])
+    registry.save('id_registry.npz')
+    pairs['ai_code'] = registry.codes(pairs['ai_id'])
+    IdRegistry.load('id_registry.npz').ids(pairs['ai_code'])
+"""
+import numpy as np
+
+
+class IdRegistry:
+    """Assigns and resolves dense int32 codes for string ids.
+
+    Args:
+        ids (iterable, optional): Initial ids; must be unique. They get codes 0..len(ids)-1 in order.
+    """
+
+    def __init__(self, ids=()):
+        self._ids = np.asarray(ids, dtype=object).ravel()
+        self._index = None
+        if not self.index.is_unique:
+            raise ValueError("ids passed to IdRegistry must be unique")
+
+    @property
+    def index(self):
+        """A pandas Index over the ids (the hash table used for lookups), built on first use."""
+        if self._index is None:
+            import pandas as pd
+
+            self._index = pd.Index(self._ids)
+        return self._index
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, dataset_id):
+        return dataset_id in self.index
+
+    def add(self, ids):
+        """Registers ids not seen before and returns the codes of all of them.
+
+        Args:
+            ids (iterable): Ids, possibly repeated or already registered.
+
+        Returns:
+            An int32 array with one code per id.
+        """
+        import pandas as pd
+
+        uniques = pd.unique(np.asarray(ids, dtype=object).ravel())
+        new = uniques[self.index.get_indexer(uniques) < 0]
+        if len(new):
+            if len(self._ids) + len(new) > np.iinfo(np.int32).max:
+                raise OverflowError("IdRegistry cannot hold more than 2**31 - 1 ids")
+            self._ids = np.concatenate([self._ids, new])
+            self._index = None
+        return self.codes(ids)
+
+    def codes(self, ids):
+        """Resolves ids to codes.
+
+        Args:
+            ids (iterable): Registered ids.
+
+        Returns:
+            An int32 array with one code per id.
+
+        Raises:
+            KeyError: If any id is not registered.
+        """
+        import pandas as pd
+
+        # Hash each distinct id once; pair tables repeat every id many times
+        inverse, uniques = pd.factorize(np.asarray(ids, dtype=object).ravel())
+        positions = self.index.get_indexer(uniques)
+        if (positions < 0).any():
+            missing = uniques[positions < 0]
+            raise KeyError(f"{len(missing)} ids not in the registry, e.g. {list(missing[:5])}")
+        return positions.astype(np.int32)[inverse]
+
+    def ids(self, codes):
+        """Resolves codes back to ids.
+
+        Args:
+            codes (iterable): Codes in 0..len(self)-1.
+
+        Returns:
+            An object array of ids.
+        """
+        return self._ids[np.asarray(codes)]
+
+    def save(self, path):
+        """Writes the registry to `path` (.npz) as a fixed-width unicode array."""
+        np.savez(path, ids=self._ids.astype(str))
+
+    @classmethod
+    def load(cls, path):
+        """Reads a registry written by `save`."""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['ids'].astype(object))
@@ -0,0 +1,316 @@
+"""
+Description: Helpers shared by the LLM generators.
+
+Multi-sample requests: the prompt is identical for every sample of a task/model, so where the provider supports the
+`n` parameter we ask for several completions in one call (one round trip, prompt tokens paid once) and fan the
+choices out into rows. Providers without `n` (e.g. Anthropic) fall back to one call per sample.
+
+Streaming with early cutoff: when only the first N words of a completion are kept, stream it, count words as
+tokens arrive and close the stream once N words are in, so we neither wait for nor pay for the rest. Several
+choices can be streamed in one call (`n`); each is cut off at its own word limit and the stream closes once all
+of them are.
+
+Hedged requests: a LatencyTracker keeps recent latencies per model. Once a call runs past that model's p95, a
+duplicate is sent (to the next equivalent deployment if there is one); the first response wins and the other call
+is cancelled. A deployment that errors fails over to the next one.
+
+LiteLLM is imported inside the functions that call it, so importing this module stays cheap.
+"""
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from ood.telemetry import incr
+
+# OpenAI caps `n` at 128 per request
+MAX_N = 128
+
+
+def supports_n(model):
+    """Checks whether a model's provider accepts the `n` parameter.
+
+    Args:
+        model (str): LiteLLM model name.
+
+    Returns:
+        True if `n` is supported, False otherwise (including when LiteLLM does not know the model).
+    """
+    import litellm
+
+    try:
+        return 'n' in (litellm.get_supported_openai_params(model=model) or [])
+    except Exception:
+        return False
+
+
+def sample_batches(num_completions, model, n_per_call=MAX_N):
+    """Splits `num_completions` samples into per-call batches.
+
+    Args:
+        num_completions (int): Total samples wanted.
+        model (str): LiteLLM model name.
+        n_per_call (int): Largest batch to request in one call; 1 disables multi-sample requests.
+
+    Returns:
+        A list of (first_sample_index, n) tuples. Sample indices are stable, so row ids do not depend on batching.
+    """
+    n = max(min(n_per_call, MAX_N), 1) if supports_n(model) else 1
+    return [(start, min(n, num_completions - start)) for start in range(0, num_completions, n)]
+
+
+def choice_texts(response):
+    """Returns the message text of every choice in a completion response."""
+    return [choice['message']['content'] for choice in response['choices']]
+
+
+def output_tokens(model, text):
+    """Counts the tokens in a piece of generated text with the model's tokenizer."""
+    import litellm
+
+    return litellm.token_counter(model=model, text=text)
+
+
+def _close_stream(stream):
+    """Closes a LiteLLM stream and the provider stream under it, dropping the HTTP connection."""
+    for obj in (stream, getattr(stream, 'completion_stream', None)):
+        close = getattr(obj, 'close', None)
+        if callable(close):
+            try:
+                close()
+            except Exception as e:
+                logging.info(f"Error closing stream: {e}")
+
+
+def collect_until_words(chunks, word_limits):
+    """Reads streamed chunks, one text per choice, until every choice has `word_limits[i]` words or has ended.
+
+    A word only counts as complete once whitespace (or another word) follows it, so the last word is never cut
+    in half. Chunks without choices (usage or keep-alive chunks) are skipped.
+
+    Args:
+        chunks (iterable): Streamed completion chunks.
+        word_limits (list): Words to keep per choice index; None reads that choice to the end.
+
+    Returns:
+        A list with the raw text received for each choice (may run past the limit by part of a chunk).
+    """
+    pieces = [[] for _ in word_limits]
+    n_words = [0] * len(word_limits)
+    done = [False] * len(word_limits)
+    for chunk in chunks:
+        for choice in chunk.choices or []:
+            i = choice.index or 0
+            if done[i]:
+                continue
+            delta = choice.delta.content if choice.delta else None
+            if delta:
+                # A chunk that starts mid-word continues the previous chunk's last word
+                continues_word = bool(pieces[i]) and not pieces[i][-1][-1].isspace() and not delta[0].isspace()
+                n_words[i] += len(delta.split()) - continues_word
+                pieces[i].append(delta)
+                limit = word_limits[i]
+                if limit is not None and (n_words[i] > limit or (n_words[i] == limit and delta[-1].isspace())):
+                    done[i] = True
+            if choice.finish_reason:
+                done[i] = True
+        if all(done):
+            break
+    return [''.join(p) for p in pieces]
+
+
+def stream_choices_until_words(model, messages, word_limits, **kwargs):
+    """Streams `len(word_limits)` choices in one call and cancels the stream once every choice has its words.
+
+    Args:
+        model (str): LiteLLM model name.
+        messages (list): Chat messages.
+        word_limits (list): Words to keep per choice; None keeps the whole choice. More than one limit sends `n`.
+        **kwargs: Passed to `completion` (e.g. max_tokens).
+
+    Returns:
+        A list with one (text truncated to its word limit, output tokens consumed before the cutoff) per choice.
+    """
+    import litellm
+
+    n_kwargs = {'n': len(word_limits)} if len(word_limits) > 1 else {}
+    stream = litellm.completion(model=model, messages=messages, stream=True, **n_kwargs, **kwargs)
+    try:
+        received = collect_until_words(stream, word_limits)
+    finally:
+        _close_stream(stream)
+
+    results = []
+    for text, limit in zip(received, word_limits):
+        tokens_consumed = output_tokens(model, text)
+        results.append((" ".join(text.split()[:limit]) if limit else text, tokens_consumed))
+    incr('tokens', litellm.token_counter(model=model, messages=messages) + sum(t for _, t in results))
+    return results
+
+
+def stream_until_words(model, messages, word_limit=None, **kwargs):
+    """Streams one completion and cancels it once `word_limit` words have arrived.
+
+    Returns:
+        A tuple of (text truncated to `word_limit` words, output tokens consumed before the cutoff).
+    """
+    return stream_choices_until_words(model, messages, [word_limit], **kwargs)[0]
+
+
+class LatencyTracker:
+    """Keeps a rolling window of call latencies per model.
+
+    Attributes:
+        window (int): Latencies kept per model.
+        min_samples (int): Latencies needed before a p95 is reported.
+    """
+
+    def __init__(self, window=200, min_samples=20):
+        self.window = window
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._latencies = defaultdict(lambda: deque(maxlen=self.window))
+
+    def record(self, model, seconds):
+        """Adds one observed latency for a model."""
+        with self._lock:
+            self._latencies[model].append(seconds)
+
+    def p95(self, model):
+        """Returns the model's 95th percentile latency, or None until `min_samples` calls have been seen."""
+        with self._lock:
+            latencies = sorted(self._latencies[model])
+        if len(latencies) < self.min_samples:
+            return None
+        return latencies[min(int(0.95 * len(latencies)), len(latencies) - 1)]
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _event_loop():
+    """Returns a long-lived event loop running in a daemon thread, so sync code can run hedged calls."""
+    import asyncio
+
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, daemon=True).start()
+        return _loop
+
+
+async def _hedged_completion(model, messages, deployments, tracker, **kwargs):
+    """Async body of `hedged_completion`."""
+    import asyncio
+    import litellm
+
+    deployments = deployments or [{}]
+    attempts = 0
+    hedged = False
+    errors = []
+
+    def launch():
+        nonlocal attempts
+        params = {'model': model, 'messages': messages, **kwargs, **deployments[attempts % len(deployments)]}
+        attempts += 1
+
+        async def call():
+            start = time.monotonic()
+            response = await litellm.acompletion(**params)
+            tracker.record(model, time.monotonic() - start)
+            return response
+
+        return asyncio.ensure_future(call())
+
+    pending = {launch()}
+    try:
+        while pending:
+            hedge_after = None if hedged else tracker.p95(model)
+            done, pending = await asyncio.wait(pending, timeout=hedge_after, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                # Past this model's p95: race a duplicate against the slow call
+                logging.info(f"Hedging {model} after {hedge_after:.1f}s")
+                incr('hedges')
+                hedged = True
+                pending.add(launch())
+                continue
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                errors.append(task.exception())
+                logging.info(f"Call to {model} failed: {task.exception()}")
+            # Hedges count as attempts, so no deployment is sent the same request twice
+            if not pending and attempts < len(deployments):
+                incr('failovers')
+                pending.add(launch())
+        raise errors[-1]
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+def load_deployments(path):
+    """Loads equivalent deployments per model from a JSON file like {"gpt-4-0613": [{"api_key": "..."}, ...]}.
+
+    Args:
+        path (str): JSON file path.
+
+    Returns:
+        A dict mapping model name to a list of deployment kwargs (empty if the file does not exist).
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def hedged_completion(model, messages, deployments=None, tracker=None, **kwargs):
+    """Runs a completion with hedging and failover across equivalent deployments.
+
+    Args:
+        model (str): LiteLLM model name; also the key latencies are tracked under.
+        messages (list): Chat messages.
+        deployments (list, optional): Extra `completion` kwargs per equivalent deployment, e.g.
+            [{"api_base": "...", "api_key": "..."}, {"model": "azure/gpt-35", ...}]. Tried in order.
+        tracker (LatencyTracker, optional): Latency history; defaults to a module-wide tracker.
+        **kwargs: Passed to every call (e.g. n, max_tokens).
+
+    Returns:
+        The first successful response.
+
+    Raises:
+        The last error if every deployment fails.
+    """
+    import asyncio
+    import concurrent.futures
+
+    tracker = tracker or LATENCY_TRACKER
+    coro = _hedged_completion(model, messages, deployments, tracker, **kwargs)
+    result = concurrent.futures.Future()
+
+    def start():
+        task = asyncio.ensure_future(coro)
+        task.add_done_callback(lambda t: _copy_outcome(t, result))
+
+    # Start the task in the caller's context, so hedges and failovers count toward the caller's telemetry stage
+    _event_loop().call_soon_threadsafe(start, context=contextvars.copy_context())
+    return result.result()
+
+
+def _copy_outcome(task, future):
+    """Copies a finished asyncio task's result, error or cancellation onto a concurrent.futures.Future."""
+    if task.cancelled():
+        future.cancel()
+    elif task.exception() is not None:
+        future.set_exception(task.exception())
+    else:
+        future.set_result(task.result())
+
+
+LATENCY_TRACKER = LatencyTracker()
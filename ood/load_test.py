@@ -0,0 +1,225 @@
+"""
+Description: Load-tests the generation path against the mock LLM server (or any OpenAI/Anthropic-compatible base URL).
+
+Builds a PromptExperiment grid from a JSON spec (the PromptExperiment arguments; DEFAULT_GRID if none is given),
+sends every prompt through the same calls the generators make, with a chosen concurrency, and reports throughput,
+latency percentiles and error rates. Requests go through `generate.safe_completion`, so they get the generators'
+hedging and failover; with --stream they go through `llm_utils.stream_choices_until_words` like the
+generators' --stream mode. The mock is passed as the model's deployment, the way real runs configure keys and
+endpoints. Use it to pick concurrency and n-per-call settings before a paid run.
+
+429s are not retried by default (--max_attempts 1), so they show up in the error rates rather than as latency.
+With --max_attempts above 1, rate-limited requests are retried after --retry_wait seconds (the mock sends
+`Retry-After: 1`); the retries are counted separately and their waits are part of those requests' latency.
+
+Usage:
+    ood load-test --spawn_server --models gpt-3.5-turbo claude-2 --N 50 --concurrency 16
+    ood load-test --api_base http://127.0.0.1:8000 --grid grid.json --stream --word_limit 15
+"""
+import argparse
+import json
+import logging
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from ood.prompt_experiment import PromptExperiment
+from ood.telemetry import bind, track_stage
+
+DEFAULT_GRID = {
+    'hyperparameters': {'model': ['gpt-3.5-turbo', 'gpt-4-0613', 'claude-2'], 'temperature': [0.7, 1.0]},
+    'N': 20,
+    'prompt_mode': 'monte_carlo',
+    'hyper_mode': 'factorial',
+    'template_prompt': "Return a one-line {category} idea that would appear on {venue}.",
+    'prompt_parameters': {'category': ['startup', 'podcast', 'op-ed'],
+                          'venue': ['Product Hunt', 'Google Podcasts', 'the New York Times']},
+}
+
+
+def percentile(values, q):
+    """Returns the q-th percentile (0-100) of a list using nearest-rank."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(round(q / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+def mock_route(model, api_base):
+    """Maps a model name to the LiteLLM model string and api_base that target the mock server.
+
+    Args:
+        model (str): Model name as used in the generators (e.g. gpt-3.5-turbo, claude-2).
+        api_base (str): Server root, e.g. http://127.0.0.1:8000.
+
+    Returns:
+        A dict of `completion` kwargs.
+    """
+    if model.startswith('claude'):
+        return {'model': f"anthropic/{model}", 'api_base': api_base, 'api_key': 'mock'}
+    return {'model': f"openai/{model}", 'api_base': f"{api_base}/v1", 'api_key': 'mock'}
+
+
+def load_grid_spec(path=None, models=None, N=None):
+    """Loads a grid spec, falling back to DEFAULT_GRID.
+
+    Args:
+        path (str, optional): JSON file with PromptExperiment keyword arguments.
+        models (list, optional): Replaces the spec's `model` hyperparameter.
+        N (int, optional): Replaces the spec's `N`.
+
+    Returns:
+        A dict of PromptExperiment keyword arguments.
+    """
+    if path:
+        with open(path) as f:
+            spec = json.load(f)
+    else:
+        spec = json.loads(json.dumps(DEFAULT_GRID))
+    if models:
+        spec['hyperparameters']['model'] = list(models)
+    if N is not None:
+        spec['N'] = N
+    return spec
+
+
+def build_grid(spec):
+    """Builds the request grid from PromptExperiment keyword arguments.
+
+    Every hyperparameter combination must include `model`; the other hyperparameters (e.g. temperature) are passed
+    to the completion call.
+
+    Returns:
+        The experiment's prompts, as dicts with 'prompt', 'prompt_params' and 'hyperparams'.
+    """
+    prompts = PromptExperiment(**spec).get_prompts()
+    if any('model' not in item['hyperparams'] for item in prompts):
+        raise ValueError("The grid's hyperparameters must include 'model'")
+    return prompts
+
+
+def run_one(item, api_base, n, stream, word_limit, max_tokens, max_attempts=1, retry_wait=1.0):
+    """Sends one grid item through the generators' completion path and times it.
+
+    `max_attempts` and `retry_wait` are passed to `safe_completion` (not used with `stream`).
+
+    Returns:
+        A dict with latency, outcome and completions received.
+    """
+    import litellm
+    from ood.llm_utils import supports_n, stream_choices_until_words
+
+    model = item['hyperparams']['model']
+    route = mock_route(model, api_base)
+    n = n if supports_n(route['model']) else 1
+    kwargs = {k: v for k, v in item['hyperparams'].items() if k != 'model'}
+    kwargs['max_tokens'] = max_tokens
+    # The OpenAI client retries 429s itself, which would hide them in the latency; only safe_completion retries here
+    kwargs['max_retries'] = 0
+    start = time.monotonic()
+    try:
+        if stream:
+            stream_kwargs = {k: v for k, v in route.items() if k != 'model'}
+            messages = [{'role': 'user', 'content': item['prompt']}]
+            completions = len(stream_choices_until_words(route['model'], messages, [word_limit] * n,
+                                                         **stream_kwargs, **kwargs))
+        else:
+            from ood.generate import safe_completion
+            task = {'category': item['prompt_params'].get('category'), 'prompt': item['prompt']}
+            completions = len(safe_completion(task, model, n, deployments=[route], max_attempts=max_attempts,
+                                              retry_wait=retry_wait, **kwargs))
+        outcome = 'ok'
+    except litellm.exceptions.RateLimitError:
+        outcome, completions = 'http_429', 0
+    except litellm.exceptions.Timeout:
+        outcome, completions = 'timeout', 0
+    except Exception as e:
+        logging.info(f"Request failed: {e}")
+        outcome, completions = type(e).__name__, 0
+    return {'latency': time.monotonic() - start, 'outcome': outcome, 'completions': completions,
+            'model': item['hyperparams']['model']}
+
+
+def report(results, wall, server_stats=None, retries=0):
+    """Summarizes load-test results.
+
+    Args:
+        results (list): Output of `run_one` per request.
+        wall (float): Wall-clock seconds for the whole test.
+        server_stats (dict, optional): Counters from the mock server's /stats.
+        retries (int): Rate-limit retries made across all requests.
+
+    Returns:
+        A dict with throughput, latency percentiles, error rates and retries.
+    """
+    ok = [r['latency'] for r in results if r['outcome'] == 'ok']
+    outcomes = Counter(r['outcome'] for r in results)
+    summary = {
+        'requests': len(results),
+        'wall_s': round(wall, 2),
+        'requests_per_s': round(len(results) / wall, 2) if wall else None,
+        'completions_per_s': round(sum(r['completions'] for r in results) / wall, 2) if wall else None,
+        'latency_s': {f"p{q}": round(percentile(ok, q), 3) if ok else None for q in (50, 90, 95, 99)},
+        'error_rates': {k: round(v / len(results), 4) for k, v in outcomes.items() if k != 'ok'},
+        'retries': retries,
+        'by_model': {m: round(percentile([r['latency'] for r in results if r['model'] == m and r['outcome'] == 'ok'],
+                                         95) or 0, 3)
+                     for m in sorted({r['model'] for r in results})},
+    }
+    if server_stats:
+        summary['server'] = server_stats
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load-test LLM generation against a mock server.')
+    parser.add_argument('--api_base', default='http://127.0.0.1:8000', help='Mock server root URL')
+    parser.add_argument('--spawn_server', action='store_true', help='Start a mock server in-process on a free port')
+    parser.add_argument('--grid', default=None, help='JSON file of PromptExperiment arguments (default: DEFAULT_GRID)')
+    parser.add_argument('--models', nargs='+', default=None, help="Replace the grid's models")
+    parser.add_argument('--N', type=int, default=None, help="Replace the grid's N")
+    parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight at once')
+    parser.add_argument('--n', type=int, default=1, help='Completions per request (OpenAI-style models only)')
+    parser.add_argument('--stream', action='store_true', help='Stream and cut off at --word_limit words')
+    parser.add_argument('--word_limit', type=int, default=15, help='Word cutoff in stream mode')
+    parser.add_argument('--max_tokens', type=int, default=100)
+    parser.add_argument('--max_attempts', type=int, default=1,
+                        help='Tries per request on 429s; 1 reports every 429 as an error')
+    parser.add_argument('--retry_wait', type=float, default=1.0, help='Seconds to wait before retrying a 429')
+    parser.add_argument('--latency', default='lognormal:-1.0,0.5', help='Mock latency spec (with --spawn_server)')
+    parser.add_argument('--rate_429', type=float, default=0.0, help='Mock 429 probability (with --spawn_server)')
+    parser.add_argument('--stall_prob', type=float, default=0.0, help='Mock stall probability (with --spawn_server)')
+    parser.add_argument('--output', default=None, help='Also write the report as JSON here')
+    args = parser.parse_args(argv)
+
+    api_base = args.api_base
+    if args.spawn_server:
+        from ood.mock_llm_server import serve
+        server = serve(port=0, latency=args.latency, rate_429=args.rate_429, stall_prob=args.stall_prob)
+        api_base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    grid = build_grid(load_grid_spec(args.grid, args.models, args.N))
+    start = time.monotonic()
+    with track_stage('load_test', concurrency=args.concurrency) as record, \
+            ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(bind(lambda item: run_one(item, api_base, args.n, args.stream, args.word_limit,
+                                                              args.max_tokens, args.max_attempts, args.retry_wait)),
+                                    grid))
+    wall = time.monotonic() - start
+
+    import requests
+
+    try:
+        server_stats = requests.get(f"{api_base}/stats", timeout=5).json()
+    except (requests.RequestException, ValueError):
+        server_stats = None
+
+    summary = report(results, wall, server_stats, record['counters']['retries'])
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
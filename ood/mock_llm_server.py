@@ -0,0 +1,328 @@
+"""
+Description: Offline stand-in for LLM APIs, so the generation path can be load-tested without paying for calls.
+
+Serves OpenAI-style `/v1/chat/completions` and Anthropic-style `/v1/messages` (plus the legacy `/v1/complete` that
+LiteLLM uses for claude-2), all with streaming (SSE). Responses are random words. Latency comes from a configurable
+distribution, stalls and 429s can be injected, and the server keeps token accounting, including how many tokens were
+actually sent before a client cancelled a stream.
+`GET /stats` returns the counters as JSON.
+
+Point LiteLLM at it with:
+    completion(model="openai/gpt-3.5-turbo", api_base="http://127.0.0.1:8000/v1", api_key="mock", ...)
+    completion(model="anthropic/claude-2", api_base="http://127.0.0.1:8000", api_key="mock", ...)
+
+Usage:
+    ood mock-server --port 8000 --latency lognormal:0.0,0.5 --rate_429 0.02 --stall_prob 0.01
+"""
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+VOCAB = ("idea platform app podcast story startup users data community local remote creative simple smart "
+         "learn build share travel health money time future world people city music food climate work").split()
+
+
+def parse_latency(spec):
+    """Turns a latency spec into a sampler.
+
+    Args:
+        spec (str): `fixed:S`, `uniform:A,B` or `lognormal:MU,SIGMA` (seconds).
+
+    Returns:
+        A function returning one latency in seconds.
+    """
+    kind, _, params = spec.partition(':')
+    values = [float(v) for v in params.split(',')] if params else []
+    if kind == 'fixed':
+        return lambda: values[0]
+    if kind == 'uniform':
+        return lambda: random.uniform(values[0], values[1])
+    if kind == 'lognormal':
+        return lambda: random.lognormvariate(values[0], values[1])
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+
+def count_tokens(text):
+    """Rough token count (whitespace words), good enough for load accounting."""
+    return len(text.split())
+
+
+def interleave_words(texts):
+    """Yields (choice index, piece, is last piece of its choice) taking one word from each text in turn.
+
+    Pieces after a choice's first word carry their leading space, so joining a choice's pieces gives its text back.
+    """
+    choice_words = [text.split() for text in texts]
+    for position in range(max((len(words) for words in choice_words), default=0)):
+        for index, words in enumerate(choice_words):
+            if position < len(words):
+                piece = words[position] if position == 0 else ' ' + words[position]
+                yield index, piece, position == len(words) - 1
+
+
+def prompt_text(body):
+    """Concatenates the text of all messages (and the Anthropic system prompt) in a request body."""
+    parts = [body.get('system', '')] if isinstance(body.get('system'), str) else []
+    if isinstance(body.get('prompt'), str):
+        parts.append(body['prompt'])
+    for message in body.get('messages', []):
+        content = message.get('content', '')
+        if isinstance(content, list):
+            content = ' '.join(block.get('text', '') for block in content if isinstance(block, dict))
+        parts.append(content)
+    return ' '.join(parts)
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    """HTTP server holding the mock's settings and counters.
+
+    Attributes:
+        latency (callable): Samples time-to-first-token in seconds.
+        token_latency (float): Seconds between streamed tokens.
+        rate_429 (float): Probability of answering 429.
+        stall_prob (float): Probability of stalling a request.
+        stall_s (float): Extra seconds a stalled request waits.
+        min_words (int): Minimum words per completion.
+        max_words (int): Maximum words per completion (also capped by max_tokens).
+    """
+    daemon_threads = True
+
+    def __init__(self, address, latency='lognormal:-1.0,0.5', token_latency=0.005, rate_429=0.0, stall_prob=0.0,
+                 stall_s=30.0, min_words=8, max_words=80):
+        super().__init__(address, MockLLMHandler)
+        self.latency = parse_latency(latency)
+        self.token_latency = token_latency
+        self.rate_429 = rate_429
+        self.stall_prob = stall_prob
+        self.stall_s = stall_s
+        self.min_words = min_words
+        self.max_words = max_words
+        self.stats = defaultdict(int)
+        self.stats_lock = threading.Lock()
+
+    def count(self, **increments):
+        with self.stats_lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    """Handles one request against the mock server."""
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logging.debug(format % args)
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_sse(self, event, payload):
+        prefix = f"event: {event}\n" if event else ''
+        chunk = f"{prefix}data: {payload if isinstance(payload, str) else json.dumps(payload)}\n\n".encode()
+        self.wfile.write(f"{len(chunk):X}\r\n".encode() + chunk + b"\r\n")
+        self.wfile.flush()
+
+    def _start_sse(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+    def _end_sse(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/stats':
+            with self.server.stats_lock:
+                self._send_json(200, dict(self.server.stats))
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        path = self.path.rstrip('/')
+        if path.endswith('/chat/completions'):
+            api = 'openai'
+        elif path.endswith('/messages'):
+            api = 'anthropic'
+        elif path.endswith('/complete'):
+            api = 'anthropic_text'
+        else:
+            self._send_json(404, {'error': 'not found'})
+            return
+        server.count(requests=1)
+
+        if random.random() < server.rate_429:
+            server.count(http_429=1)
+            error = {'type': 'rate_limit_error', 'message': 'Mock rate limit'}
+            self._send_json(429, {'error': error} if api == 'openai' else {'type': 'error', 'error': error},
+                            headers={'Retry-After': '1'})
+            return
+
+        delay = server.latency()
+        if random.random() < server.stall_prob:
+            server.count(stalls=1)
+            delay += server.stall_s
+        time.sleep(delay)
+
+        prompt_tokens = count_tokens(prompt_text(body))
+        n = int(body.get('n') or 1) if api == 'openai' else 1
+        max_words = min(server.max_words,
+                        int(body.get('max_tokens') or body.get('max_tokens_to_sample') or server.max_words))
+        texts = [' '.join(random.choices(VOCAB, k=random.randint(min(server.min_words, max_words), max_words)))
+                 for _ in range(n)]
+        server.count(prompt_tokens=prompt_tokens)
+
+        if body.get('stream'):
+            self._stream(api, body.get('model', 'mock'), texts, prompt_tokens)
+        elif api == 'openai':
+            self._openai_response(body.get('model', 'mock'), texts, prompt_tokens)
+        elif api == 'anthropic':
+            self._anthropic_response(body.get('model', 'mock'), texts[0], prompt_tokens)
+        else:
+            self._anthropic_text_response(body.get('model', 'mock'), texts[0])
+
+    def _openai_response(self, model, texts, prompt_tokens):
+        completion_tokens = sum(count_tokens(t) for t in texts)
+        self.server.count(completion_tokens=completion_tokens)
+        self._send_json(200, {
+            'id': f"chatcmpl-{uuid.uuid4().hex}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{'index': i, 'message': {'role': 'assistant', 'content': t}, 'finish_reason': 'stop'}
+                        for i, t in enumerate(texts)],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                      'total_tokens': prompt_tokens + completion_tokens},
+        })
+
+    def _anthropic_response(self, model, text, prompt_tokens):
+        output_tokens = count_tokens(text)
+        self.server.count(completion_tokens=output_tokens)
+        self._send_json(200, {
+            'id': f"msg_{uuid.uuid4().hex}",
+            'type': 'message',
+            'role': 'assistant',
+            'model': model,
+            'content': [{'type': 'text', 'text': text}],
+            'stop_reason': 'end_turn',
+            'stop_sequence': None,
+            'usage': {'input_tokens': prompt_tokens, 'output_tokens': output_tokens},
+        })
+
+    def _anthropic_text_response(self, model, text):
+        self.server.count(completion_tokens=count_tokens(text))
+        self._send_json(200, {'type': 'completion', 'id': f"compl_{uuid.uuid4().hex}", 'completion': ' ' + text,
+                              'stop_reason': 'stop_sequence', 'model': model})
+
+    def _stream(self, api, model, texts, prompt_tokens):
+        """Streams `texts` one word per event, counting the tokens that actually went out.
+
+        OpenAI-style streams interleave the choices word by word, tag each chunk with its choice `index` and end
+        each choice with its own finish chunk. Anthropic streams carry one text.
+        """
+        texts = texts if api == 'openai' else texts[:1]
+        sent = 0
+        msg_id = f"chatcmpl-{uuid.uuid4().hex}" if api == 'openai' else f"msg_{uuid.uuid4().hex}"
+
+        def openai_chunk(index, delta, finish_reason=None):
+            return {'id': msg_id, 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': model,
+                    'choices': [{'index': index, 'delta': delta, 'finish_reason': finish_reason}]}
+
+        try:
+            self._start_sse()
+            if api == 'anthropic':
+                self._send_sse('message_start', {'type': 'message_start', 'message': {
+                    'id': msg_id, 'type': 'message', 'role': 'assistant', 'model': model, 'content': [],
+                    'stop_reason': None, 'usage': {'input_tokens': prompt_tokens, 'output_tokens': 0}}})
+                self._send_sse('content_block_start', {'type': 'content_block_start', 'index': 0,
+                                                       'content_block': {'type': 'text', 'text': ''}})
+            for index, piece, last in interleave_words(texts):
+                if api == 'openai':
+                    self._send_sse(None, openai_chunk(index, {'content': piece}))
+                    if last:
+                        self._send_sse(None, openai_chunk(index, {}, 'stop'))
+                elif api == 'anthropic_text':
+                    self._send_sse('completion', {'type': 'completion', 'completion': piece, 'stop_reason': None,
+                                                  'model': model})
+                else:
+                    self._send_sse('content_block_delta', {'type': 'content_block_delta', 'index': 0,
+                                                           'delta': {'type': 'text_delta', 'text': piece}})
+                sent += 1
+                # Choices are generated side by side, so a round of one word per choice takes one token_latency
+                time.sleep(self.server.token_latency / len(texts))
+            if api == 'openai':
+                self._send_sse(None, '[DONE]')
+            elif api == 'anthropic_text':
+                self._send_sse('completion', {'type': 'completion', 'completion': '', 'stop_reason': 'stop_sequence',
+                                              'model': model})
+            else:
+                self._send_sse('content_block_stop', {'type': 'content_block_stop', 'index': 0})
+                self._send_sse('message_delta', {'type': 'message_delta', 'delta': {'stop_reason': 'end_turn'},
+                                                 'usage': {'output_tokens': sent}})
+                self._send_sse('message_stop', {'type': 'message_stop'})
+            self._end_sse()
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.count(cancelled_streams=1)
+            self.close_connection = True
+        finally:
+            self.server.count(completion_tokens=sent, streamed_tokens=sent)
+
+
+def serve(host='127.0.0.1', port=8000, **settings):
+    """Starts the mock server in a daemon thread.
+
+    Args:
+        host (str): Interface to bind.
+        port (int): Port to bind (0 picks a free one).
+        **settings: Passed to MockLLMServer.
+
+    Returns:
+        The running MockLLMServer; call `shutdown()` to stop it.
+    """
+    server = MockLLMServer((host, port), **settings)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Offline mock of OpenAI/Anthropic chat APIs for load testing.')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+    parser.add_argument('--port', type=int, default=8000, help='Port to bind')
+    parser.add_argument('--latency', default='lognormal:-1.0,0.5',
+                        help='Time to first token: fixed:S, uniform:A,B or lognormal:MU,SIGMA (seconds)')
+    parser.add_argument('--token_latency', type=float, default=0.005, help='Seconds between streamed tokens')
+    parser.add_argument('--rate_429', type=float, default=0.0, help='Probability of a 429 response')
+    parser.add_argument('--stall_prob', type=float, default=0.0, help='Probability of stalling a request')
+    parser.add_argument('--stall_s', type=float, default=30.0, help='Seconds a stalled request waits')
+    parser.add_argument('--min_words', type=int, default=8, help='Minimum words per completion')
+    parser.add_argument('--max_words', type=int, default=80, help='Maximum words per completion')
+    args = parser.parse_args(argv)
+
+    server = MockLLMServer((args.host, args.port), latency=args.latency, token_latency=args.token_latency,
+                           rate_429=args.rate_429, stall_prob=args.stall_prob, stall_s=args.stall_s,
+                           min_words=args.min_words, max_words=args.max_words)
+    logging.info(f"Mock LLM server on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
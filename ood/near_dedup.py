@@ -0,0 +1,217 @@
+"""
+Description: Streaming near-duplicate removal for scraped JSONL using MinHash signatures and LSH banding.
+
+Each record's text is normalized and split into character shingles, which are MinHashed into a signature. The
+signature is cut into bands; records that share a band bucket with an already-kept record are candidates, and a
+candidate is dropped if its estimated Jaccard similarity to that record is at least the threshold. Records are
+read and written one line at a time, so memory only holds the signatures of kept records and the band buckets.
+
+Usage:
+    ood dedup --input _2017-01-01_to_2024-04-15_podcasts.jsonl --threshold 0.8
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import zlib
+
+from ood.telemetry import track_stage, incr
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+TEXT_FIELDS = ('text', 'description', 'desc', 'abstract', 'tagline', 'title')
+
+
+def shingles(text, k=5):
+    """Returns the set of k-character shingles of a normalized text.
+
+    Args:
+        text (str): Raw text.
+        k (int): Shingle length in characters.
+
+    Returns:
+        A set of shingle strings (the whole text if it is shorter than k).
+    """
+    normalized = re.sub(r'\s+', ' ', re.sub(r'[^\w\s]', '', text.lower())).strip()
+    if len(normalized) <= k:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + k] for i in range(len(normalized) - k + 1)}
+
+
+def optimal_bands(threshold, num_perm, fp_weight=0.5, fn_weight=0.5):
+    """Picks (bands, rows) so that b * r <= num_perm minimizes weighted false positive/negative area.
+
+    Args:
+        threshold (float): Jaccard threshold.
+        num_perm (int): Signature length.
+        fp_weight (float): Weight on false positives.
+        fn_weight (float): Weight on false negatives.
+
+    Returns:
+        A (bands, rows) tuple.
+    """
+    import numpy as np
+
+    def prob_candidate(s, b, r):
+        return 1 - (1 - s ** r) ** b
+
+    # Areas under/over the candidate curve, approximated on an even grid
+    grid_lo = np.linspace(0, threshold, 200)
+    grid_hi = np.linspace(threshold, 1, 200)
+    best, best_err = (1, num_perm), float('inf')
+    for b in range(1, num_perm + 1):
+        for r in range(1, num_perm // b + 1):
+            fp = prob_candidate(grid_lo, b, r).mean() * threshold
+            fn = (1 - prob_candidate(grid_hi, b, r)).mean() * (1 - threshold)
+            err = fp_weight * fp + fn_weight * fn
+            if err < best_err:
+                best, best_err = (b, r), err
+    return best
+
+
+class MinHashLSH:
+    """Streaming MinHash/LSH index that decides, record by record, whether to keep it.
+
+    Attributes:
+        threshold (float): Estimated Jaccard similarity at or above which a record is a near-duplicate.
+        num_perm (int): Number of hash permutations (signature length).
+        bands (int): Number of LSH bands.
+        rows (int): Signature rows per band.
+    """
+
+    def __init__(self, threshold=0.8, num_perm=128, shingle_size=5, seed=416):
+        import numpy as np
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._buckets = [{} for _ in range(self.bands)]
+        self._signatures = []
+        self._ids = []
+
+    def signature(self, text):
+        """Computes the MinHash signature of a text.
+
+        Returns:
+            A uint32 array of length `num_perm`, or None if the text has no shingles.
+        """
+        import numpy as np
+
+        grams = shingles(text, self.shingle_size)
+        if not grams:
+            return None
+        hashes = np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64, count=len(grams))
+        permuted = ((np.outer(hashes, self._a) + self._b) % np.uint64(MERSENNE_PRIME)) & np.uint64(MAX_HASH)
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature):
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, record_id, text):
+        """Checks a record against kept records and keeps it if it is not a near-duplicate.
+
+        Args:
+            record_id: Identifier stored for kept records.
+            text (str): Record text.
+
+        Returns:
+            None if the record was kept, otherwise the id of the kept record it duplicates.
+        """
+        import numpy as np
+
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        keys = self._band_keys(signature)
+        candidates = set()
+        for bucket, key in zip(self._buckets, keys):
+            candidates.update(bucket.get(key, ()))
+        for idx in sorted(candidates):
+            if np.mean(self._signatures[idx] == signature) >= self.threshold:
+                return self._ids[idx]
+
+        idx = len(self._signatures)
+        self._signatures.append(signature)
+        self._ids.append(record_id)
+        for bucket, key in zip(self._buckets, keys):
+            bucket.setdefault(key, []).append(idx)
+        return None
+
+
+def detect_text_field(record):
+    """Returns the first known text field present in a record."""
+    for field in TEXT_FIELDS:
+        if isinstance(record.get(field), str):
+            return field
+    raise ValueError(f"No text field found; pass --text_field (record keys: {list(record)})")
+
+
+def dedup_jsonl(input_path, output_path, text_field=None, id_field='dataset_id', threshold=0.8, num_perm=128,
+                shingle_size=5, dupes_path=None):
+    """Streams a JSONL file and writes the records that are not near-duplicates of an earlier record.
+
+    Args:
+        input_path (str): Input JSONL.
+        output_path (str): Output JSONL with near-duplicates removed (kept lines are copied verbatim).
+        text_field (str, optional): Field to compare; detected from the first record if not given.
+        id_field (str): Field used to report which record a duplicate matched (falls back to line number).
+        threshold (float): Jaccard threshold.
+        num_perm (int): Signature length.
+        shingle_size (int): Shingle length in characters.
+        dupes_path (str, optional): Where to write one JSON line per dropped record with the id it matched.
+
+    Returns:
+        A tuple of (records read, records kept).
+    """
+    lsh = MinHashLSH(threshold, num_perm, shingle_size)
+    logging.info(f"MinHash LSH with {lsh.bands} bands x {lsh.rows} rows at threshold {threshold}")
+    n_read = n_kept = 0
+    dupes = open(dupes_path, 'w') if dupes_path else None
+    try:
+        with open(input_path) as fin, open(output_path, 'w') as fout:
+            for line_no, line in enumerate(fin):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                text_field = text_field or detect_text_field(record)
+                record_id = record.get(id_field, line_no)
+                n_read += 1
+                match = lsh.add(record_id, record.get(text_field) or '')
+                if match is None:
+                    fout.write(line if line.endswith('\n') else line + '\n')
+                    n_kept += 1
+                elif dupes:
+                    dupes.write(json.dumps({'dropped': record_id, 'matched': match}) + '\n')
+    finally:
+        if dupes:
+            dupes.close()
+    return n_read, n_kept
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Remove near-duplicate records from a JSONL file (MinHash + LSH).')
+    parser.add_argument('--input', required=True, help='Input JSONL')
+    parser.add_argument('--output', default=None, help='Output JSONL (default: <input>_dedup.jsonl)')
+    parser.add_argument('--text_field', default=None, help=f'Field to compare (default: first of {TEXT_FIELDS})')
+    parser.add_argument('--id_field', default='dataset_id', help='Record id field')
+    parser.add_argument('--threshold', type=float, default=0.8, help='Jaccard similarity treated as duplicate')
+    parser.add_argument('--num_perm', type=int, default=128, help='MinHash signature length')
+    parser.add_argument('--shingle_size', type=int, default=5, help='Character shingle length')
+    parser.add_argument('--dupes', default=None, help='Optional JSONL listing dropped ids and what they matched')
+    args = parser.parse_args(argv)
+
+    output = args.output or f"{os.path.splitext(args.input)[0]}_dedup.jsonl"
+    with track_stage('near_dedup', input=args.input, threshold=args.threshold):
+        n_read, n_kept = dedup_jsonl(args.input, output, args.text_field, args.id_field, args.threshold,
+                                     args.num_perm, args.shingle_size, args.dupes)
+        incr('items', n_read)
+    logging.info(f"Kept {n_kept} of {n_read} records from {args.input}; wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+Description: OLS on data too big for memory (e.g. every row of all_pw_data_enriched.csv), streamed in chunks.
+
+The model is fit from sufficient statistics, so memory depends on the number of coefficients k, not on the number
+of rows:
+
+1. A patsy incremental builder scans the chunks once to learn the formula's categorical levels.
+2. The second pass accumulates X'X, X'y and, for average marginal effects, the mean counterfactual design row per
+   group (every row with the contrasted variable set to each of its levels). Then beta = (X'X)^+ X'y.
+3. The third pass computes residuals for the SSR and the robust "meat". For HC1 that is sum(e_i^2 x_i x_i'). For
+   clustered errors it is the sum over clusters of (X_g'e_g)(X_g'e_g)', which keeps one k-vector per cluster.
+
+Covariances follow statsmodels: nonrobust, HC1 = n/(n-k) * bread meat bread, and cluster =
+G/(G-1) * (n-1)/(n-k) * bread meat bread. Inference uses the normal distribution, as statsmodels does for robust
+covariances (with millions of rows t and z agree).
+
+The model is linear, so an average comparison of a categorical variable between a level and its reference level is
+(mean counterfactual row at the level - mean row at the reference) . beta. Its standard error comes from the delta
+method: sqrt(d' V d). This matches marginaleffects.avg_comparisons on a statsmodels fit.
+
+Example:
+    chunks = lambda: pd.read_csv("all_pw_data_enriched.csv", chunksize=1_000_000)
+    result = fit_ols("sim ~ category*model*C(in_window)", chunks, cov_type='cluster', cluster='ai_code',
+                     ame_variable='in_window', ame_by=[None, 'model', 'category'])
+    result.summary(); result.ames
+
+Usage:
+    ood ols --input all_pw_data_enriched.csv --formula "sim ~ category*model*C(in_window)" --cov_type cluster \
+        --cluster ai_code --ame in_window --by overall model category
+"""
+import argparse
+import logging
+from statistics import NormalDist
+
+from ood.telemetry import track_stage, incr
+
+COV_TYPES = ('nonrobust', 'HC1', 'cluster')
+
+
+class GroupSums:
+    """Running per-group sums of row vectors, for groups that appear chunk by chunk.
+
+    Attributes:
+        width (int): Length of each row vector.
+    """
+
+    def __init__(self, width):
+        import numpy as np
+
+        self.width = width
+        self._index = {}
+        self._sums = np.zeros((0, width))
+        self._counts = np.zeros(0, dtype=np.int64)
+
+    def add(self, groups, rows):
+        """Adds each row to its group's sum.
+
+        Args:
+            groups (array-like): Group label per row.
+            rows (np.ndarray): n x width array.
+        """
+        import numpy as np
+        import pandas as pd
+
+        codes, uniques = pd.factorize(np.asarray(groups), use_na_sentinel=False)
+        positions = np.empty(len(uniques), dtype=np.int64)
+        for i, group in enumerate(uniques):
+            if group not in self._index:
+                self._index[group] = len(self._index)
+            positions[i] = self._index[group]
+        if len(self._index) > len(self._sums):
+            grow = len(self._index) - len(self._sums)
+            self._sums = np.vstack([self._sums, np.zeros((grow, self.width))])
+            self._counts = np.concatenate([self._counts, np.zeros(grow, dtype=np.int64)])
+        np.add.at(self._sums, positions[codes], rows)
+        np.add.at(self._counts, positions[codes], 1)
+
+    def items(self):
+        """Yields (group, sum, count) in the order groups were first seen."""
+        for group, i in self._index.items():
+            yield group, self._sums[i], self._counts[i]
+
+    def sums(self):
+        return self._sums
+
+    def __len__(self):
+        return len(self._index)
+
+
+class OLSResult:
+    """Coefficients, covariance and average marginal effects of a streamed OLS fit.
+
+    Attributes:
+        params (pd.Series): Coefficients.
+        cov_params (pd.DataFrame): Covariance of the coefficients.
+        bse (pd.Series): Standard errors.
+        nobs (int): Rows used.
+        df_resid (int): n minus the rank of X.
+        rsquared (float): R-squared.
+        cov_type (str): One of COV_TYPES.
+        n_clusters (int): Number of clusters (cluster covariance only).
+        ames (pd.DataFrame): Average marginal effects (empty if none were requested).
+    """
+
+    def __init__(self, params, cov_params, nobs, df_resid, rsquared, cov_type, n_clusters=None, ames=None):
+        import numpy as np
+        import pandas as pd
+
+        self.params = params
+        self.cov_params = cov_params
+        self.bse = pd.Series(np.sqrt(np.diag(cov_params)), index=params.index)
+        self.nobs = nobs
+        self.df_resid = df_resid
+        self.rsquared = rsquared
+        self.cov_type = cov_type
+        self.n_clusters = n_clusters
+        self.ames = ames
+
+    def summary(self, alpha=0.05):
+        """Returns a coefficient table (estimate, SE, z, p-value and confidence interval)."""
+        return inference_table(self.params.to_numpy(), self.bse.to_numpy(), alpha).set_index(self.params.index)
+
+
+def inference_table(estimates, std_errors, alpha=0.05):
+    """Normal-approximation z statistics, two-sided p-values and confidence intervals.
+
+    Returns:
+        A DataFrame with estimate, std_error, statistic, p_value, conf_low and conf_high columns.
+    """
+    import numpy as np
+    import pandas as pd
+
+    normal = NormalDist()
+    z_crit = normal.inv_cdf(1 - alpha / 2)
+    estimates = np.asarray(estimates, dtype=float)
+    std_errors = np.asarray(std_errors, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        statistic = estimates / std_errors
+    p_value = [2 * (1 - normal.cdf(abs(z))) if np.isfinite(z) else np.nan for z in statistic]
+    return pd.DataFrame({'estimate': estimates, 'std_error': std_errors, 'statistic': statistic, 'p_value': p_value,
+                         'conf_low': estimates - z_crit * std_errors, 'conf_high': estimates + z_crit * std_errors})
+
+
+def categorical_columns(design_info):
+    """Maps each column the formula treats as categorical (`x` or `C(x)`) to its levels, reference level first."""
+    columns = {}
+    for factor, info in design_info.factor_infos.items():
+        name = factor.name().replace(' ', '')
+        if info.type != 'categorical':
+            continue
+        if name.startswith('C(') and name.endswith(')'):
+            name = name[2:-1].split(',')[0]
+        if name.isidentifier():
+            columns[name] = list(info.categories)
+    return columns
+
+
+def as_categoricals(chunk, columns):
+    """Casts categorical columns to pandas Categoricals with the learned levels.
+
+    patsy maps a Categorical to level codes in one vectorized step; any other column is coded value by value in
+    Python, which dominates the fit on large chunks.
+    """
+    import pandas as pd
+
+    return chunk.assign(**{column: pd.Categorical(chunk[column], categories=levels)
+                           for column, levels in columns.items() if column in chunk})
+
+
+def formula_env():
+    """The namespace formulas are evaluated in: numpy as np, and a `C` that leaves Categoricals unboxed.
+
+    patsy's `C(x)` wraps x in a box that skips its Categorical fast path, so once `as_categoricals` has cast x, a
+    plain `C(x)` returns it as is (same levels, same column names).
+    """
+    import numpy as np
+    import pandas as pd
+    import patsy
+    from patsy import builtins
+
+    def C(data, contrast=None, levels=None):
+        if contrast is None and levels is None and isinstance(getattr(data, 'dtype', None), pd.CategoricalDtype):
+            return data
+        return builtins.C(data, contrast, levels)
+
+    return patsy.EvalEnvironment([{'C': C, 'np': np}])
+
+
+def fit_ols(formula, make_chunks, cov_type='nonrobust', cluster=None, ame_variable=None, ame_by=(None,)):
+    """Fits OLS out of core.
+
+    Args:
+        formula (str): Patsy formula, e.g. "sim ~ category*model*C(in_window)", evaluated with patsy's builtins and
+            numpy as np. Chunks must have no missing values in the formula's columns.
+        make_chunks (callable): Returns a fresh iterator of DataFrame chunks; the data is streamed three times.
+        cov_type (str): 'nonrobust', 'HC1' or 'cluster'.
+        cluster (str, optional): Column to cluster on (required for cov_type='cluster').
+        ame_variable (str, optional): Categorical variable whose average comparisons to report: each level against
+            the reference level, averaged over the rows.
+        ame_by (iterable): Columns to average within (None means all rows).
+
+    Returns:
+        An OLSResult.
+    """
+    import numpy as np
+    import pandas as pd
+    import patsy
+
+    if cov_type not in COV_TYPES:
+        raise ValueError(f"cov_type must be one of {COV_TYPES}")
+    if cov_type == 'cluster' and cluster is None:
+        raise ValueError("cov_type='cluster' needs a cluster column")
+
+    with track_stage('ols_levels', formula=formula):
+        y_info, X_info = patsy.incr_dbuilders(formula, make_chunks, formula_env(), NA_action='raise')
+    names = X_info.column_names
+    k = len(names)
+    categoricals = categorical_columns(X_info)
+    if ame_variable and ame_variable not in categoricals:
+        raise ValueError(f"{ame_variable} is not a categorical variable of the formula")
+    levels = categoricals[ame_variable] if ame_variable else []
+    by_columns = list(ame_by) if ame_variable else []
+
+    def design(chunk):
+        y, X = patsy.build_design_matrices([y_info, X_info], as_categoricals(chunk, categoricals), NA_action='raise')
+        return np.asarray(y, dtype=float).ravel(), np.asarray(X, dtype=float)
+
+    XtX = np.zeros((k, k))
+    Xty = np.zeros(k)
+    n = 0
+    y_sum = 0.0
+    y_sq = 0.0
+    counterfactual = {(by, level): GroupSums(k) for by in by_columns for level in levels}
+    with track_stage('ols_moments', formula=formula):
+        for chunk in make_chunks():
+            y, X = design(chunk)
+            XtX += X.T @ X
+            Xty += X.T @ y
+            n += len(y)
+            y_sum += y.sum()
+            y_sq += y @ y
+            for level in levels:
+                counterfactual_chunk = as_categoricals(chunk.assign(**{ame_variable: level}), categoricals)
+                X_level = np.asarray(patsy.build_design_matrices(
+                    [X_info], counterfactual_chunk, NA_action='raise')[0], dtype=float)
+                for by in by_columns:
+                    groups = np.zeros(len(chunk), dtype=np.int8) if by is None else chunk[by].to_numpy()
+                    counterfactual[(by, level)].add(groups, X_level)
+            incr('items', len(y))
+
+    bread = np.linalg.pinv(XtX)
+    beta = bread @ Xty
+    rank = np.linalg.matrix_rank(XtX)
+    df_resid = n - rank
+
+    ssr = 0.0
+    meat = np.zeros((k, k))
+    scores = GroupSums(k) if cov_type == 'cluster' else None
+    with track_stage('ols_residuals', formula=formula, cov_type=cov_type):
+        for chunk in make_chunks():
+            y, X = design(chunk)
+            e = y - X @ beta
+            ssr += e @ e
+            if cov_type == 'HC1':
+                meat += (X * (e ** 2)[:, None]).T @ X
+            elif cov_type == 'cluster':
+                scores.add(chunk[cluster].to_numpy(), X * e[:, None])
+            incr('items', len(y))
+
+    n_clusters = None
+    if cov_type == 'nonrobust':
+        cov = ssr / df_resid * bread
+    elif cov_type == 'HC1':
+        cov = n / df_resid * bread @ meat @ bread
+    else:
+        S = scores.sums()
+        n_clusters = len(scores)
+        cov = n_clusters / (n_clusters - 1) * (n - 1) / df_resid * bread @ (S.T @ S) @ bread
+    rsquared = 1 - ssr / (y_sq - y_sum ** 2 / n)
+
+    ames = pd.DataFrame()
+    if ame_variable:
+        rows = []
+        reference = levels[0]
+        for by in by_columns:
+            base = {group: total / count for group, total, count in counterfactual[(by, reference)].items()}
+            for level in levels[1:]:
+                for group, total, count in counterfactual[(by, level)].items():
+                    d = total / count - base[group]
+                    rows.append({'term': ame_variable, 'contrast': f"{level} - {reference}",
+                                 'by': by or 'overall', 'group': None if by is None else group,
+                                 'estimate': d @ beta, 'std_error': np.sqrt(d @ cov @ d)})
+        ames = pd.DataFrame(rows)
+        if len(ames):
+            stats = inference_table(ames['estimate'], ames['std_error'])
+            ames = pd.concat([ames.drop(columns=['estimate', 'std_error']), stats], axis=1)
+
+    logging.info(f"Fit {formula} on {n} rows ({k} coefficients, rank {rank}, cov_type={cov_type})")
+    return OLSResult(pd.Series(beta, index=names), pd.DataFrame(cov, index=names, columns=names), n, df_resid,
+                     rsquared, cov_type, n_clusters, ames)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Out-of-core OLS with robust/clustered SEs and average marginal effects.')
+    parser.add_argument('--input', default='all_pw_data_enriched.csv', help='CSV to stream')
+    parser.add_argument('--formula', required=True, help='Patsy formula, e.g. "sim ~ category*model*C(in_window)"')
+    parser.add_argument('--columns', nargs='+', default=None, help='Only read these columns of the CSV')
+    parser.add_argument('--chunksize', type=int, default=1_000_000, help='Rows per chunk')
+    parser.add_argument('--cov_type', default='nonrobust', choices=COV_TYPES, help='Covariance of the coefficients')
+    parser.add_argument('--cluster', default=None, help='Column to cluster on (with --cov_type cluster)')
+    parser.add_argument('--ame', default=None, help='Categorical variable to report average comparisons for')
+    parser.add_argument('--by', nargs='+', default=['overall'],
+                        help="Columns to average comparisons within; 'overall' averages over all rows")
+    parser.add_argument('--output', default='ols', help='Output prefix: <output>_coefs.csv and <output>_ames.csv')
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+
+    def make_chunks():
+        return pd.read_csv(args.input, usecols=args.columns, chunksize=args.chunksize)
+
+    ame_by = [None if by == 'overall' else by for by in args.by]
+    result = fit_ols(args.formula, make_chunks, args.cov_type, args.cluster, args.ame, ame_by)
+    result.summary().to_csv(f"{args.output}_coefs.csv")
+    logging.info(f"n={result.nobs}, R^2={result.rsquared:.4f}; wrote {args.output}_coefs.csv")
+    if args.ame:
+        result.ames.to_csv(f"{args.output}_ames.csv", index=False)
+        logging.info(f"Wrote {args.output}_ames.csv")
+
+
+if __name__ == "__main__":
+    main()
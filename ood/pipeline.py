@@ -0,0 +1,333 @@
+"""
+Description: Runs the whole pipeline (fetch -> dedup -> ingest -> generate -> process -> analysis) as a DAG of
+stages.
+
+Each stage declares the command it runs plus the files it reads and writes. Dependencies come from those
+declarations: a stage waits for whichever stages produce its inputs. Stages with no pending dependencies run in
+parallel (e.g. all fetchers at once). A stage is skipped when the content hash of its command and inputs matches
+the last successful run and its outputs still exist, so a rerun after a small change only redoes what is affected.
+
+A stage's inputs include its module and every package module that module imports (e.g. fetch_utils.py, telemetry.py),
+and for notebooks every `ood` module the notebook imports, so editing a shared helper reruns whatever uses it.
+
+Note: The filter, embedding and similarity steps still live together in `3_process_data.ipynb`, so they run as a
+single `process` stage. Only the corpora that notebook analyzes (ANALYZED_SOURCES) are fetched, deduped and
+ingested; the other fetchers (fiction, preprints) are run directly with `ood fetch`.
+
+Usage:
+    ood pipeline --start_date 2017-01-01 --end_date 2024-04-15 --workers 6
+    ood pipeline --dry_run
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from ood.dataset import DATASET_DIR, MANIFEST_FILE, SOURCES
+from ood.telemetry import track_stage, run_id, enable
+
+
+class Stage:
+    """One step of the pipeline.
+
+    Attributes:
+        name (str): Unique stage name.
+        cmd (list): Command to run, as an argv list.
+        inputs (list): Files the stage reads. The stage's code (see `sources`) should be listed so edits trigger a
+            rerun.
+        outputs (list): Files the stage writes.
+    """
+
+    def __init__(self, name, cmd, inputs, outputs):
+        self.name = name
+        self.cmd = cmd
+        self.inputs = inputs
+        self.outputs = outputs
+
+    def fingerprint(self):
+        """Hashes the command and the content of every input.
+
+        Returns:
+            A hex digest, or None if an input is missing.
+        """
+        h = hashlib.sha256()
+        h.update(json.dumps(self.cmd).encode())
+        for path in sorted(self.inputs):
+            if not os.path.exists(path):
+                return None
+            h.update(path.encode())
+            h.update(file_hash(path).encode())
+        return h.hexdigest()
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Returns the sha256 of a file, read in chunks."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def notebook_cmd(notebook):
+    """Command that executes a notebook without overwriting the source (so its hash stays stable)."""
+    return ['jupyter', 'nbconvert', '--to', 'notebook', '--execute', notebook,
+            '--output-dir', 'executed_notebooks', '--ExecutePreprocessor.timeout=-1']
+
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+ANALYZED_SOURCES = ('startups', 'opeds', 'podcasts')
+IMPORT_PATTERN = re.compile(r'^\s*(?:from\s+ood\.(\w+)|from\s+ood\s+import\s+(\w+)|import\s+ood\.(\w+))', re.M)
+
+
+def source(module):
+    """Path of a module in this package."""
+    return os.path.join(PACKAGE_DIR, f"{module}.py")
+
+
+def imported_modules(code):
+    """Names of the package modules that a piece of code imports, lazy (function-level) imports included."""
+    return {name for match in IMPORT_PATTERN.findall(code) for name in match if name and os.path.exists(source(name))}
+
+
+def sources(*modules):
+    """Paths of the given package modules plus every package module they import, transitively.
+
+    Listed as stage inputs so an edit to a module or any helper it uses triggers a rerun.
+    """
+    seen = set()
+    todo = list(modules)
+    while todo:
+        module = todo.pop()
+        if module not in seen:
+            seen.add(module)
+            with open(source(module)) as f:
+                todo.extend(imported_modules(f.read()))
+    return sorted(source(module) for module in seen)
+
+
+def notebook_sources(notebook):
+    """The notebook plus every package module its code cells import (see `sources`)."""
+    with open(notebook) as f:
+        cells = json.load(f)['cells']
+    code = '\n'.join(''.join(cell['source']) for cell in cells if cell['cell_type'] == 'code')
+    return [notebook, *sources(*imported_modules(code))]
+
+
+def ood_cmd(python, *args):
+    """Command that runs an `ood` subcommand with the given interpreter."""
+    return [python, '-m', 'ood', *args]
+
+
+def dedup_stage(name, path, text_field, python=sys.executable):
+    """Stage that drops near-duplicate records from a fetched JSONL (see near_dedup.py)."""
+    output = f"{os.path.splitext(path)[0]}_dedup.jsonl"
+    return Stage(f"dedup_{name}", ood_cmd(python, 'dedup', '--input', path, '--output', output,
+                                          '--text_field', text_field, '--threshold', '0.8'),
+                 [*sources('near_dedup'), path], [output])
+
+
+def ingest_stage(name, path, python=sys.executable):
+    """Stage that normalizes a deduplicated JSONL into the partitioned dataset (see dataset.py)."""
+    manifest = os.path.join(DATASET_DIR, f"category={SOURCES[name].category}", MANIFEST_FILE)
+    return Stage(f"ingest_{name}", ood_cmd(python, 'ingest', '--source', name, '--input', path, '--root', DATASET_DIR),
+                 [*sources('dataset'), path], [manifest])
+
+
+def build_stages(start_date, end_date, python=sys.executable):
+    """Declares the pipeline's stages.
+
+    Args:
+        start_date (str): Start date for the fetchers in YYYY-MM-DD format.
+        end_date (str): End date for the fetchers in YYYY-MM-DD format.
+        python (str): Python interpreter used to run `ood` subcommands.
+
+    Returns:
+        A list of Stage objects.
+    """
+    dates = ['--start_date', start_date, '--end_date', end_date]
+    startups = f"{start_date}_to_{end_date}_startups.jsonl"
+    opeds = f"{start_date}_to_{end_date}_nyt_headlines.jsonl"
+    podcasts = f"_{start_date}_to_{end_date}_podcasts.jsonl"
+    fetched = {'startups': startups, 'opeds': opeds, 'podcasts': podcasts}
+    dedup = {name: dedup_stage(name, fetched[name], SOURCES[name].text_field, python) for name in ANALYZED_SOURCES}
+    ingest = {name: ingest_stage(name, stage.outputs[0], python) for name, stage in dedup.items()}
+    processed = ['brief_human_w_vec.jsonl', 'ai_ideas_w_vec.jsonl', 'all_pw_data.csv', 'all_pw_data_enriched.csv']
+
+    return [
+        Stage('fetch_startups', ood_cmd(python, 'fetch', 'startups', *dates), sources('fetch_startups'), [startups]),
+        Stage('fetch_opeds', ood_cmd(python, 'fetch', 'opeds', '--stream', *dates),
+              sources('fetch_nyt_opeds'), [opeds]),
+        Stage('fetch_podcasts', ood_cmd(python, 'fetch', 'podcasts', '--N', '50000', *dates),
+              sources('fetch_podcasts'), [podcasts]),
+        *dedup.values(),
+        *ingest.values(),
+        Stage('generate', ood_cmd(python, 'generate'), sources('generate'), ['ai_ideas.jsonl']),
+        Stage('process', notebook_cmd('3_process_data.ipynb'),
+              [*notebook_sources('3_process_data.ipynb'), 'ai_ideas.jsonl', 'model_cutoffs.json']
+              + [stage.outputs[0] for stage in ingest.values()], processed),
+        Stage('diversity', ood_cmd(python, 'diversity', '--input', 'ai_ideas_w_vec.jsonl'),
+              [*sources('diversity'), 'ai_ideas_w_vec.jsonl'], ['diversity_metrics.csv']),
+        Stage('analysis', notebook_cmd('4_analysis.ipynb'),
+              [*notebook_sources('4_analysis.ipynb'), 'all_pw_data_enriched.csv'],
+              ['executed_notebooks/4_analysis.ipynb']),
+    ]
+
+
+def resolve_deps(stages):
+    """Maps each stage name to the names of the stages that produce its inputs.
+
+    Raises:
+        ValueError: If two stages write the same output.
+    """
+    producer = {}
+    for stage in stages:
+        for out in stage.outputs:
+            if out in producer:
+                raise ValueError(f"{out} is produced by both {producer[out]} and {stage.name}")
+            producer[out] = stage.name
+    return {s.name: {producer[i] for i in s.inputs if i in producer and producer[i] != s.name} for s in stages}
+
+
+def with_upstream(names, deps):
+    """Returns the given stage names plus everything they transitively depend on."""
+    selected = set()
+    todo = list(names)
+    while todo:
+        name = todo.pop()
+        if name not in selected:
+            selected.add(name)
+            todo.extend(deps[name])
+    return selected
+
+
+def load_state(path):
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def save_state(state, path):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+def is_up_to_date(stage, state):
+    """True if the stage's fingerprint matches the last successful run and its outputs exist."""
+    fp = stage.fingerprint()
+    return fp is not None and state.get(stage.name) == fp and all(os.path.exists(o) for o in stage.outputs)
+
+
+def run_stage(stage):
+    """Runs one stage's command.
+
+    Returns:
+        The process return code.
+    """
+    logging.info(f"START {stage.name}: {' '.join(stage.cmd)}")
+    with track_stage(f"pipeline:{stage.name}"):
+        # Records written by the stage's own process name this wrapper as their parent
+        result = subprocess.run(stage.cmd, env={**os.environ, 'OOD_PARENT_STAGE': f"pipeline:{stage.name}"})
+    logging.info(f"END {stage.name} (returncode={result.returncode})")
+    return result.returncode
+
+
+def run_pipeline(stages, workers=4, state_path='.pipeline_state.json', force=(), dry_run=False):
+    """Runs stages in dependency order, in parallel where possible.
+
+    Args:
+        stages (list): Stage objects to run.
+        workers (int): Maximum number of stages running at once.
+        state_path (str): JSON file with the fingerprint of each stage's last successful run.
+        force (iterable): Stage names to rerun even if up to date.
+        dry_run (bool): Only report what would run.
+
+    Returns:
+        A dict mapping stage name to 'ran', 'skipped', 'failed' or 'blocked'.
+    """
+    by_name = {s.name: s for s in stages}
+    deps = resolve_deps(stages)
+    state = load_state(state_path)
+    status = {}
+    pending = set(by_name)
+    running = {}
+
+    def ready(name):
+        return all(status.get(d) in ('ran', 'skipped') for d in deps[name] if d in by_name)
+
+    def blocked(name):
+        return any(status.get(d) in ('failed', 'blocked') for d in deps[name] if d in by_name)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while pending or running:
+            progressed = False
+            for name in sorted(pending):
+                if blocked(name):
+                    status[name] = 'blocked'
+                    progressed = True
+                    pending.discard(name)
+                    logging.info(f"BLOCKED {name}: an upstream stage failed")
+                elif ready(name):
+                    progressed = True
+                    pending.discard(name)
+                    stage = by_name[name]
+                    if name not in force and is_up_to_date(stage, state):
+                        status[name] = 'skipped'
+                        logging.info(f"SKIP {name}: inputs unchanged")
+                    elif dry_run:
+                        status[name] = 'ran'
+                        logging.info(f"WOULD RUN {name}: {' '.join(stage.cmd)}")
+                    else:
+                        running[executor.submit(run_stage, stage)] = name
+            if not running:
+                if not progressed:
+                    raise ValueError(f"Dependency cycle among stages: {sorted(pending)}")
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                if future.result() == 0:
+                    status[name] = 'ran'
+                    state[name] = by_name[name].fingerprint()
+                    save_state(state, state_path)
+                else:
+                    status[name] = 'failed'
+    return status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the pipeline as a DAG of stages, skipping unchanged ones.')
+    parser.add_argument('--start_date', type=str, default='2017-01-01', help='Start date in YYYY-MM-DD format')
+    parser.add_argument('--end_date', type=str, default='2024-04-15', help='End date in YYYY-MM-DD format')
+    parser.add_argument('--workers', type=int, default=6, help='Maximum number of stages running at once')
+    parser.add_argument('--only', nargs='*', default=None, help='Run only these stages (and what they depend on)')
+    parser.add_argument('--force', nargs='*', default=[], help='Rerun these stages even if up to date')
+    parser.add_argument('--state', type=str, default='.pipeline_state.json', help='Where stage hashes are stored')
+    parser.add_argument('--dry_run', action='store_true', help='Show what would run without running it')
+    parser.add_argument('--telemetry', type=str, default=os.getenv('OOD_TELEMETRY', 'telemetry.jsonl'),
+                        help='Telemetry file shared by every stage')
+    args = parser.parse_args(argv)
+
+    # Stages run as subprocesses, so they inherit the telemetry file and run id and their lines group together
+    enable(args.telemetry)
+    logging.info(f"Run id: {run_id()}")
+    stages = build_stages(args.start_date, args.end_date)
+    if args.only:
+        keep = with_upstream(args.only, resolve_deps(stages))
+        stages = [s for s in stages if s.name in keep]
+
+    status = run_pipeline(stages, args.workers, args.state, set(args.force), args.dry_run)
+    logging.info(f"Pipeline finished: {json.dumps(status)}")
+    if any(v in ('failed', 'blocked') for v in status.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Description: Helpers used by the processing and analysis notebooks, kept in a module so they can be imported and
+benchmarked outside the notebooks.
+
+- `fix_cat` / `extract_json` clean raw LLM outputs (3_process_data.ipynb)
+- `process_ai_idea` builds (ai_code, human_code, sim) rows from the similarity matrix (3_process_data.ipynb)
+- `min_unique_human_ids` / `compute_similarity_proportions` run the balanced nearest-human simulation
+  (4_analysis.ipynb)
+"""
+import json
+import logging
+import re
+
+import numpy as np
+
+
+def fix_cat(x):
+    if x == "startup":
+        return "startups"
+    elif x == "oped":
+        return "opeds"
+    elif x == "podcast":
+        return "podcasts"
+
+
+def extract_json(text):
+    """Pulls the single value out of the first flat JSON object in an LLM response.
+
+    Args:
+        text (str): Raw model output.
+
+    Returns:
+        The value of the object's only key, or NaN if there is no JSON object or it has more than one key.
+    """
+    try:
+        matches = re.findall(r'\{[^{}]*\}', text)
+        if matches:
+            json_str = matches[0]
+            data = json.loads(json_str)
+            if len(data.keys()) == 1:
+                return list(data.values())[0]
+            else:
+                raise ValueError("More than 1 key")
+        else:
+            raise ValueError("No JSON found in the provided text.")
+    except Exception as e:
+        logging.warning(f"Error: {e}\nResponse: {text}\n")
+        return np.nan
+
+
+def process_ai_idea(ai_codes, human_codes, csim):
+    """Builds one row per (AI idea, human idea) pair with their similarity.
+
+    Args:
+        ai_codes (np.ndarray): IdRegistry codes of the AI ideas.
+        human_codes (np.ndarray): IdRegistry codes of the human ideas.
+        csim (np.ndarray): Full similarity matrix, indexed by code.
+
+    Returns:
+        A DataFrame with int32 ai_code and human_code columns and a float32 sim column, AI idea major.
+    """
+    import pandas as pd
+
+    ai_codes = np.asarray(ai_codes, dtype=np.int32)
+    human_codes = np.asarray(human_codes, dtype=np.int32)
+    sims = csim[np.ix_(ai_codes, human_codes)]
+    return pd.DataFrame({
+        'ai_code': np.repeat(ai_codes, len(human_codes)),
+        'human_code': np.tile(human_codes, len(ai_codes)),
+        'sim': sims.astype(np.float32, copy=False).ravel(),
+    })
+
+
+def min_unique_human_ids(df):
+    """Returns, per category, the smaller of the in-window and out-of-window unique human idea counts."""
+    counts = df.groupby(['category', 'in_window'])['human_code'].nunique().unstack(fill_value=0)
+    counts['min_count'] = counts.min(axis=1)
+    min_counts_dict = counts['min_count'].to_dict()
+    return min_counts_dict
+
+
+def compute_similarity_proportions(df, min_counts_dict, seed=None):
+    """Runs one draw of the balanced nearest-human simulation.
+
+    Samples the same number of human ideas inside and outside the training window per category, then counts, per
+    (model, category), how often an AI idea's most similar human idea falls inside vs outside the window.
+
+    Args:
+        df (pd.DataFrame): Pairwise rows with category, in_window, human_code, ai_code, model and sim.
+        min_counts_dict (dict): Output of `min_unique_human_ids`.
+        seed (int, optional): Sampling seed.
+
+    Returns:
+        A list of records with in_window_prop, out_window_prop, total and seed per (model, category).
+    """
+    # Sample human_ids uniformly across all categories and in_window statuses
+    to_sample = {}
+    for (category, in_window), group in df.groupby(['category', 'in_window']):
+        unique_ids = group['human_code'].drop_duplicates()
+        min_count = min(min_counts_dict[category], len(unique_ids))
+        sampled_ids = unique_ids.sample(n=min_count, random_state=seed)
+        to_sample[(category, in_window)] = set(sampled_ids)
+
+    # Filter and calculate in a more efficient manner
+    mask = df.apply(lambda x: x['human_code'] in to_sample[(x['category'], x['in_window'])], axis=1)
+    df_sampled = df[mask]
+    df_sampled.loc[:, 'max_sim_for_ai'] = df_sampled.groupby('ai_code')['sim'].transform('max')
+    df_sampled.loc[:, 'is_max_sim'] = (df_sampled['sim'] == df_sampled['max_sim_for_ai']).astype(int)
+
+    results = df_sampled.groupby(['model', 'category', 'in_window'])['is_max_sim'].sum().unstack().reset_index()
+
+    # Normalize results and prepare output
+    results['total'] = results[1] + results[0]
+    results['in_window_prop'] = results[1] / results['total']
+    results['out_window_prop'] = results[0] / results['total']
+    results['seed'] = seed
+    return results.to_dict(orient='records')
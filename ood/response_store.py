@@ -0,0 +1,214 @@
+"""
+Description: Append-only CSV store for model responses with a hash index for deduplication.
+
+Rows are appended to the CSV and a hash of each row's (model, category, output) is appended to a sidecar index file
+(`<csv>.idx`). The index is loaded into a set once, so checking a row is O(1) and saving only writes the new rows,
+instead of reading, concatenating and rewriting the whole file. Writers take an exclusive lock (`<csv>.lock`) and
+pick up hashes other writers appended since they last looked, so several processes can save into one store.
+`compact` rewrites the file keeping the newest row per key. Duplicate keys come from CSVs written before the store
+existed; they are counted whenever the index is rebuilt from the CSV (which also happens on open if a crash left
+rows in the CSV without their hashes in the index), and `append` compacts in a background thread once they pass
+`compact_ratio` of the store. The thread is not a daemon, so the interpreter waits for it before exiting instead of
+killing it half-way through the rewrite.
+
+    store = ResponseStore('responses.csv')
+    n_new = store.append(rows)
+"""
+import csv
+import fcntl
+import hashlib
+import logging
+import math
+import os
+import threading
+from contextlib import contextmanager
+
+
+class ResponseStore:
+    """An append-only, deduplicated CSV of responses.
+
+    Attributes:
+        path (str): CSV path.
+        key_columns (tuple): Columns that identify a unique response.
+        compact_ratio (float): Share of duplicate rows at which `append` starts a background compaction.
+    """
+
+    def __init__(self, path, key_columns=('model', 'category', 'output'), compact_ratio=0.1):
+        self.path = path
+        self.key_columns = tuple(key_columns)
+        self.compact_ratio = compact_ratio
+        self.index_path = path + '.idx'
+        self.lock_path = path + '.lock'
+        self._seen = set()
+        self._index_offset = 0
+        self._index_inode = None
+        self._duplicates = 0
+        self._compaction = None
+        self._thread_lock = threading.Lock()
+        with self._locked():
+            if os.path.exists(self.path) and not self._index_is_current():
+                self._rebuild_index()
+            self._refresh_index()
+
+    def row_key(self, row):
+        """Hashes a row's key columns. Missing values (None or NaN) hash like the empty cell they are written as."""
+        joined = '\x1f'.join('' if _is_missing(row.get(c)) else str(row.get(c)) for c in self.key_columns)
+        return hashlib.sha1(joined.encode('utf-8')).hexdigest()
+
+    def __contains__(self, row):
+        return self.row_key(row) in self._seen
+
+    def __len__(self):
+        return len(self._seen)
+
+    @contextmanager
+    def _locked(self):
+        """Holds the store's exclusive lock (across threads and processes)."""
+        with self._thread_lock, open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _index_is_current(self):
+        """Checks the index was written after the CSV; every write updates the CSV first and the index last."""
+        if not os.path.exists(self.index_path):
+            return False
+        return os.stat(self.index_path).st_mtime_ns >= os.stat(self.path).st_mtime_ns
+
+    def _refresh_index(self):
+        """Reads hashes appended to the index (by any writer) since we last looked."""
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path) as f:
+            inode = os.fstat(f.fileno()).st_ino
+            if inode != self._index_inode:
+                # Another writer compacted the store and replaced the index, so start over
+                self._seen = set()
+                self._index_offset = 0
+                self._index_inode = inode
+            f.seek(self._index_offset)
+            for line in f:
+                self._seen.add(line.strip())
+            self._index_offset = f.tell()
+
+    def _header(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return None
+        with open(self.path, newline='') as f:
+            return next(csv.reader(f))
+
+    def _read_rows(self):
+        with open(self.path, newline='') as f:
+            yield from csv.DictReader(f)
+
+    def _rebuild_index(self):
+        """Recomputes the index from the CSV and counts the duplicate rows in it."""
+        keys = set()
+        n_rows = 0
+        with open(self.index_path + '.tmp', 'w') as f:
+            for row in self._read_rows():
+                key = self.row_key(row)
+                n_rows += 1
+                if key not in keys:
+                    keys.add(key)
+                    f.write(key + '\n')
+        os.replace(self.index_path + '.tmp', self.index_path)
+        self._seen = set()
+        self._index_offset = 0
+        self._duplicates = n_rows - len(keys)
+
+    def _rewrite(self, header, rows):
+        """Atomically replaces the CSV (and index) with `rows` under `header`."""
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=header, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(tmp, self.path)
+        self._rebuild_index()
+        self._refresh_index()
+
+    def append(self, rows):
+        """Appends the rows whose key is not in the store yet.
+
+        Args:
+            rows (list): Row dicts.
+
+        Returns:
+            The number of rows written.
+        """
+        with self._locked():
+            self._refresh_index()
+            new_rows = []
+            new_keys = []
+            for row in rows:
+                key = self.row_key(row)
+                if key in self._seen:
+                    continue
+                self._seen.add(key)
+                # NaN would be written as 'nan' and no longer match its key when the index is rebuilt from the CSV
+                new_rows.append({c: None if _is_missing(v) else v for c, v in row.items()})
+                new_keys.append(key)
+            if not new_rows:
+                return 0
+
+            header = self._header()
+            columns = list(dict.fromkeys(c for row in new_rows for c in row))
+            if header is None:
+                header = columns
+                with open(self.path, 'w', newline='') as f:
+                    csv.DictWriter(f, fieldnames=header).writeheader()
+            elif any(c not in header for c in columns):
+                # New columns: one-off rewrite with the wider header, then back to appending
+                header = header + [c for c in columns if c not in header]
+                logging.info(f"Widening {self.path} to columns {header}")
+                self._rewrite(header, list(self._read_rows()))
+                self._seen.update(new_keys)
+
+            with open(self.path, 'a', newline='') as f:
+                csv.DictWriter(f, fieldnames=header, extrasaction='ignore').writerows(new_rows)
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self.index_path, 'a') as f:
+                f.write(''.join(key + '\n' for key in new_keys))
+            self._refresh_index()
+        compacting = self._compaction is not None and self._compaction.is_alive()
+        if self._duplicates > self.compact_ratio * len(self._seen) and not compacting:
+            logging.info(f"{self.path} has {self._duplicates} duplicate rows; compacting in the background")
+            self._compaction = self.compact(background=True)
+        return len(new_rows)
+
+    def compact(self, background=False):
+        """Rewrites the store keeping the newest (last written) row for each key.
+
+        Args:
+            background (bool): Run in a (non-daemon) thread and return it instead of blocking.
+
+        Returns:
+            The thread if `background`, else the number of duplicate rows removed.
+        """
+        if background:
+            thread = threading.Thread(target=self.compact)
+            thread.start()
+            return thread
+
+        with self._locked():
+            header = self._header()
+            if header is None:
+                return 0
+            newest = {}
+            total = 0
+            for row in self._read_rows():
+                total += 1
+                newest[self.row_key(row)] = row
+            kept = list(newest.values())
+            self._rewrite(header, kept)
+            logging.info(f"Compacted {self.path}: removed {total - len(kept)} duplicate rows")
+            return total - len(kept)
+
+
+def _is_missing(value):
+    """True for None and NaN, which are both written as empty cells."""
+    return value is None or (isinstance(value, float) and math.isnan(value))
@@ -1,15 +1,16 @@
 # responses_generator.py
 '''
 This script generates responses for a set of tasks using the LiteLLM API and saves the responses to a CSV file.
-To run the file, add a .env into the same folder that contains the variable OPENAI_API_KEY = 'your api key', 
+To run the file, add a .env into the folder you run `ood generate-responses` from that contains the variable OPENAI_API_KEY = 'your api key', 
 then run the python file to create and add to a csv file called responses.csv
-(this already exists in the main folder and contains around 200 results)
+(this already exists in the repo root and contains around 200 results)
 To change the prompts, go to the tasks dictionary.
 '''
-import pandas as pd
-from litellm import LiteLLM, completion
 import os
-from dotenv import load_dotenv
+import argparse
+from ood.telemetry import track_stage, incr
+from ood.response_store import ResponseStore
+from ood.llm_utils import sample_batches, choice_texts, output_tokens, stream_choices_until_words, MAX_N
 
 
 def initialize_lite_llm():
@@ -17,6 +18,7 @@ def initialize_lite_llm():
     Initialize the LiteLLM with the API key from the .env file.
     """
     # Load environment variables from .env file
+    from dotenv import load_dotenv
     load_dotenv()
     
     # Retrieve the API key
@@ -25,52 +27,73 @@ def initialize_lite_llm():
         raise ValueError("OPENAI_API_KEY is not set in the .env file.")
     
     os.environ["OPENAI_API_KEY"] = api_key
+    from litellm import LiteLLM
     return LiteLLM()
 
 
-def generate_responses(lite_llm, tasks, models, num_completions=3):
+def generate_responses(lite_llm, tasks, models, num_completions=3, n_per_call=MAX_N, stream=False):
     """
     Generate responses for each task and model.
+
+    Where the provider supports it, samples are requested `n_per_call` at a time and fanned out into rows.
+    With `stream=True`, the same batches are streamed and each choice is cut off once the task's word count is
+    reached.
+    Either way `tokens_consumed` records the output tokens generated for the row.
     """
     
     new_data = []
     for task in tasks:
+        messages = [{"content": task["prompt"], "role": "user"}]
         for model in models:
-            for _ in range(num_completions):
-                messages = [{"content": task["prompt"], "role": "user"}]
+            if stream:
+                for _, n in sample_batches(num_completions, model, n_per_call):
+                    word_limits = [task["word_count"]] * n
+                    for response_text, tokens_consumed in stream_choices_until_words(model, messages, word_limits,
+                                                                                     max_tokens=500):
+                        new_data.append({"model": model, "category": task["category"], "output": response_text,
+                                         "tokens_consumed": tokens_consumed})
+                        incr('items')
+                continue
+
+            from litellm import completion
+            for _, n in sample_batches(num_completions, model, n_per_call):
+                kwargs = {"n": n} if n > 1 else {}
                 response = completion(
                     model=model,
                     messages=messages,
-                    max_tokens=500
+                    max_tokens=500,
+                    **kwargs
                 )
-                response_text = response['choices'][0]['message']['content']
+                incr('tokens', response['usage']['total_tokens'])
 
-                if task["word_count"]:
-                    words = response_text.split()[:task["word_count"]]
-                    response_text = " ".join(words)
+                for response_text in choice_texts(response):
+                    tokens_consumed = output_tokens(model, response_text)
+                    if task["word_count"]:
+                        words = response_text.split()[:task["word_count"]]
+                        response_text = " ".join(words)
 
-                new_data.append({"model": model, "category": task["category"], "output": response_text})
+                    new_data.append({"model": model, "category": task["category"], "output": response_text,
+                                     "tokens_consumed": tokens_consumed})
+                    incr('items')
     return new_data
 
 def save_responses(new_data, csv_path='responses.csv'):
     """
     Save new unique responses to the CSV file, ensuring no duplicates.
+
+    Only the new rows are appended; duplicates on (model, category, output) are caught by the store's hash index.
     """
-    try:
-        existing_df = pd.read_csv(csv_path)
-    except FileNotFoundError:
-        existing_df = pd.DataFrame(columns=['model', 'category', 'output'])
-    
-    # Convert new_data to DataFrame and merge with existing
-    new_df = pd.DataFrame(new_data)
-    updated_df = pd.concat([existing_df, new_df]).drop_duplicates(['model', 'category', 'output'])
-    updated_df.to_csv(csv_path, index=False)
-    print(f"CSV file has been updated with {len(new_df)} new unique model responses.")
+    n_new = ResponseStore(csv_path).append(new_data)
+    print(f"CSV file has been updated with {n_new} new unique model responses.")
 
-def main():
+def main(argv=None):
     """
     Main function to run the entire process.
     """
+    parser = argparse.ArgumentParser(description='Generate responses for the prompt tasks into responses.csv.')
+    parser.add_argument('--stream', action='store_true',
+                        help="Stream completions and stop each one once the task's word count is reached")
+    args = parser.parse_args(argv)
    
     lite_llm = initialize_lite_llm()
 
@@ -107,8 +130,8 @@ def main():
     ]
     models = ["gpt-3.5-turbo", "gpt-4-0613"]
     num_completions = 3
-
-    new_data = generate_responses(lite_llm, tasks, models, num_completions)
+    with track_stage('generate_responses', models=models, num_completions=num_completions, stream=args.stream):
+        new_data = generate_responses(lite_llm, tasks, models, num_completions, stream=args.stream)
     save_responses(new_data)
 
 if __name__ == "__main__":
@@ -0,0 +1,114 @@
+import argparse
+import os
+import random
+from ood.telemetry import track_stage, incr
+from ood.response_store import ResponseStore
+from ood.llm_utils import sample_batches, choice_texts, output_tokens, stream_choices_until_words, MAX_N
+
+def initialize_lite_llm():
+    """
+    Initialize the LiteLLM with the API key from the .env file.
+    """
+    from dotenv import load_dotenv
+    load_dotenv()
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY is not set in the .env file.")
+    
+    os.environ["OPENAI_API_KEY"] = api_key
+    from litellm import LiteLLM
+    return LiteLLM()
+
+def load_word_counts(file_name):
+    """
+    Load word counts from a given CSV file and return as a list.
+    """
+    import pandas as pd
+    df = pd.read_csv(file_name)
+    return df['wc'].tolist()
+
+def generate_responses(lite_llm, tasks, models, num_completions=3, n_per_call=MAX_N, stream=False):
+    """
+    Generate responses for each task and model. Adjust to use random word count from task's distribution.
+
+    Where the provider supports it, samples are requested `n_per_call` at a time and each choice gets its own
+    sampled word count. With `stream=True`, the same batches are streamed and each choice is cut off as soon as its
+    sampled word count is reached. Either way `tokens_consumed` records the output tokens generated for the row.
+    """
+    new_data = []
+    for task in tasks:
+        word_counts = task["word_count"]
+        messages = [{"content": task["prompt"], "role": "system"}]
+        for model in models:
+            if stream:
+                for _, n in sample_batches(num_completions, model, n_per_call):
+                    word_limits = [random.choice(word_counts) if word_counts else None for _ in range(n)]
+                    for response_text, tokens_consumed in stream_choices_until_words(model, messages, word_limits,
+                                                                                     max_tokens=600):
+                        new_data.append({"model": model, "category": task["category"], "output": response_text,
+                                         "tokens_consumed": tokens_consumed})
+                        incr('items')
+                continue
+
+            from litellm import completion
+            for _, n in sample_batches(num_completions, model, n_per_call):
+                kwargs = {"n": n} if n > 1 else {}
+                response = completion(
+                    model=model,
+                    messages=messages,
+                    max_tokens=600, # Adjust as needed
+                    **kwargs
+                )
+                incr('tokens', response['usage']['total_tokens'])
+                for response_text in choice_texts(response):
+                    tokens_consumed = output_tokens(model, response_text)
+                    random_wc = random.choice(word_counts) if word_counts else None
+                    if random_wc:
+                        words = response_text.split()[:random_wc]
+                        response_text = " ".join(words)
+                    new_data.append({"model": model, "category": task["category"], "output": response_text,
+                                     "tokens_consumed": tokens_consumed})
+                    incr('items')
+    return new_data
+
+def save_responses(new_data, csv_path='system_results.csv'): # Change csv path here
+    """
+    Save new unique responses to the CSV file, ensuring no duplicates.
+
+    Only the new rows are appended; duplicates on (model, category, output) are caught by the store's hash index.
+    """
+    n_new = ResponseStore(csv_path).append(new_data)
+    print(f"CSV file has been updated with {n_new} new unique model responses.")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate word-count-matched system results into system_results.csv.')
+    parser.add_argument('--stream', action='store_true',
+                        help='Stream completions and stop each one once its sampled word count is reached')
+    args = parser.parse_args(argv)
+    lite_llm = initialize_lite_llm()
+
+    # Load word counts for each domain
+    fiction_wc = load_word_counts("oped_word_counts.csv")
+    startups_wc = load_word_counts("startups_word_counts.csv")
+
+    # Define your tasks, models, and number of completions here
+    tasks = [
+        {
+            "category": "startup idea",
+            "prompt": "INSTRUCTIONS: Give me a startup idea that would appear on Product Hunt. CONTEXT: blah. CONSTRAINTS: Make sure the response is N words. Vary the structure of the idea. Don't follow a specific structure like introducing the name first.",
+            "word_count": startups_wc
+        },
+        {
+            "category": "NYT Headlines",  
+            "prompt": "INSTRUCTIONS: You are the chief editor of New York Times. Write a one-sentence op-ed. CONTEXT: Challenge and engage audiences. CONSTRAINTS: Make sure your response is 10-15 words. Vary the structure.",
+            "word_count": fiction_wc  # Using the correct variable name now
+        }
+    ]
+    models = ["gpt-4"]
+    num_completions = 100  # Adjusted for your requirement of 200 generations per domain
+    with track_stage('generate_system', models=models, num_completions=num_completions, stream=args.stream):
+        new_data = generate_responses(lite_llm, tasks, models, num_completions, stream=args.stream)
+    save_responses(new_data)
+
+if __name__ == "__main__":
+    main()
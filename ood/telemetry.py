@@ -0,0 +1,234 @@
+"""
+Description: Lightweight stage-level instrumentation for the pipeline.
+
+Wrap a unit of work in `track_stage` and bump counters from anywhere inside it. When the stage ends and telemetry
+is enabled, one JSON line is appended to the telemetry file with wall time, items/sec, bytes fetched, retries,
+429s, tokens, hedged/failed-over LLM calls and memory. `rss_delta_mb` is how much the process's resident memory grew
+(or shrank) over the stage; `process_peak_rss_mb` is the peak of the whole process so far, so for stages that share
+a process (e.g. the three `ols_*` passes) it can reflect an earlier stage.
+
+    with track_stage('fetch_osf', provider='socarxiv'):
+        ...
+        incr('items', len(batch))
+        incr('bytes', len(response.content))
+
+Telemetry is off unless OOD_TELEMETRY is set: `ood --telemetry PATH ...` and `ood pipeline` turn it on, so library
+calls (benchmarks, notebooks, tests) never write files they were not asked to.
+
+The active stages are kept per context (a ContextVar), so concurrent stages in different threads count separately.
+Worker threads start with an empty context; submit work through `bind` so the worker's `incr` calls count toward
+the stage that submitted it. Each record names its parent stage (the enclosing stage, or the pipeline stage that
+launched the process), and the summary names the bottleneck among stages that do not wrap other stages.
+
+Environment variables:
+    OOD_TELEMETRY: Telemetry file; unset means nothing is written.
+    OOD_RUN_ID: Groups stages from several processes into one run (set by pipeline.py).
+    OOD_PARENT_STAGE: Parent of the process's outermost stages (set by pipeline.py for each stage it runs).
+    OOD_PROFILE: `cprofile` dumps a .prof per stage; `pyspy` records a flame graph per stage with py-spy.
+
+Run `ood telemetry summary telemetry.jsonl` to see where each run spent its time.
+"""
+import argparse
+import contextvars
+import functools
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+COUNTERS = ('items', 'bytes', 'retries', 'http_429', 'tokens', 'hedges', 'failovers', 'cache_hits')
+
+_lock = threading.Lock()
+_active = contextvars.ContextVar('ood_active_stages', default=())
+
+
+def enable(path):
+    """Turns telemetry on for this process and the processes it starts, appending to `path`."""
+    os.environ['OOD_TELEMETRY'] = path
+
+
+def bind(fn):
+    """Wraps `fn` to run in a copy of the caller's context, so stages open here stay active in worker threads.
+
+    Example:
+        executor.map(bind(fetch_month), months)
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        # A context can only be entered by one thread at a time, so each call gets its own copy
+        return context.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+def run_id():
+    """Returns the id for this run, shared across processes through OOD_RUN_ID."""
+    if 'OOD_RUN_ID' not in os.environ:
+        os.environ['OOD_RUN_ID'] = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    return os.environ['OOD_RUN_ID']
+
+
+def current_rss_mb():
+    """Current resident set size of this process in MB, or None where /proc is not available."""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * resource.getpagesize() / 1024 ** 2
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return rss / (1024 ** 2) if sys.platform == 'darwin' else rss / 1024
+
+
+def incr(counter, n=1):
+    """Adds `n` to a counter on the innermost active stage. A no-op outside a stage.
+
+    Args:
+        counter (str): One of COUNTERS.
+        n (int): Amount to add.
+    """
+    stages = _active.get()
+    if stages:
+        with _lock:
+            stages[-1]['counters'][counter] += n
+
+
+@contextmanager
+def _profiler(stage_name):
+    """Starts the profiler picked by OOD_PROFILE (if any) for the duration of a stage."""
+    mode = os.getenv('OOD_PROFILE', '').lower()
+    if mode not in ('cprofile', 'pyspy'):
+        yield
+        return
+
+    os.makedirs('profiles', exist_ok=True)
+    out = os.path.join('profiles', f"{stage_name}_{run_id()}")
+    if mode == 'cprofile':
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(out + '.prof')
+    else:
+        proc = subprocess.Popen(['py-spy', 'record', '--pid', str(os.getpid()), '--output', out + '.svg'],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            yield
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+@contextmanager
+def track_stage(name, **extra):
+    """Times a stage and writes its metrics as one JSON line when it ends.
+
+    Args:
+        name (str): Stage name.
+        **extra: Extra fields stored with the record (e.g. provider, model).
+
+    Yields:
+        The stage record; counters can also be bumped with `incr`.
+    """
+    stages = _active.get()
+    parent = stages[-1]['stage'] if stages else os.getenv('OOD_PARENT_STAGE')
+    record = {'stage': name, 'counters': defaultdict(int)}
+    token = _active.set(stages + (record,))
+    start = time.time()
+    rss_start = current_rss_mb()
+    status = 'ok'
+    try:
+        with _profiler(name):
+            yield record
+    except BaseException:
+        status = 'error'
+        raise
+    finally:
+        wall = time.time() - start
+        rss_end = current_rss_mb()
+        _active.reset(token)
+        counters = {c: record['counters'].get(c, 0) for c in COUNTERS}
+        row = {
+            'run_id': run_id(),
+            'stage': name,
+            'parent': parent,
+            'status': status,
+            'start': start,
+            'wall_s': round(wall, 3),
+            **counters,
+            'items_per_s': round(counters['items'] / wall, 3) if wall > 0 else None,
+            'rss_delta_mb': None if rss_start is None or rss_end is None else round(rss_end - rss_start, 1),
+            'process_peak_rss_mb': round(peak_rss_mb(), 1),
+            **extra,
+        }
+        path = os.getenv('OOD_TELEMETRY')
+        if path:
+            with _lock, open(path, 'a') as f:
+                f.write(json.dumps(row) + '\n')
+
+
+def summarize(path, only_run=None):
+    """Prints a per-run report and names the bottleneck stage of each run.
+
+    Wrapper stages (e.g. `pipeline:fetch_opeds`, whose time includes the stages it launched) are listed but not
+    picked as the bottleneck when a stage they wrap was recorded.
+
+    Args:
+        path (str): Telemetry file.
+        only_run (str, optional): Only report this run id.
+    """
+    runs = defaultdict(list)
+    with open(path) as f:
+        for line in f:
+            row = json.loads(line)
+            if only_run is None or row['run_id'] == only_run:
+                runs[row['run_id']].append(row)
+
+    for rid, rows in runs.items():
+        rows.sort(key=lambda r: r['wall_s'], reverse=True)
+        span = max(r['start'] + r['wall_s'] for r in rows) - min(r['start'] for r in rows)
+        print(f"Run {rid} ({len(rows)} stages, {span:.1f}s end to end)")
+        print(f"  {'stage':<24}{'wall_s':>10}{'items/s':>10}{'MB':>10}{'retries':>9}{'429s':>7}"
+              f"{'tokens':>10}{'rss_delta_mb':>14}")
+        for r in rows:
+            ips = '-' if r['items_per_s'] is None else f"{r['items_per_s']:.1f}"
+            rss = '-' if r.get('rss_delta_mb') is None else f"{r['rss_delta_mb']:+.0f}"
+            print(f"  {r['stage']:<24}{r['wall_s']:>10.1f}{ips:>10}{r['bytes'] / 1e6:>10.1f}{r['retries']:>9}"
+                  f"{r['http_429']:>7}{r['tokens']:>10}{rss:>14}"
+                  f"{'  (error)' if r['status'] != 'ok' else ''}")
+        span = max(span, 1e-9)
+        parents = {r.get('parent') for r in rows}
+        slowest = next((r for r in rows if r['stage'] not in parents), rows[0])
+        note = ''
+        if slowest['http_429'] or slowest['retries']:
+            note = f" -- {slowest['http_429']} 429s and {slowest['retries']} retries, so likely rate limited"
+        print(f"  Bottleneck: {slowest['stage']} ({slowest['wall_s'] / span:.0%} of the run){note}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Summarize pipeline telemetry.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    summary = subparsers.add_parser('summary', help='Per-run report with the bottleneck stage')
+    summary.add_argument('path', nargs='?', default='telemetry.jsonl', help='Telemetry file')
+    summary.add_argument('--run_id', default=None, help='Only report this run')
+    args = parser.parse_args(argv)
+    summarize(args.path, args.run_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import ast
+import importlib.util
+import json
+
+import pytest
+
+from ood import cli
+
+
+@pytest.mark.parametrize('command', list(cli.COMMANDS.values()) + list(cli.FETCHERS.values()),
+                         ids=lambda c: c.module)
+def test_every_command_module_has_a_main(command):
+    spec = importlib.util.find_spec(command.module)
+    with open(spec.origin) as f:
+        tree = ast.parse(f.read())
+    mains = [node for node in tree.body if isinstance(node, ast.FunctionDef) and node.name == 'main']
+    assert mains and [a.arg for a in mains[0].args.args] == ['argv']
+
+
+def test_unknown_command_is_rejected(capsys):
+    with pytest.raises(SystemExit):
+        cli.main(['fetch', 'tweets'])
+    assert 'invalid choice' in capsys.readouterr().err
+
+
+def test_arguments_after_the_command_reach_its_main(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    records = [{'dataset_id': 'a', 'text': 'An app that swaps houseplants between neighbors'},
+               {'dataset_id': 'b', 'text': 'An app that swaps houseplants between neighbors!'}]
+    (tmp_path / 'ideas.jsonl').write_text(''.join(json.dumps(r) + '\n' for r in records))
+    cli.main(['--log_file', '-', 'dedup', '--input', 'ideas.jsonl', '--output', 'kept.jsonl'])
+    assert [json.loads(line)['dataset_id'] for line in (tmp_path / 'kept.jsonl').read_text().splitlines()] == ['a']
+    assert not (tmp_path / 'telemetry.jsonl').exists()
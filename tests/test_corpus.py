@@ -0,0 +1,70 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ood.corpus import codes_for, label_pairs, load_cutoffs, read_window, window_table
+from ood.dataset import SOURCES, ingest
+
+CUTOFFS = {'gpt-3.5-turbo': '2021-09-01', 'gpt-4-0613': '2021-09-01', 'claude-2': '2023-01-01T00:00:00Z'}
+
+
+@pytest.fixture
+def cutoffs(tmp_path):
+    path = tmp_path / 'model_cutoffs.json'
+    path.write_text(json.dumps(CUTOFFS))
+    return load_cutoffs(str(path))
+
+
+def humans():
+    return pd.DataFrame({
+        'dataset_id': ['s1', 's2', 's3', 's4', 's5'],
+        'date': ['2021-08-31T23:00:00-02:00', '2021-09-01', '2022-06-15', '2023-02-01T00:00:00Z', None],
+    })
+
+
+def test_cutoffs_are_naive_utc(cutoffs):
+    assert cutoffs['claude-2'] == np.datetime64('2023-01-01T00:00:00', 'ns')
+
+
+def test_window_table_flags_each_item_once_per_model(cutoffs):
+    windows = window_table(humans(), cutoffs)
+    # s1 is 2021-09-01T01:00 UTC, just past the 2021-09-01 cutoff; s2 is exactly on it
+    assert windows['gpt-4-0613'].to_dict() == {'s1': 0, 's2': 1, 's3': 0, 's4': 0, 's5': 0}
+    assert windows['claude-2'].to_dict() == {'s1': 1, 's2': 1, 's3': 1, 's4': 0, 's5': 0}
+    assert set(windows.dtypes) == {np.dtype('int8')}
+
+
+def test_window_table_needs_unique_ids(cutoffs):
+    with pytest.raises(ValueError):
+        window_table(pd.concat([humans(), humans()]), cutoffs)
+
+
+def test_label_pairs_gathers_by_code(cutoffs):
+    windows = window_table(humans(), cutoffs)
+    pairs = pd.DataFrame({'human_id': ['s3', 's2', 's3', 's4'], 'model': ['claude-2', 'gpt-4-0613', 'gpt-4-0613',
+                                                                       'claude-2']})
+    assert label_pairs(pairs, windows).tolist() == [1, 1, 0, 0]
+    codes = codes_for(pairs['human_id'], windows.index)
+    assert label_pairs(pairs, windows, human_codes=codes).tolist() == [1, 1, 0, 0]
+    with pytest.raises(KeyError):
+        label_pairs(pd.DataFrame({'human_id': ['nope'], 'model': ['claude-2']}), windows)
+
+
+def test_read_window_agrees_with_window_table(tmp_path, cutoffs):
+    records = [{'dataset_id': i, 'description': f'Idea {i}', 'date': pd.to_datetime(d, utc=True).isoformat()}
+               for i, d in humans().dropna().itertuples(index=False)]
+    path = tmp_path / 'startups.jsonl'
+    path.write_text(''.join(json.dumps(r) + '\n' for r in records))
+    root = str(tmp_path / 'human_corpus')
+    ingest(str(path), SOURCES['startups'], root)
+
+    windows = window_table(humans().dropna(), cutoffs)
+    for model in CUTOFFS:
+        inside = read_window(root, model, cutoffs, columns=['dataset_id'])['dataset_id']
+        outside = read_window(root, model, cutoffs, inside=False, columns=['dataset_id'])['dataset_id']
+        assert set(inside) == set(windows.index[windows[model] == 1])
+        assert set(outside) == set(windows.index[windows[model] == 0])
+    with pytest.raises(KeyError):
+        read_window(root, 'llama-2', cutoffs)
@@ -0,0 +1,62 @@
+import json
+import os
+
+import pyarrow.dataset as ds
+import pytest
+
+from ood.dataset import MANIFEST_FILE, SOURCES, date_filter, ingest, partitioning, read_dataset
+
+OPEDS = [
+    {'dataset_id': 'oped_0', 'abstract': 'Cities should tax empty lots', 'date': '2023-01-15T10:00:00+0000',
+     'byline': 'By A. Writer'},
+    {'dataset_id': 'oped_1', 'abstract': 'Bring back the night train', 'date': '2023-01-31T23:30:00-05:00'},
+    {'dataset_id': 'oped_2', 'abstract': 'Libraries are the last free room', 'date': '2023-03-02'},
+    {'abstract': 'Undated opinions are not news', 'date': None},
+]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    path = tmp_path / 'opeds.jsonl'
+    path.write_text(''.join(json.dumps(r) + '\n' for r in OPEDS))
+    root = str(tmp_path / 'human_corpus')
+    assert ingest(str(path), SOURCES['opeds'], root, batch_size=2) == 3
+    return root
+
+
+def test_ingest_normalizes_partitions_and_writes_a_manifest(corpus):
+    df = read_dataset(corpus).sort_values('dataset_id')
+    assert df['dataset_id'].tolist() == ['oped_0', 'oped_1', 'oped_2']
+    # Months come from the UTC date: 2023-01-31T23:30-05:00 is in February
+    assert df['month'].tolist() == ['2023-01', '2023-02', '2023-03']
+    assert set(df['category']) == {'opeds'}
+    assert json.loads(df['metadata'].iloc[0]) == {'byline': 'By A. Writer'}
+    with open(os.path.join(corpus, 'category=opeds', MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    assert (manifest['rows'], manifest['dropped'], manifest['months']) == (3, 1, ['2023-01', '2023-02', '2023-03'])
+
+
+def test_ingest_reads_json_arrays_and_rewrites_the_category(tmp_path, corpus):
+    path = tmp_path / 'opeds.json'
+    path.write_text(json.dumps(OPEDS[:1]))
+    assert ingest(str(path), SOURCES['opeds'], corpus) == 1
+    assert sorted(os.listdir(os.path.join(corpus, 'category=opeds'))) == [MANIFEST_FILE, 'month=2023-01']
+
+
+def test_read_filters_dates_and_categories(tmp_path, corpus):
+    startups = tmp_path / 'startups.jsonl'
+    startups.write_text(json.dumps({'description': 'A to-do app for cats', 'date': '2023-02-10'}) + '\n')
+    ingest(str(startups), SOURCES['startups'], corpus)
+
+    window = read_dataset(corpus, columns=['dataset_id'], start='2023-02-01', end='2023-03-02')
+    assert sorted(window['dataset_id']) == ['oped_1', 'startup_0']
+    opeds = read_dataset(corpus, columns=['dataset_id'], categories=['opeds'], start='2023-02-01')
+    assert sorted(opeds['dataset_id']) == ['oped_1', 'oped_2']
+
+
+def test_date_filter_prunes_partitions(corpus):
+    dataset = ds.dataset(corpus, format='parquet', partitioning=partitioning())
+    assert len(dataset.files) == 3
+    fragments = list(dataset.get_fragments(filter=date_filter('2023-02-01', '2023-03-01')))
+    assert [os.path.basename(os.path.dirname(f.path)) for f in fragments] == ['month=2023-02']
+    assert date_filter() is None
@@ -0,0 +1,69 @@
+import itertools
+import json
+
+import numpy as np
+import pytest
+
+from ood.diversity import (cross_pairwise_stats, diversity_metrics, load_group_embeddings, sampled_pairwise_stats,
+                           vendi_score, within_pairwise_stats)
+
+
+def unit_rows(n, d=8, seed=0):
+    X = np.random.default_rng(seed).normal(size=(n, d)).astype(np.float32)
+    return X / np.linalg.norm(X, axis=1, keepdims=True)
+
+
+def brute_force(X, Y=None):
+    pairs = itertools.combinations(range(len(X)), 2) if Y is None else itertools.product(range(len(X)), range(len(Y)))
+    sims = np.array([float(X[i] @ (X if Y is None else Y)[j]) for i, j in pairs])
+    return sims.mean(), sims.std()
+
+
+def test_tiled_within_stats_match_brute_force():
+    X = unit_rows(37)
+    stats = within_pairwise_stats(X, tile=8)
+    mean, sd = brute_force(X)
+    assert stats['n_pairs'] == 37 * 36 // 2
+    assert stats['mean_sim'] == pytest.approx(mean, abs=1e-6)
+    assert stats['sd_sim'] == pytest.approx(sd, abs=1e-6)
+    assert within_pairwise_stats(X[:1])['mean_sim'] is None
+
+
+def test_tiled_cross_stats_match_brute_force():
+    X, Y = unit_rows(13, seed=1), unit_rows(21, seed=2)
+    stats = cross_pairwise_stats(X, Y, tile=5)
+    mean, sd = brute_force(X, Y)
+    assert stats['n_pairs'] == 13 * 21
+    assert stats['mean_sim'] == pytest.approx(mean, abs=1e-6)
+    assert stats['sd_sim'] == pytest.approx(sd, abs=1e-6)
+
+
+def test_sampled_stats_cover_the_exact_mean():
+    X = unit_rows(60, seed=3)
+    exact = within_pairwise_stats(X)['mean_sim']
+    sampled = sampled_pairwise_stats(X, n_samples=200_000, chunk=30_000)
+    assert sampled['ci_low'] <= exact <= sampled['ci_high']
+    assert sampled['n_pairs'] == 60 * 59 // 2
+
+
+def test_vendi_score_counts_distinct_items():
+    assert vendi_score(np.eye(4)) == pytest.approx(4)
+    assert vendi_score(np.tile(np.eye(4)[:1], (5, 1))) == pytest.approx(1)
+    assert vendi_score(np.empty((0, 4))) is None
+
+
+def test_metrics_from_embedding_file(tmp_path):
+    path = tmp_path / 'ai_ideas_w_vec.jsonl'
+    rows = [{'model': model, 'category': 'startup', 'vec': list(map(float, vec))}
+            for model, seed in (('gpt-4', 4), ('claude-2', 5)) for vec in unit_rows(6, seed=seed)]
+    rows.append({'model': 'gpt-4', 'category': 'startup', 'vec': [0.0] * 8})
+    path.write_text(''.join(json.dumps(r) + '\n' for r in rows))
+    groups = load_group_embeddings(str(path))
+    assert groups[('gpt-4', 'startup')].shape == (7, 8)
+
+    df = diversity_metrics(groups, exact_max_pairs=20, n_samples=1000)
+    by_kind = df.set_index(['kind', 'model_a'])
+    assert by_kind.loc[('within', 'gpt-4'), 'method'] == 'sampled'
+    assert by_kind.loc[('within', 'claude-2'), 'method'] == 'exact'
+    assert by_kind.loc[('cross', 'claude-2'), 'model_b'] == 'gpt-4'
+    assert by_kind.loc[('cross', 'claude-2'), 'method'] == 'sampled'
@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+
+from ood import fetch_fiction
+from ood.fetch_fiction import extract_description, scrape_books_for_month
+from ood.fetch_utils import JsonlCache
+
+LISTING = 'https://www.fictiondb.com/new-releases/new-books-by-month.htm?date=jan-2020&sort=da&s=1'
+
+
+def book_row(slug, genre=True):
+    genre_tag = '<span itemprop="genre">Mystery /</span>' if genre else ''
+    return (f'<tr class="g"><td><a itemprop="author">Author {slug}</a></td>'
+            f'<td><a itemprop="url" href="../title/{slug}.htm"><span itemprop="name">Title {slug}</span></a></td>'
+            f'<td>{genre_tag}<span itemprop="datePublished">Jan 2020</span></td></tr>')
+
+
+def book_url(slug):
+    return f"https://www.fictiondb.com/title/{slug}.htm"
+
+
+class FakeSession:
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+
+    def get(self, url, headers=None):
+        self.requested.append(url)
+        text = self.pages.get(url, '')
+        return SimpleNamespace(status_code=200 if url in self.pages else 404, text=text, content=text.encode())
+
+
+def test_extract_description():
+    assert extract_description('<div id="nav">x</div><div id="description"> A quiet town. </div>') == 'A quiet town.'
+    assert extract_description('<p>No description</p>') is None
+
+
+def test_cached_and_seen_books_are_not_fetched(tmp_path, monkeypatch):
+    monkeypatch.setattr('ood.fetch_fiction.time.sleep', lambda s: None)
+    listing = '<table>' + ''.join(book_row(s) for s in ('a', 'b', 'c', 'a')) + '</table>'
+    session = FakeSession({LISTING: listing, book_url('b'): '<div id="description">Fetched b</div>'})
+    with JsonlCache(str(tmp_path / 'cache.jsonl')) as cache:
+        cache.set(book_url('a'), 'Cached a')
+        seen = {book_url('c')}
+        books, n_fetched = scrape_books_for_month(LISTING, cache, seen, session)
+        assert [b['description'] for b in books] == ['Cached a', 'Fetched b']
+        assert n_fetched == 1
+        assert seen == {book_url(s) for s in 'abc'}
+        assert cache.get(book_url('b')) == 'Fetched b'
+    assert session.requested == [LISTING, book_url('b')]
+
+    # In a new run only 'c', which was seen but never cached, needs its page fetched
+    with JsonlCache(str(tmp_path / 'cache.jsonl')) as cache:
+        books, n_fetched = scrape_books_for_month(LISTING, cache, set(), session)
+    assert (len(books), n_fetched) == (3, 1)
+    assert session.requested[2:] == [LISTING, book_url('c')]
+
+
+def test_a_page_that_fails_part_way_does_not_mark_its_books_seen(monkeypatch):
+    monkeypatch.setattr('ood.fetch_fiction.time.sleep', lambda s: None)
+    listing = '<table>' + book_row('a') + book_row('broken', genre=False) + '</table>'
+    seen = set()
+    assert scrape_books_for_month(LISTING, None, seen, FakeSession({LISTING: listing})) == ([], 0)
+    assert seen == set()
+
+
+def test_cached_pages_skip_the_book_pause_but_not_the_listing_delay(tmp_path, monkeypatch):
+    waits, sleeps = [], []
+
+    class FakeLimiter:
+        def __init__(self, min_interval):
+            self.min_interval = min_interval
+
+        def wait(self):
+            waits.append(self.min_interval)
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(fetch_fiction, 'RateLimiter', FakeLimiter)
+    monkeypatch.setattr('ood.fetch_fiction.time.sleep', sleeps.append)
+    monkeypatch.setattr(fetch_fiction, 'scrape_books_for_month', lambda url, cache, seen, session: ([], 0))
+    fetch_fiction.main(['--start_date', '2020-01-01', '--end_date', '2020-02-01', '--max_pages', '3',
+                        '--min_interval', '5', '--cache', str(tmp_path / 'cache.jsonl')])
+    assert waits == [5.0] * 4
+    assert sleeps == []
@@ -0,0 +1,34 @@
+import json
+import time
+from datetime import datetime
+
+from ood import fetch_nyt_opeds
+from ood.fetch_nyt_opeds import month_starts, parse_byline, stream_nyt_headlines
+
+
+def test_month_starts_crosses_year():
+    assert month_starts(datetime(2022, 11, 1), datetime(2023, 1, 15)) == [
+        datetime(2022, 11, 1), datetime(2022, 12, 1), datetime(2023, 1, 1)]
+
+
+def test_parse_byline():
+    byline = {'original': 'By A B', 'person': [{'firstname': 'A', 'lastname': 'B'}], 'organization': ''}
+    assert parse_byline(byline) == {'Original': 'By A B', 'People': 'B A', 'Organizations': ''}
+
+
+def test_stream_keeps_month_order_when_months_finish_out_of_order(tmp_path, monkeypatch):
+    def fake_month(api_key, current_date, session, rate_limiter):
+        rate_limiter.wait()
+        # Earlier months take longer, so they finish last
+        time.sleep(0.05 * (13 - current_date.month))
+        for i in range(3):
+            yield {'month': current_date.month, 'i': i}
+
+    monkeypatch.setattr(fetch_nyt_opeds, 'stream_month_opeds', fake_month)
+    out = tmp_path / 'opeds.jsonl'
+    n = stream_nyt_headlines('key', datetime(2023, 1, 1), datetime(2023, 4, 1), str(out), workers=4,
+                             min_interval=0)
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    assert n == 12
+    assert [(r['month'], r['i']) for r in rows] == [(m, i) for m in range(1, 5) for i in range(3)]
+    assert list(tmp_path.iterdir()) == [out]
@@ -0,0 +1,49 @@
+import threading
+import time
+from datetime import datetime
+
+from ood.fetch_osf_preprints import month_windows, parse_osf_preprint
+from ood.fetch_utils import RateLimiter
+
+
+def test_month_windows_cover_range_by_calendar_month():
+    windows = month_windows(datetime(2023, 1, 15), datetime(2023, 3, 10))
+    assert windows == [
+        (datetime(2023, 1, 15), datetime(2023, 1, 31)),
+        (datetime(2023, 2, 1), datetime(2023, 2, 28)),
+        (datetime(2023, 3, 1), datetime(2023, 3, 10)),
+    ]
+
+
+def test_parse_osf_preprint_dedups_tags_and_subjects():
+    info = {
+        'id': 'abc12',
+        'attributes': {'title': 't', 'description': 'd', 'tags': ['x', 'x', 'y'], 'date_created': '2023-01-02',
+                       'doi': None, 'is_published': True,
+                       'subjects': [[{'text': 'Sociology'}, {'text': 'Social Sciences'}], [{'text': 'Sociology'}]]},
+        'links': {'html': 'https://osf.io/abc12'},
+    }
+    parsed = parse_osf_preprint(info)
+    assert sorted(parsed['tags']) == ['x', 'y']
+    assert sorted(parsed['subjects']) == ['Social Sciences', 'Sociology']
+    assert parsed['html_url'] == 'https://osf.io/abc12'
+
+
+def test_rate_limiter_spaces_calls_across_threads():
+    limiter = RateLimiter(0.05)
+    starts = []
+    lock = threading.Lock()
+
+    def call():
+        limiter.wait()
+        with lock:
+            starts.append(time.monotonic())
+
+    threads = [threading.Thread(target=call) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    starts.sort()
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert min(gaps) >= 0.04
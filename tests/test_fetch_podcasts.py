@@ -0,0 +1,38 @@
+from collections import Counter
+from datetime import datetime
+
+from ood import fetch_podcasts
+from ood.fetch_podcasts import date_to_epoch, get_podcast_data, plan_step, window_quota
+
+
+def test_plan_step_spreads_remaining_requests_and_jumps_on_zero_yield():
+    day = 86400
+    assert plan_step(100, 100 * day, 10, day, day, 90 * day) == 10 * day
+    assert plan_step(100, 100 * day, 0, 4 * day, day, 90 * day) == 8 * day
+    assert plan_step(100, 100 * day, 1000, 4 * day, day, 90 * day) == 90 * day
+
+
+def test_window_quota():
+    assert window_quota(7 * 86400, 3) == 21
+    assert window_quota(3600, 3) == 1
+
+
+def test_sample_follows_the_per_day_quota(monkeypatch):
+    # Every window has far more trending feeds than the quota allows
+    def fake_fetch(session, since, max_results, auth, rate_limiter):
+        return [{'id': f"{since}_{i}", 'since': since} for i in range(max_results + 50)]
+
+    monkeypatch.setattr(fetch_podcasts, 'fetch_podcasts', fake_fetch)
+    podcasts = get_podcast_data('2023-01-01', '2023-12-31', 730, 'key', 'secret', debug=False, workers=3,
+                                per_request=40, min_interval=0)
+
+    assert len(podcasts) == 730
+    by_quarter = Counter((datetime.fromtimestamp(p['since']).month - 1) // 3 for p in podcasts)
+    # Two per day: each quarter gets about 2 * its days, not whatever the first windows returned
+    assert sorted(by_quarter) == [0, 1, 2, 3]
+    for quarter, count in by_quarter.items():
+        assert 150 <= count <= 215, (quarter, count)
+    start = date_to_epoch('2023-01-01')
+    per_window = Counter(p['since'] for p in podcasts)
+    assert max(per_window.values()) <= 40
+    assert min(per_window) == start
@@ -0,0 +1,24 @@
+from ood.fetch_utils import JsonlCache
+
+
+def test_jsonl_cache_persists_and_last_write_wins(tmp_path):
+    path = str(tmp_path / 'cache.jsonl')
+    with JsonlCache(path) as cache:
+        cache.set('https://example.com/1', 'first')
+        cache.set('https://example.com/2', None)
+        cache.set('https://example.com/1', 'second')
+    with JsonlCache(path) as cache:
+        assert len(cache) == 2
+        assert cache.get('https://example.com/1') == 'second'
+        assert 'https://example.com/2' in cache and cache.get('https://example.com/2') is None
+        assert cache.get('https://example.com/3', 'default') == 'default'
+
+
+def test_jsonl_cache_recovers_from_a_line_cut_short(tmp_path):
+    path = tmp_path / 'cache.jsonl'
+    path.write_text('{"key": "a", "value": "kept"}\n{"key": "b", "val')
+    with JsonlCache(str(path)) as cache:
+        assert 'b' not in cache
+        cache.set('b', 'refetched')
+    with JsonlCache(str(path)) as cache:
+        assert (cache.get('a'), cache.get('b')) == ('kept', 'refetched')
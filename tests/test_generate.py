@@ -0,0 +1,42 @@
+import pytest
+
+from ood import generate, llm_utils
+from ood.llm_utils import MAX_N
+
+pytest.importorskip('tqdm')
+
+TASKS = [{'category': 'startup', 'prompt': 'Pitch a startup.'}]
+
+
+@pytest.fixture
+def fake_completion(monkeypatch):
+    """Replaces safe_completion with one that records each call's n and can fail batches."""
+    calls = []
+    failing = {'batch': False}
+
+    def complete(task, model, n=1, deployments=None, **kwargs):
+        calls.append(n)
+        if n > 1 and failing['batch']:
+            raise ValueError('bad request')
+        return [f"{task['category']} idea" for _ in range(n)]
+
+    monkeypatch.setattr(llm_utils, 'supports_n', lambda model: True)
+    monkeypatch.setattr(generate, 'safe_completion', complete)
+    return calls, failing
+
+
+def test_dataset_ids_do_not_depend_on_batching(fake_completion):
+    calls, _ = fake_completion
+    one_by_one = generate.generate_responses(TASKS, ['gpt-4'], num_completions=5, n_per_call=1)
+    batched = generate.generate_responses(TASKS, ['gpt-4'], num_completions=5, n_per_call=MAX_N)
+    assert calls == [1] * 5 + [5]
+    assert [row['dataset_id'] for row in batched] == [row['dataset_id'] for row in one_by_one]
+    assert [row['dataset_id'] for row in batched] == [f"gpt-4_startup_{i}" for i in range(5)]
+
+
+def test_a_failed_batch_is_retried_one_sample_at_a_time(fake_completion):
+    calls, failing = fake_completion
+    failing['batch'] = True
+    rows = generate.generate_responses(TASKS, ['gpt-4'], num_completions=3, n_per_call=MAX_N)
+    assert calls == [3, 1, 1, 1]
+    assert [row['dataset_id'] for row in rows] == [f"gpt-4_startup_{i}" for i in range(3)]
@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+pytest.importorskip('litellm')
+
+from ood.llm_utils import LatencyTracker, hedged_completion  # noqa: E402
+from ood.mock_llm_server import serve  # noqa: E402
+from ood.telemetry import track_stage  # noqa: E402
+
+MODEL = 'openai/gpt-3.5-turbo'
+MESSAGES = [{'role': 'user', 'content': 'Give me a startup idea.'}]
+
+
+@pytest.fixture
+def servers():
+    started = []
+
+    def start(**settings):
+        server = serve(port=0, **{'latency': 'fixed:0.01', **settings})
+        started.append(server)
+        return server
+
+    yield start
+    for server in started:
+        server.shutdown()
+
+
+def deployment(server):
+    return {'api_base': f"http://127.0.0.1:{server.server_address[1]}/v1", 'api_key': 'mock', 'max_retries': 0}
+
+
+def fast_tracker():
+    tracker = LatencyTracker(min_samples=5)
+    for _ in range(5):
+        tracker.record(MODEL, 0.05)
+    return tracker
+
+
+def test_stalled_deployment_is_hedged_to_the_next_one(servers):
+    stalled = servers(stall_prob=1.0, stall_s=5.0)
+    healthy = servers()
+    start = time.monotonic()
+    with track_stage('hedge_test') as record:
+        response = hedged_completion(MODEL, MESSAGES, [deployment(stalled), deployment(healthy)], fast_tracker(),
+                                     max_tokens=20)
+    assert time.monotonic() - start < 3
+    assert response['choices'][0]['message']['content']
+    assert record['counters']['hedges'] == 1
+    assert (stalled.stats['requests'], healthy.stats['requests']) == (1, 1)
+
+
+def test_failing_deployment_fails_over(servers):
+    limited = servers(rate_429=1.0)
+    healthy = servers()
+    with track_stage('failover_test') as record:
+        response = hedged_completion(MODEL, MESSAGES, [deployment(limited), deployment(healthy)], LatencyTracker(),
+                                     max_tokens=20)
+    assert response['choices']
+    assert record['counters']['failovers'] == 1
+    assert (limited.stats['requests'], healthy.stats['requests']) == (1, 1)
+
+
+def test_each_deployment_gets_at_most_one_request_when_all_fail(servers):
+    first = servers(stall_prob=1.0, stall_s=3.0)
+    second = servers(stall_prob=1.0, stall_s=3.0)
+    with pytest.raises(Exception):
+        hedged_completion(MODEL, MESSAGES, [deployment(first), deployment(second)], fast_tracker(), max_tokens=20,
+                          timeout=0.5)
+    time.sleep(0.2)
+    assert (first.stats['requests'], second.stats['requests']) == (1, 1)
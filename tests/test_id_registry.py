@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from ood.id_registry import IdRegistry
+
+
+def test_codes_follow_first_insertion_order():
+    registry = IdRegistry(['h1', 'h2'])
+    assert registry.add(['a1', 'h2', 'a1', 'a2']).tolist() == [2, 1, 2, 3]
+    assert len(registry) == 4 and 'a2' in registry and 'a3' not in registry
+    assert registry.codes(['a2', 'h1', 'a2']).dtype == np.int32
+    assert registry.codes(['a2', 'h1', 'a2']).tolist() == [3, 0, 3]
+    assert registry.ids([3, 0]).tolist() == ['a2', 'h1']
+
+
+def test_initial_ids_must_be_unique():
+    with pytest.raises(ValueError):
+        IdRegistry(['h1', 'h1'])
+
+
+def test_unknown_ids_raise():
+    with pytest.raises(KeyError, match='1 ids'):
+        IdRegistry(['h1']).codes(['h1', 'x', 'x'])
+
+
+def test_save_and_load_round_trip(tmp_path):
+    registry = IdRegistry([f"startup_{i}" for i in range(5)])
+    registry.add(['gpt-4_startup_0', 'claude-2_startup_0'])
+    path = str(tmp_path / 'id_registry.npz')
+    registry.save(path)
+    loaded = IdRegistry.load(path)
+    assert loaded.ids(np.arange(len(loaded))).tolist() == registry.ids(np.arange(len(registry))).tolist()
+    assert loaded.codes(['claude-2_startup_0']).tolist() == [6]
@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+from ood import llm_utils
+from ood.llm_utils import MAX_N, LatencyTracker, collect_until_words, sample_batches
+
+
+def chunk(*choices):
+    return SimpleNamespace(choices=[SimpleNamespace(index=i, delta=SimpleNamespace(content=text), finish_reason=end)
+                                    for i, text, end in choices])
+
+
+def test_collect_cuts_each_choice_at_its_own_limit_and_skips_empty_chunks():
+    chunks = [
+        SimpleNamespace(choices=[]),
+        chunk((0, 'one two', None), (1, 'alpha', None)),
+        chunk((0, ' three', None), (1, ' beta gam', None)),
+        SimpleNamespace(choices=None),
+        chunk((0, ' four five', None), (1, 'ma delta', None)),
+        chunk((1, ' epsilon', None)),
+    ]
+    consumed = []
+
+    def stream():
+        for c in chunks:
+            consumed.append(c)
+            yield c
+
+    texts = collect_until_words(stream(), [3, 3])
+    assert texts[0].split()[:3] == ['one', 'two', 'three']
+    # "gam" + "ma" is one word, so choice 1 has alpha beta gamma
+    assert texts[1].split()[:3] == ['alpha', 'beta', 'gamma']
+    # The stream stops as soon as both choices are done
+    assert len(consumed) == 5
+
+
+def test_collect_reads_to_the_end_without_a_limit():
+    chunks = [chunk((0, 'a b', None)), chunk((0, ' c', 'stop'))]
+    assert collect_until_words(iter(chunks), [None]) == ['a b c']
+
+
+def test_latency_tracker_p95_needs_min_samples():
+    tracker = LatencyTracker(window=100, min_samples=10)
+    for i in range(9):
+        tracker.record('m', i)
+    assert tracker.p95('m') is None
+    for i in range(9, 100):
+        tracker.record('m', i)
+    assert tracker.p95('m') == 95
+
+
+def test_sample_batches_fall_back_to_one_per_call_without_n(monkeypatch):
+    monkeypatch.setattr(llm_utils, 'supports_n', lambda model: False)
+    assert sample_batches(3, 'claude-2') == [(0, 1), (1, 1), (2, 1)]
+
+
+def test_sample_batches_cap_n_at_max_n(monkeypatch):
+    monkeypatch.setattr(llm_utils, 'supports_n', lambda model: True)
+    assert sample_batches(300, 'gpt-4', n_per_call=1000) == [(0, MAX_N), (MAX_N, MAX_N), (2 * MAX_N, 300 - 2 * MAX_N)]
+    assert sample_batches(5, 'gpt-4', n_per_call=2) == [(0, 2), (2, 2), (4, 1)]
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from ood.load_test import build_grid, load_grid_spec, percentile, report, run_one
+
+
+def test_grid_spec_from_file_with_overrides(tmp_path):
+    path = tmp_path / 'grid.json'
+    path.write_text(json.dumps({'hyperparameters': {'model': ['gpt-4-0613'], 'temperature': [0.2, 0.9]}, 'N': 3,
+                                'prompts': ['Pitch a startup.', 'Pitch a podcast.'], 'prompt_mode': 'factorial'}))
+    grid = build_grid(load_grid_spec(str(path), models=['gpt-3.5-turbo', 'claude-2'], N=1))
+    assert len(grid) == 2 * 2 * 2
+    assert {item['hyperparams']['model'] for item in grid} == {'gpt-3.5-turbo', 'claude-2'}
+    assert {item['prompt'] for item in grid} == {'Pitch a startup.', 'Pitch a podcast.'}
+
+
+def test_grid_needs_a_model():
+    with pytest.raises(ValueError):
+        build_grid({'hyperparameters': {'temperature': [1.0]}, 'N': 1, 'prompts': ['Hi']})
+
+
+def test_report_percentiles_and_error_rates():
+    results = [{'latency': s, 'outcome': 'ok', 'completions': 2, 'model': 'gpt-4'} for s in (1.0, 2.0, 3.0)]
+    results.append({'latency': 0.1, 'outcome': 'http_429', 'completions': 0, 'model': 'gpt-4'})
+    summary = report(results, wall=2.0)
+    assert percentile([3, 1, 2], 50) == 2
+    assert summary['completions_per_s'] == 3.0
+    assert summary['error_rates'] == {'http_429': 0.25}
+
+
+@pytest.fixture
+def mock_api_base():
+    pytest.importorskip('litellm')
+    from ood.mock_llm_server import serve
+
+    server = serve(port=0, latency='fixed:0.01', token_latency=0.0, min_words=20, max_words=20)
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def grid_item(model):
+    return {'prompt': 'Pitch a startup.', 'prompt_params': {'category': 'startup'},
+            'hyperparams': {'model': model, 'temperature': 0.7}}
+
+
+def test_stream_requests_return_every_choice(mock_api_base):
+    result = run_one(grid_item('gpt-3.5-turbo'), mock_api_base, n=3, stream=True, word_limit=5, max_tokens=50)
+    assert (result['outcome'], result['completions']) == ('ok', 3)
+
+
+def test_requests_go_through_safe_completion(mock_api_base):
+    pytest.importorskip('tenacity')
+    result = run_one(grid_item('gpt-3.5-turbo'), mock_api_base, n=4, stream=False, word_limit=None, max_tokens=50)
+    assert (result['outcome'], result['completions']) == ('ok', 4)
+
+
+def test_429s_are_reported_as_errors_not_latency():
+    pytest.importorskip('litellm')
+    from ood.mock_llm_server import serve
+
+    server = serve(port=0, latency='fixed:0.01', rate_429=1.0)
+    try:
+        api_base = f"http://127.0.0.1:{server.server_address[1]}"
+        results = [run_one(grid_item(model), api_base, n=1, stream=False, word_limit=None, max_tokens=50)
+                   for model in ('gpt-3.5-turbo', 'claude-2')]
+        stats = dict(server.stats)
+    finally:
+        server.shutdown()
+    summary = report(results, wall=1.0)
+    assert summary['error_rates'] == {'http_429': 1.0}
+    assert summary['retries'] == 0
+    # One request each: neither safe_completion nor the provider clients retried behind the report's back
+    assert stats == {'requests': 2, 'http_429': 2}
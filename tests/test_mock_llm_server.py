@@ -0,0 +1,34 @@
+import pytest
+
+from ood.mock_llm_server import interleave_words, parse_latency, serve
+
+
+def test_interleave_words_rebuilds_every_text():
+    texts = ['one two three', 'a', 'x y']
+    pieces = list(interleave_words(texts))
+    assert [index for index, _, _ in pieces] == [0, 1, 2, 0, 2, 0]
+    for i, text in enumerate(texts):
+        assert ''.join(piece for index, piece, _ in pieces if index == i) == text
+        assert [last for index, _, last in pieces if index == i][-1]
+
+
+def test_parse_latency():
+    assert parse_latency('fixed:0.5')() == 0.5
+    assert 1 <= parse_latency('uniform:1,2')() <= 2
+    with pytest.raises(ValueError):
+        parse_latency('gamma:1')
+
+
+def test_streams_every_choice_with_its_index():
+    pytest.importorskip('litellm')
+    from ood.llm_utils import stream_choices_until_words
+
+    server = serve(port=0, latency='fixed:0.01', token_latency=0.0, min_words=10, max_words=10)
+    try:
+        results = stream_choices_until_words('openai/gpt-3.5-turbo', [{'role': 'user', 'content': 'Give me an idea.'}],
+                                             [2, None, 4], api_base=f"http://127.0.0.1:{server.server_address[1]}/v1",
+                                             api_key='mock')
+    finally:
+        server.shutdown()
+    assert [len(text.split()) for text, _ in results] == [2, 10, 4]
+    assert server.stats['requests'] == 1
@@ -0,0 +1,53 @@
+import json
+
+import numpy as np
+
+from ood.near_dedup import MinHashLSH, dedup_jsonl, optimal_bands, shingles
+
+BASE = ("A weekly podcast where two former chefs cook their way through forgotten regional recipes and interview "
+        "the home cooks who still make them")
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def test_shingles_normalize_case_punctuation_and_space():
+    assert shingles('Hello,   World!', k=5) == shingles('hello world', k=5)
+    assert shingles('Hi', k=5) == {'hi'}
+    assert shingles('!!', k=5) == set()
+
+
+def test_optimal_bands_fit_the_signature():
+    bands, rows = optimal_bands(0.8, 128)
+    assert bands * rows <= 128
+    # A higher threshold needs more rows per band
+    assert optimal_bands(0.9, 128)[1] >= optimal_bands(0.5, 128)[1]
+
+
+def test_signature_agreement_estimates_jaccard():
+    lsh = MinHashLSH(num_perm=256)
+    other = BASE.replace('forgotten regional', 'lost family')
+    estimate = np.mean(lsh.signature(BASE) == lsh.signature(other))
+    assert abs(estimate - jaccard(shingles(BASE), shingles(other))) < 0.1
+
+
+def test_add_keeps_distinct_and_flags_near_duplicates():
+    lsh = MinHashLSH(threshold=0.8)
+    assert lsh.add('a', BASE) is None
+    assert lsh.add('b', BASE.upper() + '!') == 'a'
+    assert lsh.add('c', BASE.replace('interview', 'talk with')) == 'a'
+    assert lsh.add('d', 'A daily news show about climate policy in city councils across the Midwest') is None
+    assert lsh.add('e', '') is None
+
+
+def test_dedup_jsonl_streams_kept_lines_and_reports_dupes(tmp_path):
+    records = [{'dataset_id': 'p1', 'description': BASE},
+               {'dataset_id': 'p2', 'description': 'A comedy show reviewing bad airport sandwiches one by one'},
+               {'dataset_id': 'p3', 'description': BASE + '.'}]
+    source = tmp_path / 'podcasts.jsonl'
+    source.write_text(''.join(json.dumps(r) + '\n' for r in records) + '\n')
+    out, dupes = tmp_path / 'out.jsonl', tmp_path / 'dupes.jsonl'
+    assert dedup_jsonl(str(source), str(out), dupes_path=str(dupes)) == (3, 2)
+    assert [json.loads(line)['dataset_id'] for line in out.read_text().splitlines()] == ['p1', 'p2']
+    assert [json.loads(line) for line in dupes.read_text().splitlines()] == [{'dropped': 'p3', 'matched': 'p1'}]
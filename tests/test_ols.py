@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ood.ols import fit_ols
+
+smf = pytest.importorskip('statsmodels.formula.api')
+patsy = pytest.importorskip('patsy')
+
+FORMULA = 'sim ~ category*model*C(in_window)'
+
+
+@pytest.fixture(scope='module')
+def pairs():
+    rng = np.random.default_rng(0)
+    n = 5000
+    df = pd.DataFrame({'category': rng.choice(['opeds', 'podcasts', 'startups'], n),
+                       'model': rng.choice(['claude-2', 'gpt-4-0613'], n),
+                       'in_window': rng.integers(0, 2, n), 'ai_code': rng.integers(0, 300, n)})
+    df['sim'] = (rng.normal(size=n) + 0.3 * df['in_window'] * (df['model'] == 'gpt-4-0613')
+                 + 0.1 * (df['category'] == 'podcasts') + rng.normal(size=300)[df['ai_code']])
+    return df
+
+
+def chunks_of(df, size=777):
+    return lambda: (df.iloc[i:i + size] for i in range(0, len(df), size))
+
+
+def reference_ame(ref, df, rows):
+    """The in_window 1 - 0 comparison averaged over `rows`, with its delta-method SE."""
+    design_info = patsy.dmatrix(FORMULA.split('~')[1], df).design_info
+    assert design_info.column_names == list(ref.params.index)
+    X1, X0 = (np.asarray(patsy.dmatrix(design_info, df.loc[rows].assign(in_window=v))) for v in (1, 0))
+    d = X1.mean(axis=0) - X0.mean(axis=0)
+    return d @ ref.params.to_numpy(), np.sqrt(d @ ref.cov_params().to_numpy() @ d)
+
+
+@pytest.mark.parametrize('cov_type', ['nonrobust', 'HC1', 'cluster'])
+def test_streamed_fit_matches_statsmodels(pairs, cov_type):
+    kwargs = {'cov_kwds': {'groups': pairs['ai_code']}} if cov_type == 'cluster' else {}
+    ref = smf.ols(FORMULA, pairs).fit(cov_type=cov_type, **kwargs)
+    result = fit_ols(FORMULA, chunks_of(pairs), cov_type, cluster='ai_code', ame_variable='in_window',
+                     ame_by=[None, 'model'])
+
+    assert list(result.params.index) == list(ref.params.index)
+    assert np.allclose(result.params, ref.params)
+    assert np.allclose(result.bse, ref.bse)
+    assert result.nobs == ref.nobs and result.df_resid == ref.df_resid
+    assert np.isclose(result.rsquared, ref.rsquared)
+
+    overall = result.ames[result.ames['by'] == 'overall'].iloc[0]
+    assert np.allclose([overall['estimate'], overall['std_error']], reference_ame(ref, pairs, pairs.index))
+    for model, rows in pairs.groupby('model').groups.items():
+        ame = result.ames[(result.ames['by'] == 'model') & (result.ames['group'] == model)].iloc[0]
+        assert np.allclose([ame['estimate'], ame['std_error']], reference_ame(ref, pairs, rows))
+
+
+def test_cluster_needs_a_column(pairs):
+    with pytest.raises(ValueError):
+        fit_ols(FORMULA, chunks_of(pairs), 'cluster')
@@ -0,0 +1,51 @@
+import sys
+
+import pytest
+
+from ood.pipeline import Stage, build_stages, resolve_deps, run_pipeline, source, sources, with_upstream
+
+
+def copy_stage(name, src, dst):
+    code = f"import shutil; shutil.copy({str(src)!r}, {str(dst)!r})"
+    return Stage(name, [sys.executable, '-c', code], [str(src)], [str(dst)])
+
+
+def test_sources_include_imported_helpers():
+    paths = sources('fetch_nyt_opeds')
+    assert source('fetch_nyt_opeds') in paths
+    assert source('fetch_utils') in paths
+    assert source('telemetry') in paths
+
+
+def test_every_ingested_corpus_feeds_process():
+    stages = {s.name: s for s in build_stages('2023-01-01', '2023-03-01')}
+    deps = resolve_deps(stages.values())
+    upstream = with_upstream(['process'], deps)
+    fetchers = {name for name in stages if name.startswith(('fetch_', 'dedup_', 'ingest_'))}
+    assert fetchers <= upstream
+
+
+def test_duplicate_outputs_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        resolve_deps([copy_stage('a', tmp_path / 'x', tmp_path / 'y'), copy_stage('b', tmp_path / 'x', tmp_path / 'y')])
+
+
+def test_rerun_skips_unchanged_stages_and_reruns_downstream_of_an_edit(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'a.txt').write_text('1')
+    stages = [copy_stage('first', tmp_path / 'a.txt', tmp_path / 'b.txt'),
+              copy_stage('second', tmp_path / 'b.txt', tmp_path / 'c.txt')]
+    state = str(tmp_path / 'state.json')
+
+    assert run_pipeline(stages, workers=2, state_path=state) == {'first': 'ran', 'second': 'ran'}
+    assert run_pipeline(stages, workers=2, state_path=state) == {'first': 'skipped', 'second': 'skipped'}
+    (tmp_path / 'a.txt').write_text('2')
+    assert run_pipeline(stages, workers=2, state_path=state) == {'first': 'ran', 'second': 'ran'}
+    assert (tmp_path / 'c.txt').read_text() == '2'
+
+
+def test_failed_stage_blocks_downstream(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    failing = Stage('first', [sys.executable, '-c', 'raise SystemExit(1)'], [], [str(tmp_path / 'b.txt')])
+    stages = [failing, copy_stage('second', tmp_path / 'b.txt', tmp_path / 'c.txt')]
+    assert run_pipeline(stages, state_path=str(tmp_path / 'state.json')) == {'first': 'failed', 'second': 'blocked'}
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ood.process_utils import (compute_similarity_proportions, extract_json, fix_cat, min_unique_human_ids,
+                               process_ai_idea)
+
+
+def test_fix_cat():
+    assert [fix_cat(c) for c in ('startup', 'oped', 'podcast')] == ['startups', 'opeds', 'podcasts']
+
+
+def test_extract_json_takes_the_only_value():
+    assert extract_json('Sure! {"idea": "An app for swapping houseplants"} Hope that helps.') == \
+        'An app for swapping houseplants'
+    assert np.isnan(extract_json('{"idea": "a", "name": "b"}'))
+    assert np.isnan(extract_json('No JSON here'))
+
+
+def test_process_ai_idea_is_ai_major():
+    csim = np.arange(36, dtype=np.float64).reshape(6, 6)
+    df = process_ai_idea([4, 1], [0, 2, 5], csim)
+    expected = [(ai, human, csim[ai, human]) for ai in (4, 1) for human in (0, 2, 5)]
+    assert list(df.itertuples(index=False, name=None)) == expected
+    assert (df['ai_code'].dtype, df['human_code'].dtype, df['sim'].dtype) == (np.int32, np.int32, np.float32)
+
+
+def pairs():
+    # Two AI ideas per model against two in-window (1, 2) and three out-of-window (3, 4, 5) human ideas
+    sims = {(10, 1): 0.9, (10, 2): 0.1, (10, 3): 0.2, (10, 4): 0.3, (10, 5): 0.4,
+            (11, 1): 0.1, (11, 2): 0.2, (11, 3): 0.8, (11, 4): 0.3, (11, 5): 0.4}
+    rows = [{'model': 'gpt-4', 'category': 'startups', 'ai_code': ai, 'human_code': human, 'sim': sim,
+             'in_window': int(human <= 2)} for (ai, human), sim in sims.items()]
+    return pd.DataFrame(rows)
+
+
+def test_min_unique_human_ids():
+    assert min_unique_human_ids(pairs()) == {'startups': 2}
+
+
+def test_similarity_proportions_balance_the_window():
+    df = pairs()
+    for seed in range(5):
+        [record] = compute_similarity_proportions(df, {'startups': 2}, seed=seed)
+        assert record['total'] == 2
+        assert record['in_window_prop'] + record['out_window_prop'] == pytest.approx(1)
+        # AI idea 10's nearest human (1) is always sampled since both in-window ideas are kept
+        assert record['in_window_prop'] >= 0.5
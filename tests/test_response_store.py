@@ -0,0 +1,90 @@
+import csv
+import os
+import subprocess
+import sys
+import time
+
+from ood.response_store import ResponseStore
+
+
+def read(path):
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def write(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def row(output, **extra):
+    return {'model': 'gpt-4', 'category': 'startup', 'output': output, **extra}
+
+
+def test_append_skips_known_rows_across_instances(tmp_path):
+    path = str(tmp_path / 'responses.csv')
+    assert ResponseStore(path).append([row('a'), row('b'), row('a')]) == 2
+    store = ResponseStore(path)
+    assert store.append([row('b'), row('c')]) == 1
+    assert [r['output'] for r in read(path)] == ['a', 'b', 'c']
+    assert row('c') in store and len(store) == 3
+
+
+def test_new_columns_widen_the_file(tmp_path):
+    path = str(tmp_path / 'responses.csv')
+    store = ResponseStore(path)
+    store.append([row('a')])
+    store.append([row('b', temperature='0.7')])
+    rows = read(path)
+    assert [r['temperature'] for r in rows] == ['', '0.7']
+
+
+def test_compact_keeps_the_newest_row_per_key(tmp_path):
+    path = str(tmp_path / 'responses.csv')
+    write(path, [row('a', run='1'), row('b', run='1'), row('a', run='2'), row('a', run='3')])
+    store = ResponseStore(path, compact_ratio=10)
+    assert store.compact() == 2
+    assert {r['output']: r['run'] for r in read(path)} == {'a': '3', 'b': '1'}
+    assert len(store) == 2
+
+
+def test_append_compacts_in_the_background_past_the_ratio(tmp_path):
+    path = str(tmp_path / 'responses.csv')
+    write(path, [row('a', run='1'), row('a', run='2')])
+    store = ResponseStore(path, compact_ratio=0.25)
+    assert store.append([row('b')]) == 1
+    store._compaction.join(timeout=10)
+    assert sorted((r['output'], r['run']) for r in read(path)) == [('a', '2'), ('b', '')]
+
+
+def test_rows_left_unindexed_by_a_crash_are_not_appended_twice(tmp_path):
+    path = str(tmp_path / 'responses.csv')
+    ResponseStore(path).append([row('a')])
+    time.sleep(0.01)
+    # A crash between the CSV write and the index write leaves 'b' in the CSV only
+    with open(path, 'a', newline='') as f:
+        csv.writer(f).writerow(['gpt-4', 'startup', 'b'])
+    assert ResponseStore(path).append([row('b'), row('c')]) == 1
+    assert [r['output'] for r in read(path)] == ['a', 'b', 'c']
+
+
+def test_nan_keys_like_a_missing_value(tmp_path):
+    path = str(tmp_path / 'responses.csv')
+    store = ResponseStore(path)
+    assert store.append([row(float('nan'))]) == 1
+    assert store.append([row(None), row('')]) == 0
+    assert read(path)[0]['output'] == ''
+    assert ResponseStore(path).append([row(float('nan'))]) == 0
+
+
+def test_background_compaction_finishes_before_the_interpreter_exits(tmp_path):
+    path = str(tmp_path / 'responses.csv')
+    write(path, [row(str(i % 50), run=str(i)) for i in range(20000)])
+    script = ("import sys; from ood.response_store import ResponseStore; "
+              "store = ResponseStore(sys.argv[1], compact_ratio=0.1); store.append([{'output': 'new'}]); "
+              "assert store._compaction.is_alive()")
+    subprocess.run([sys.executable, '-c', script, path], check=True)
+    assert not os.path.exists(path + '.tmp')
+    assert len(read(path)) == 51
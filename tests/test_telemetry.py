@@ -0,0 +1,105 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ood import telemetry
+from ood.telemetry import bind, incr, summarize, track_stage
+
+
+@pytest.fixture
+def telemetry_file(tmp_path, monkeypatch):
+    path = tmp_path / 'telemetry.jsonl'
+    monkeypatch.setenv('OOD_TELEMETRY', str(path))
+    monkeypatch.setenv('OOD_RUN_ID', 'test-run')
+    monkeypatch.delenv('OOD_PARENT_STAGE', raising=False)
+    return path
+
+
+def read(path):
+    return {row['stage']: row for row in map(json.loads, path.read_text().splitlines())}
+
+
+def test_nothing_is_written_unless_enabled(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('OOD_TELEMETRY', raising=False)
+    with track_stage('quiet') as record:
+        incr('items', 3)
+    assert record['counters']['items'] == 3
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_nested_stages_record_parent_and_counts(telemetry_file):
+    with track_stage('outer'):
+        incr('items')
+        with track_stage('inner', model='m'):
+            incr('items', 2)
+            incr('bytes', 10)
+    rows = read(telemetry_file)
+    assert rows['outer']['items'] == 1 and rows['outer']['parent'] is None
+    assert rows['inner']['items'] == 2 and rows['inner']['bytes'] == 10
+    assert rows['inner']['parent'] == 'outer' and rows['inner']['model'] == 'm'
+
+
+def test_bound_workers_count_toward_the_submitting_stage(telemetry_file):
+    def work(n):
+        incr('items', n)
+
+    with track_stage('fan_out'), ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(bind(work), range(10)))
+    assert read(telemetry_file)['fan_out']['items'] == 45
+
+
+def test_concurrent_stages_in_different_threads_do_not_mix(telemetry_file):
+    barrier = threading.Barrier(2)
+
+    def stage(name, n):
+        with track_stage(name):
+            barrier.wait()
+            for _ in range(n):
+                incr('items')
+            barrier.wait()
+
+    threads = [threading.Thread(target=stage, args=('a', 5)), threading.Thread(target=stage, args=('b', 7))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    rows = read(telemetry_file)
+    assert (rows['a']['items'], rows['b']['items']) == (5, 7)
+
+
+def test_incr_outside_a_stage_is_a_no_op():
+    incr('items')
+    assert telemetry._active.get() == ()
+
+
+def test_summary_skips_wrapper_stages_for_the_bottleneck(telemetry_file, capsys):
+    rows = [
+        {'stage': 'pipeline:fetch_opeds', 'parent': None, 'wall_s': 10.0, 'start': 0.0},
+        {'stage': 'fetch_nyt', 'parent': 'pipeline:fetch_opeds', 'wall_s': 9.0, 'start': 0.5},
+        {'stage': 'pipeline:generate', 'parent': None, 'wall_s': 4.0, 'start': 10.0},
+    ]
+    with open(telemetry_file, 'w') as f:
+        for row in rows:
+            base = {'run_id': 'r', 'status': 'ok', 'items_per_s': None, 'rss_delta_mb': 1.0,
+                    **{c: 0 for c in telemetry.COUNTERS}}
+            f.write(json.dumps({**base, **row}) + '\n')
+    summarize(str(telemetry_file))
+    assert 'Bottleneck: fetch_nyt' in capsys.readouterr().out
+
+
+def test_rss_delta_measures_the_stage_not_the_process_peak(telemetry_file):
+    if telemetry.current_rss_mb() is None:
+        pytest.skip('needs /proc')
+    with track_stage('allocate'):
+        block = bytearray(64 * 1024 ** 2)
+        block[::4096] = b'x' * len(block[::4096])
+    del block
+    with track_stage('small'):
+        pass
+    rows = read(telemetry_file)
+    assert rows['allocate']['rss_delta_mb'] >= 32
+    assert abs(rows['small']['rss_delta_mb']) < 32
+    assert rows['small']['process_peak_rss_mb'] >= rows['allocate']['rss_delta_mb']